@@ -0,0 +1,185 @@
+import asyncio
+import logging
+import random
+import socket
+import time
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+from prometheus_client import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+ENDPOINTS_AVAILABLE = Gauge(
+    "gateway_upstream_endpoints",
+    "Resolved replica endpoints by state",
+    ["upstream", "state"]
+)
+
+ENDPOINT_EJECTIONS = Counter(
+    "gateway_upstream_endpoint_ejections_total",
+    "Replica endpoints ejected as outliers",
+    ["upstream"]
+)
+
+class Endpoint:
+    """One replica with its in-flight count, EWMA latency and ejection state.
+
+    A replica resolved from the service hostname keeps that hostname in
+    ``host`` so requests to its address still carry the right Host header
+    and TLS server name.
+    """
+
+    def __init__(self, url: str, host: Optional[str] = None, initial_latency: float = 0.05):
+        self.url = url
+        self.host = host
+        self.server_name = urlsplit(f"//{host}").hostname if host else None
+        self.inflight = 0
+        self.ewma = initial_latency
+        self.consecutive_failures = 0
+        self.ejections = 0
+        self.ejected_until = 0.0
+
+    def is_ejected(self, now: float) -> bool:
+        return self.ejected_until > now
+
+    def score(self) -> float:
+        # Expected wait if this request joins the queue behind the in-flight ones
+        return (self.inflight + 1) * self.ewma
+
+class EndpointSet:
+    """Replica endpoints for one upstream, balanced per request.
+
+    Endpoints come from a static list or from the A records behind the
+    service URL's hostname (a headless Service in Kubernetes), refreshed in
+    the background. Each pick compares two random healthy endpoints and takes
+    the one with the lower in-flight x EWMA latency score. Endpoints failing
+    repeatedly are ejected for a growing interval, never more than
+    ``max_ejection_percent`` of the set at once.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        service_url: str,
+        static_endpoints: Optional[List[str]] = None,
+        resolve_interval: float = 10.0,
+        ewma_decay: float = 0.3,
+        consecutive_failures: int = 5,
+        ejection_seconds: float = 30.0,
+        max_ejection_percent: int = 50
+    ):
+        self.name = name
+        self.service_url = service_url.rstrip("/")
+        self.static_endpoints = [url.rstrip("/") for url in static_endpoints or []]
+        self.resolve_interval = resolve_interval
+        self.ewma_decay = ewma_decay
+        self.consecutive_failures = consecutive_failures
+        self.ejection_seconds = ejection_seconds
+        self.max_ejection_percent = max_ejection_percent
+        self._endpoints: Dict[str, Endpoint] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._set_urls(self.static_endpoints or [self.service_url])
+
+    def _set_urls(self, urls: List[str], host: Optional[str] = None) -> None:
+        # Keep state for replicas that survive a re-resolution
+        self._endpoints = {url: self._endpoints.get(url) or Endpoint(url, host) for url in urls}
+        self._report()
+
+    async def resolve(self) -> None:
+        if self.static_endpoints:
+            return
+        parts = urlsplit(self.service_url)
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        try:
+            infos = await asyncio.get_running_loop().getaddrinfo(
+                parts.hostname, port, family=socket.AF_INET, type=socket.SOCK_STREAM
+            )
+        except OSError:
+            logger.warning("Could not resolve %s, keeping %d endpoints", parts.hostname, len(self._endpoints))
+            return
+        addresses = sorted({info[4][0] for info in infos})
+        if addresses:
+            # Only the host is swapped for the address; the path prefix stays
+            self._set_urls(
+                [f"{parts.scheme}://{address}:{port}{parts.path}" for address in addresses],
+                host=parts.netloc
+            )
+
+    def start(self) -> None:
+        if not self.static_endpoints and self._task is None:
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await self.resolve()
+            await asyncio.sleep(self.resolve_interval)
+
+    def pick(self) -> Endpoint:
+        now = time.monotonic()
+        endpoints = list(self._endpoints.values())
+        lapsed = [endpoint for endpoint in endpoints if 0 < endpoint.ejected_until <= now]
+        if lapsed:
+            # Ejections end by time alone; bring the gauge back with them
+            for endpoint in lapsed:
+                endpoint.ejected_until = 0.0
+            self._report()
+        healthy = [endpoint for endpoint in endpoints if not endpoint.is_ejected(now)]
+        candidates = healthy or endpoints
+        if len(candidates) == 1:
+            return candidates[0]
+        first, second = random.sample(candidates, 2)
+        return first if first.score() <= second.score() else second
+
+    def acquire(self, endpoint: Endpoint) -> None:
+        endpoint.inflight += 1
+
+    def release(self, endpoint: Endpoint, latency: Optional[float], ok: bool) -> None:
+        """Record the outcome; latency is None when the call was cancelled"""
+        endpoint.inflight -= 1
+        if latency is None:
+            return
+        endpoint.ewma += self.ewma_decay * (latency - endpoint.ewma)
+        if ok:
+            endpoint.consecutive_failures = 0
+            return
+        endpoint.consecutive_failures += 1
+        if endpoint.consecutive_failures >= self.consecutive_failures:
+            self._eject(endpoint)
+
+    def _eject(self, endpoint: Endpoint) -> None:
+        now = time.monotonic()
+        if endpoint.is_ejected(now):
+            return
+        ejected = sum(1 for other in self._endpoints.values() if other.is_ejected(now))
+        if (ejected + 1) * 100 > len(self._endpoints) * self.max_ejection_percent:
+            return
+        endpoint.ejections = min(endpoint.ejections + 1, 10)
+        endpoint.consecutive_failures = 0
+        duration = self.ejection_seconds * endpoint.ejections
+        endpoint.ejected_until = now + duration
+        ENDPOINT_EJECTIONS.labels(upstream=self.name).inc()
+        logger.warning("Ejected %s endpoint %s for %.0fs", self.name, endpoint.url, duration)
+        self._report()
+
+    def _report(self) -> None:
+        now = time.monotonic()
+        ejected = sum(1 for endpoint in self._endpoints.values() if endpoint.is_ejected(now))
+        ENDPOINTS_AVAILABLE.labels(upstream=self.name, state="healthy").set(len(self._endpoints) - ejected)
+        ENDPOINTS_AVAILABLE.labels(upstream=self.name, state="ejected").set(ejected)
+
+    def snapshot(self) -> List[dict]:
+        now = time.monotonic()
+        return [
+            {
+                "url": endpoint.url,
+                "inflight": endpoint.inflight,
+                "ewma_ms": round(endpoint.ewma * 1000, 2),
+                "ejected": endpoint.is_ejected(now),
+            }
+            for endpoint in self._endpoints.values()
+        ]
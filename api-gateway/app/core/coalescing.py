@@ -0,0 +1,105 @@
+import asyncio
+import hashlib
+from typing import Awaitable, Callable, Dict, NamedTuple, Tuple
+from fastapi import Request
+from fastapi.responses import Response
+from prometheus_client import Counter
+
+COALESCED_REQUESTS = Counter(
+    "gateway_coalesced_requests_total",
+    "Requests answered by another in-flight identical upstream call",
+    ["route"]
+)
+
+COALESCER_UPSTREAM_CALLS = Counter(
+    "gateway_coalescer_upstream_calls_total",
+    "Upstream calls made on behalf of coalesced requests",
+    ["route"]
+)
+
+IDEMPOTENT_METHODS = {"GET", "HEAD"}
+
+# Upstream headers relayed to the client
+FORWARDED_HEADERS = ("etag", "cache-control", "x-next-cursor", "x-min-lsn")
+
+class UpstreamResponse(NamedTuple):
+    status_code: int
+    content: bytes
+    media_type: str
+    headers: Tuple[Tuple[str, str], ...] = ()
+
+    def to_response(self, coalesced: bool = False) -> Response:
+        response = Response(
+            content=self.content,
+            status_code=self.status_code,
+            media_type=self.media_type,
+            headers=dict(self.headers)
+        )
+        if coalesced:
+            response.headers["X-Coalesced"] = "1"
+        return response
+
+class RequestCoalescer:
+    """Single-flight for identical concurrent idempotent upstream reads.
+
+    The first request for a key calls upstream; requests arriving while it
+    is in flight wait for the same result instead of issuing their own call.
+    Nothing is cached once the call completes.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+
+    @staticmethod
+    def key_for(request: Request, access_token: str) -> Tuple:
+        """Method, path, normalized query, validators and the caller's credentials"""
+        identity = hashlib.sha256(access_token.encode()).hexdigest()
+        return (
+            request.method,
+            request.url.path,
+            tuple(sorted(request.query_params.multi_items())),
+            request.headers.get("if-none-match"),
+            request.headers.get("x-min-lsn"),
+            identity,
+        )
+
+    async def run(
+        self,
+        route: str,
+        key: Tuple,
+        call: Callable[[], Awaitable[UpstreamResponse]]
+    ) -> Response:
+        if key[0] not in IDEMPOTENT_METHODS:
+            return (await call()).to_response()
+
+        while True:
+            future = self._inflight.get(key)
+            if future is None:
+                break
+            COALESCED_REQUESTS.labels(route=route).inc()
+            try:
+                upstream = await asyncio.shield(future)
+                return upstream.to_response(coalesced=True)
+            except asyncio.CancelledError:
+                # Call again, leading if nobody else is, only when the leading request
+                # was cancelled and this one was not
+                if not future.cancelled() or asyncio.current_task().cancelling():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        COALESCER_UPSTREAM_CALLS.labels(route=route).inc()
+        try:
+            upstream = await call()
+            future.set_result(upstream)
+            return upstream.to_response()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Mark the exception retrieved when nobody else was waiting
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
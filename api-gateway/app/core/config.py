@@ -12,6 +12,44 @@ class Settings(BaseSettings):
     USER_SERVICE_URL: str = os.getenv("USER_SERVICE_URL", "http://user-service:8001")
     ID_SERVICE_URL: str = os.getenv("ID_SERVICE_URL", "http://id-service:8002")
     
+    # Upstream resilience
+    AUTH_SERVICE_TIMEOUT: float = 2.0
+    USER_SERVICE_TIMEOUT: float = 5.0
+    ID_SERVICE_TIMEOUT: float = 5.0
+    REQUEST_DEADLINE_SECONDS: float = 10.0  # Budget for a request entering the gateway
+    UPSTREAM_MAX_RETRIES: int = 2
+    CIRCUIT_FAILURE_THRESHOLD: int = 5
+    CIRCUIT_RECOVERY_SECONDS: float = 10.0
+
+    # JSON logs through a bounded queue; INFO and below can be sampled under load
+    LOG_LEVEL: str = "INFO"
+    LOG_INFO_SAMPLE_RATE: float = 1.0
+    LOG_QUEUE_SIZE: int = 10000  # Records beyond this are dropped and counted
+
+    # Tracing: "none" only propagates traceparent, "file" appends JSON lines, "memory" keeps spans in-process
+    TRACE_EXPORTER: str = "none"
+    TRACE_FILE_PATH: str = "traces.jsonl"
+    TRACE_HEAD_SAMPLE_RATE: float = 0.01
+    TRACE_TAIL_LATENCY_MS: int = 500  # Also keep failed traces and those this slow; 0 disables
+
+    # Admin profiling endpoints under /debug, enabled by setting a token
+    PROFILING_TOKEN: str = ""
+    LOOP_STALL_THRESHOLD_MS: int = 100  # Blocking callbacks longer than this are logged with their stack
+
+    # Client-side load balancing; service hostnames should point at headless Services
+    AUTH_SERVICE_ENDPOINTS: str = ""  # Optional comma-separated static replica URLs
+    USER_SERVICE_ENDPOINTS: str = ""
+    ID_SERVICE_ENDPOINTS: str = ""
+    ENDPOINT_RESOLVE_INTERVAL_SECONDS: float = 10.0
+    OUTLIER_CONSECUTIVE_FAILURES: int = 5
+    OUTLIER_EJECTION_SECONDS: float = 30.0
+    OUTLIER_MAX_EJECTION_PERCENT: int = 50
+    
+    # Adaptive concurrency limit per upstream, shared by its routes
+    CONCURRENCY_INITIAL_LIMIT: int = 20
+    CONCURRENCY_MIN_LIMIT: int = 4
+    CONCURRENCY_MAX_LIMIT: int = 500
+
     # Redis Settings
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://redis:6379/0")
     
@@ -26,4 +64,6 @@ class Settings(BaseSettings):
     RATE_LIMIT_BURST: int = 100
 
     class Config:
-        case_sensitive = True 
\ No newline at end of file
+        case_sensitive = True
+
+settings = Settings()
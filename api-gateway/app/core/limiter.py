@@ -0,0 +1,165 @@
+import math
+import time
+from enum import IntEnum
+from typing import Dict, List, Optional, Tuple
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from prometheus_client import Counter, Gauge
+
+CONCURRENCY_LIMIT = Gauge(
+    "gateway_concurrency_limit",
+    "Current adaptive concurrency limit",
+    ["upstream"]
+)
+
+CONCURRENCY_INFLIGHT = Gauge(
+    "gateway_concurrency_inflight",
+    "Requests currently admitted",
+    ["upstream"]
+)
+
+SHED_REQUESTS = Counter(
+    "gateway_shed_requests_total",
+    "Requests rejected because the upstream was at its concurrency limit",
+    ["upstream", "priority"]
+)
+
+class Priority(IntEnum):
+    CRITICAL = 0  # Login and verification
+    NORMAL = 1
+    BULK = 2  # Reports and exports
+
+# Share of an upstream's limit each class may fill; lower classes are shed first
+PRIORITY_SHARE = {
+    Priority.CRITICAL: 1.0,
+    Priority.NORMAL: 0.8,
+    Priority.BULK: 0.5,
+}
+
+class AdaptiveLimiter:
+    """Gradient concurrency limit shared by every route to one upstream.
+
+    The limit follows long-term / short-term latency: when recent requests
+    are slower than the baseline the limit shrinks proportionally, otherwise
+    it probes upward by sqrt(limit). Upstream overload responses cut it
+    multiplicatively.
+    """
+
+    def __init__(
+        self,
+        upstream: str,
+        initial_limit: int = 20,
+        min_limit: int = 4,
+        max_limit: int = 500,
+        smoothing: float = 0.2,
+        backoff: float = 0.9
+    ):
+        self.upstream = upstream
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.smoothing = smoothing
+        self.backoff = backoff
+        self.inflight = 0
+        self._short_rtt: Optional[float] = None
+        self._long_rtt: Optional[float] = None
+        self._report()
+
+    def try_acquire(self, priority: Priority) -> bool:
+        if self.inflight >= max(1, int(self.limit * PRIORITY_SHARE[priority])):
+            SHED_REQUESTS.labels(upstream=self.upstream, priority=priority.name.lower()).inc()
+            return False
+        self.inflight += 1
+        self._report()
+        return True
+
+    def release(self, rtt: Optional[float], overloaded: bool = False) -> None:
+        """Feed back one request; rtt is None when no latency sample applies"""
+        inflight = self.inflight
+        self.inflight -= 1
+        if overloaded:
+            self._set_limit(self.limit * self.backoff)
+        elif rtt is not None:
+            self._observe(rtt, inflight)
+        self._report()
+
+    def _observe(self, rtt: float, inflight: int) -> None:
+        if self._long_rtt is None:
+            self._short_rtt = self._long_rtt = rtt
+            return
+        self._short_rtt += 0.5 * (rtt - self._short_rtt)
+        self._long_rtt += 0.01 * (rtt - self._long_rtt)
+        # Only grow when the limit is actually being used
+        if inflight * 2 < self.limit and self._short_rtt <= self._long_rtt:
+            return
+        gradient = max(0.5, min(1.0, self._long_rtt / self._short_rtt))
+        target = self.limit * gradient + math.sqrt(self.limit)
+        self._set_limit(self.limit * (1 - self.smoothing) + target * self.smoothing)
+
+    def _set_limit(self, limit: float) -> None:
+        self.limit = max(self.min_limit, min(self.max_limit, limit))
+
+    def _report(self) -> None:
+        CONCURRENCY_LIMIT.labels(upstream=self.upstream).set(self.limit)
+        CONCURRENCY_INFLIGHT.labels(upstream=self.upstream).set(self.inflight)
+
+    def snapshot(self) -> dict:
+        return {
+            "limit": round(self.limit, 1),
+            "inflight": self.inflight,
+            "short_rtt_ms": round(self._short_rtt * 1000, 2) if self._short_rtt else None,
+            "long_rtt_ms": round(self._long_rtt * 1000, 2) if self._long_rtt else None,
+        }
+
+class ConcurrencyGuard:
+    """Admits requests against their upstream's limiter and sheds with 503 + Retry-After
+
+    Every route to an upstream shares one limiter, so when that upstream slows
+    down bulk requests are shed while critical ones are still admitted.
+    """
+
+    def __init__(self, rules: List[Tuple[str, str, str, Priority]], **limiter_options):
+        # (method, path prefix, upstream, priority); first match wins
+        self.rules = rules
+        self.limiter_options = limiter_options
+        self.limiters: Dict[str, AdaptiveLimiter] = {}
+
+    def classify(self, request: Request) -> Optional[Tuple[str, Priority]]:
+        for method, prefix, upstream, priority in self.rules:
+            if request.method == method and request.url.path.startswith(prefix):
+                return upstream, priority
+        return None
+
+    def limiter_for(self, upstream: str) -> AdaptiveLimiter:
+        limiter = self.limiters.get(upstream)
+        if limiter is None:
+            limiter = self.limiters[upstream] = AdaptiveLimiter(upstream, **self.limiter_options)
+        return limiter
+
+    async def __call__(self, request: Request, call_next):
+        match = self.classify(request)
+        if match is None:
+            return await call_next(request)
+
+        upstream, priority = match
+        limiter = self.limiter_for(upstream)
+        if not limiter.try_acquire(priority):
+            return JSONResponse(
+                status_code=503,
+                content={"detail": "Service overloaded, retry shortly"},
+                headers={"Retry-After": "1"}
+            )
+
+        started = time.perf_counter()
+        rtt, overloaded = None, False
+        try:
+            response = await call_next(request)
+            overloaded = response.status_code in (503, 504)
+            if response.status_code < 500:
+                rtt = time.perf_counter() - started
+            return response
+        finally:
+            limiter.release(rtt, overloaded)
+
+    def snapshot(self) -> Dict[str, dict]:
+        return {upstream: limiter.snapshot() for upstream, limiter in self.limiters.items()}
@@ -0,0 +1,42 @@
+from shared.resilience import ResilientClient, CircuitBreaker
+from app.core.balancer import EndpointSet
+from app.core.config import settings
+
+def _client(name: str, base_url: str, static_endpoints: str, timeout: float) -> ResilientClient:
+    endpoints = EndpointSet(
+        name,
+        base_url,
+        static_endpoints=[url.strip() for url in static_endpoints.split(",") if url.strip()],
+        resolve_interval=settings.ENDPOINT_RESOLVE_INTERVAL_SECONDS,
+        consecutive_failures=settings.OUTLIER_CONSECUTIVE_FAILURES,
+        ejection_seconds=settings.OUTLIER_EJECTION_SECONDS,
+        max_ejection_percent=settings.OUTLIER_MAX_EJECTION_PERCENT
+    )
+    return ResilientClient(
+        name,
+        base_url,
+        timeout=timeout,
+        max_retries=settings.UPSTREAM_MAX_RETRIES,
+        breaker=CircuitBreaker(
+            name,
+            failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+            recovery_seconds=settings.CIRCUIT_RECOVERY_SECONDS
+        ),
+        endpoints=endpoints
+    )
+
+auth_service = _client(
+    "auth-service", settings.AUTH_SERVICE_URL, settings.AUTH_SERVICE_ENDPOINTS, settings.AUTH_SERVICE_TIMEOUT
+)
+user_service = _client(
+    "user-service", settings.USER_SERVICE_URL, settings.USER_SERVICE_ENDPOINTS, settings.USER_SERVICE_TIMEOUT
+)
+id_service = _client(
+    "id-service", settings.ID_SERVICE_URL, settings.ID_SERVICE_ENDPOINTS, settings.ID_SERVICE_TIMEOUT
+)
+
+UPSTREAMS = {
+    "auth": auth_service,
+    "user": user_service,
+    "id": id_service,
+}
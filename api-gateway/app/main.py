@@ -1,30 +1,76 @@
 from fastapi import FastAPI, HTTPException, Depends, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from shared.compression import CompressionMiddleware
+from shared.metrics import RequestMetricsMiddleware, metrics_response
+from shared.logs import RequestContextMiddleware, configure_logging, shutdown_logging
+from shared.tracing import TracingMiddleware, configure_tracing, shutdown_tracing
+from shared.profiling import LoopMonitor, ProfilingMiddleware, profiling_router
 from app.core.auth import verify_token, RateLimiter
+from app.core.coalescing import FORWARDED_HEADERS, RequestCoalescer, UpstreamResponse
+from app.core.limiter import ConcurrencyGuard, Priority
 from app.core.config import settings
-import httpx
+from app.core.upstreams import UPSTREAMS, auth_service, user_service, id_service
+from shared.resilience import UpstreamUnavailable, deadline_middleware, upstream_unavailable_handler
+import asyncio
 import time
 from typing import Optional
 
+# Non-blocking JSON logs; configured before anything else logs
+configure_logging("api-gateway", settings.LOG_LEVEL, settings.LOG_INFO_SAMPLE_RATE, settings.LOG_QUEUE_SIZE)
+configure_tracing(
+    "api-gateway",
+    settings.TRACE_EXPORTER,
+    settings.TRACE_FILE_PATH,
+    settings.TRACE_HEAD_SAMPLE_RATE,
+    settings.TRACE_TAIL_LATENCY_MS
+)
+
 app = FastAPI(
     title="Digital ID System - API Gateway",
     description="API Gateway for Digital ID System",
     version="1.0.0",
 )
 
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.ALLOWED_ORIGINS,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+# Event-loop lag and the stack of any callback that blocks it
+loop_monitor = LoopMonitor("api-gateway", settings.LOOP_STALL_THRESHOLD_MS / 1000)
+
+# Admin profiling under /debug when PROFILING_TOKEN is set; registered first so
+# the middleware is innermost and runs in the endpoint's task
+if settings.PROFILING_TOKEN:
+    app.add_middleware(ProfilingMiddleware, token=settings.PROFILING_TOKEN)
+    app.include_router(profiling_router(settings.PROFILING_TOKEN, loop_monitor), prefix="/debug")
+
+# Negotiated zstd/br/gzip for bodies over 1 KiB
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+# Inter-service calls share one deadline per request and fail fast as 503/504
+app.middleware("http")(deadline_middleware(settings.REQUEST_DEADLINE_SECONDS))
+app.add_exception_handler(UpstreamUnavailable, upstream_unavailable_handler)
+
+# Adaptive concurrency limit per upstream; each route's priority decides how
+# much of its upstream's limit it may fill
+concurrency_guard = ConcurrencyGuard(
+    [
+        ("POST", "/api/auth/login", "auth", Priority.CRITICAL),
+        ("GET", "/api/admin/reports", "auth", Priority.BULK),
+        ("GET", "/api/users/me", "user", Priority.NORMAL),
+        ("GET", "/api/credentials/verify", "id", Priority.CRITICAL),
+        ("POST", "/api/credentials/verify", "id", Priority.CRITICAL),
+        ("GET", "/api/ids/", "id", Priority.NORMAL),
+        ("POST", "/api/institutional-ids", "id", Priority.NORMAL),
+    ],
+    initial_limit=settings.CONCURRENCY_INITIAL_LIMIT,
+    min_limit=settings.CONCURRENCY_MIN_LIMIT,
+    max_limit=settings.CONCURRENCY_MAX_LIMIT
 )
 
 # Initialize rate limiter
 rate_limiter = RateLimiter()
 
+# Collapses identical concurrent reads into one upstream call
+coalescer = RequestCoalescer()
+
 @app.middleware("http")
 async def add_process_time_header(request: Request, call_next):
     start_time = time.time()
@@ -33,6 +79,27 @@ async def add_process_time_header(request: Request, call_next):
     response.headers["X-Process-Time"] = str(process_time)
     return response
 
+# Server span per request, continuing the caller's traceparent; inside the request context
+app.add_middleware(TracingMiddleware)
+
+# Request id and route on every log record; inside the metrics middleware
+app.add_middleware(RequestContextMiddleware)
+
+# Latency by route template
+app.add_middleware(RequestMetricsMiddleware, service="api-gateway")
+
+# Registered after everything but CORS, so it sheds before any other work runs
+app.middleware("http")(concurrency_guard)
+
+# Add CORS middleware; outermost, so shed 503s carry CORS headers too
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=settings.ALLOWED_ORIGINS,
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
 async def get_token_header(authorization: Optional[str] = Header(None)) -> dict:
     if not authorization:
         raise HTTPException(
@@ -53,19 +120,31 @@ async def get_token_header(authorization: Optional[str] = Header(None)) -> dict:
 @app.post("/api/auth/login")
 async def auth_login(request: Request):
     """Forward login requests to auth service"""
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"{settings.AUTH_SERVICE_URL}/auth/login",
-            json=await request.json()
-        )
-        return JSONResponse(
-            status_code=response.status_code,
-            content=response.json()
+    response = await auth_service.post("/auth/login", json=await request.json())
+    return JSONResponse(
+        status_code=response.status_code,
+        content=response.json()
+    )
+
+async def forward_get(upstream, path: str, token_data: dict, request: Request) -> UpstreamResponse:
+    """Forward an authenticated GET and capture the upstream response"""
+    headers = {"Authorization": f"Bearer {token_data['access_token']}"}
+    for name in ("if-none-match", "x-min-lsn"):
+        if name in request.headers:
+            headers[name] = request.headers[name]
+    response = await upstream.get(path, headers=headers)
+    return UpstreamResponse(
+        status_code=response.status_code,
+        content=response.content,
+        media_type=response.headers.get("content-type", "application/json"),
+        headers=tuple(
+            (name, response.headers[name]) for name in FORWARDED_HEADERS if name in response.headers
         )
+    )
 
 # User Service Routes
 @app.get("/api/users/me")
-async def get_current_user(token_data: dict = Depends(get_token_header)):
+async def get_current_user(request: Request, token_data: dict = Depends(get_token_header)):
     """Get current user profile"""
     if await rate_limiter.is_rate_limited(token_data["sub"]):
         raise HTTPException(
@@ -73,17 +152,28 @@ async def get_current_user(token_data: dict = Depends(get_token_header)):
             detail="Too many requests"
         )
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"{settings.USER_SERVICE_URL}/users/me",
-            headers={"Authorization": f"Bearer {token_data['access_token']}"}
-        )
-        return JSONResponse(
-            status_code=response.status_code,
-            content=response.json()
-        )
+    return await coalescer.run(
+        "users_me",
+        coalescer.key_for(request, token_data["access_token"]),
+        lambda: forward_get(user_service, "/users/me", token_data, request)
+    )
 
 # ID Service Routes
+@app.get("/api/ids/{id}")
+async def get_digital_id(id: int, request: Request, token_data: dict = Depends(get_token_header)):
+    """Look up a digital ID"""
+    if await rate_limiter.is_rate_limited(token_data["sub"]):
+        raise HTTPException(
+            status_code=429,
+            detail="Too many requests"
+        )
+
+    return await coalescer.run(
+        "ids_get",
+        coalescer.key_for(request, token_data["access_token"]),
+        lambda: forward_get(id_service, f"/api/ids/{id}", token_data, request)
+    )
+
 @app.post("/api/institutional-ids")
 async def create_institutional_id(
     request: Request,
@@ -96,40 +186,93 @@ async def create_institutional_id(
             detail="Insufficient permissions"
         )
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"{settings.ID_SERVICE_URL}/institutional-ids",
-            json=await request.json(),
-            headers={"Authorization": f"Bearer {token_data['access_token']}"}
-        )
-        return JSONResponse(
-            status_code=response.status_code,
-            content=response.json()
-        )
+    response = await id_service.post(
+        "/institutional-ids",
+        json=await request.json(),
+        headers={"Authorization": f"Bearer {token_data['access_token']}"}
+    )
+    return JSONResponse(
+        status_code=response.status_code,
+        content=response.json(),
+        headers={name: response.headers[name] for name in FORWARDED_HEADERS if name in response.headers}
+    )
+
+# Credential verification
+@app.get("/api/credentials/verify")
+async def verify_credential(credential: str):
+    """Verify a single scanned credential"""
+    response = await id_service.get("/api/credentials/verify", params={"credential": credential})
+    return JSONResponse(
+        status_code=response.status_code,
+        content=response.json(),
+        headers={name: response.headers[name] for name in ("cache-control",) if name in response.headers}
+    )
+
+@app.post("/api/credentials/verify")
+async def verify_credentials(request: Request):
+    """Verify a batch of scanned credentials"""
+    response = await id_service.post("/api/credentials/verify", json=await request.json())
+    return JSONResponse(
+        status_code=response.status_code,
+        content=response.json()
+    )
+
+# Admin Routes
+@app.get("/api/admin/reports")
+async def admin_reports(request: Request, token_data: dict = Depends(get_token_header)):
+    """Forward report generation to auth service"""
+    response = await auth_service.get(
+        "/admin/reports",
+        params=dict(request.query_params),
+        headers={"Authorization": f"Bearer {token_data['access_token']}"}
+    )
+    return JSONResponse(
+        status_code=response.status_code,
+        content=response.json()
+    )
+
+@app.get("/limits", include_in_schema=False)
+async def concurrency_limits():
+    return concurrency_guard.snapshot()
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    return metrics_response(request)
 
 # Health check endpoint
 @app.get("/health")
 async def health_check():
     """Check health of all services"""
-    services = {
-        "auth": settings.AUTH_SERVICE_URL,
-        "user": settings.USER_SERVICE_URL,
-        "id": settings.ID_SERVICE_URL
-    }
-    
-    health_status = {}
-    async with httpx.AsyncClient() as client:
-        for service, url in services.items():
-            try:
-                response = await client.get(f"{url}/health")
-                health_status[service] = {
-                    "status": "healthy" if response.status_code == 200 else "unhealthy",
-                    "details": response.json()
-                }
-            except Exception as e:
-                health_status[service] = {
-                    "status": "unhealthy",
-                    "error": str(e)
-                }
-    
-    return health_status 
\ No newline at end of file
+    async def check(upstream):
+        try:
+            response = await upstream.get("/health")
+            return {
+                "status": "healthy" if response.status_code == 200 else "unhealthy",
+                "details": response.json(),
+                "endpoints": upstream.endpoints.snapshot()
+            }
+        except Exception as e:
+            return {
+                "status": "unhealthy",
+                "error": str(e),
+                "endpoints": upstream.endpoints.snapshot()
+            }
+
+    results = await asyncio.gather(*(check(upstream) for upstream in UPSTREAMS.values()))
+    return dict(zip(UPSTREAMS.keys(), results))
+
+@app.on_event("startup")
+async def resolve_upstreams():
+    for upstream in UPSTREAMS.values():
+        await upstream.endpoints.resolve()
+        upstream.endpoints.start()
+    loop_monitor.start()
+
+@app.on_event("shutdown")
+async def close_upstreams():
+    for upstream in UPSTREAMS.values():
+        await upstream.endpoints.stop()
+        await upstream.aclose() 
+    await loop_monitor.stop()
+    shutdown_tracing()
+    shutdown_logging()
@@ -0,0 +1,11 @@
+import os
+import sys
+from pathlib import Path
+
+SERVICE_DIR = Path(__file__).resolve().parents[1]
+
+# app.* lives in the service directory and shared.* one level up, as in the containers
+sys.path[:0] = [str(SERVICE_DIR), str(SERVICE_DIR.parent)]
+
+# Settings read these at import; nothing here connects to them
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+
+from app.core.limiter import AdaptiveLimiter, ConcurrencyGuard, Priority, PRIORITY_SHARE
+
+def _admitted(limiter: AdaptiveLimiter, priority: Priority) -> int:
+    admitted = 0
+    while limiter.try_acquire(priority):
+        admitted += 1
+    return admitted
+
+def _request(method: str, path: str):
+    return SimpleNamespace(method=method, url=SimpleNamespace(path=path))
+
+def test_each_class_fills_its_share_of_the_limit():
+    for priority, share in PRIORITY_SHARE.items():
+        limiter = AdaptiveLimiter(f"share-{priority.name}", initial_limit=10, min_limit=1)
+        assert _admitted(limiter, priority) == int(10 * share)
+
+def test_bulk_is_shed_while_critical_is_still_admitted():
+    limiter = AdaptiveLimiter("mixed", initial_limit=10, min_limit=1)
+    assert _admitted(limiter, Priority.BULK) == 5
+    assert _admitted(limiter, Priority.NORMAL) == 3
+    assert not limiter.try_acquire(Priority.BULK)
+    assert _admitted(limiter, Priority.CRITICAL) == 2
+    assert limiter.inflight == 10
+
+def test_release_frees_a_slot():
+    limiter = AdaptiveLimiter("release", initial_limit=4, min_limit=1)
+    assert _admitted(limiter, Priority.CRITICAL) == 4
+    limiter.release(None)
+    assert limiter.try_acquire(Priority.CRITICAL)
+
+def test_at_least_one_request_is_always_admitted():
+    limiter = AdaptiveLimiter("tiny", initial_limit=1, min_limit=1)
+    assert limiter.try_acquire(Priority.BULK)
+
+def test_overload_cuts_the_limit_but_not_below_the_minimum():
+    limiter = AdaptiveLimiter("overload", initial_limit=10, min_limit=8, backoff=0.5)
+    limiter.try_acquire(Priority.NORMAL)
+    limiter.release(None, overloaded=True)
+    assert limiter.limit == 8
+
+def test_routes_to_one_upstream_share_its_limiter():
+    guard = ConcurrencyGuard(
+        [
+            ("POST", "/api/auth/login", "auth", Priority.CRITICAL),
+            ("GET", "/api/admin/reports", "auth", Priority.BULK),
+            ("GET", "/api/ids/", "id", Priority.NORMAL),
+        ],
+        initial_limit=10,
+        min_limit=1
+    )
+    assert guard.classify(_request("GET", "/api/admin/reports")) == ("auth", Priority.BULK)
+    assert guard.classify(_request("POST", "/api/auth/login")) == ("auth", Priority.CRITICAL)
+    assert guard.classify(_request("GET", "/api/auth/login")) is None
+
+    auth = guard.limiter_for("auth")
+    assert _admitted(auth, Priority.BULK) == 5
+    # Login is admitted against the same limiter the reports filled
+    assert guard.limiter_for("auth") is auth
+    assert _admitted(auth, Priority.CRITICAL) == 5
+    assert guard.limiter_for("id") is not auth
+    assert set(guard.snapshot()) == {"auth", "id"}
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, Security, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.core.auth import get_current_user, require_super_admin
 from app.core.auth.jwt import get_password_hash
 from app.core.schemas.admin import (
@@ -21,7 +21,7 @@ router = APIRouter()
 async def create_institutional_admin(
     admin: InstitutionalAdminCreate,
     current_user: User = Security(get_current_user, scopes=["super_admin"]),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     """Create a new institutional admin (Super Admin only)"""
     # Verify institution exists
@@ -61,8 +61,7 @@ async def create_institutional_admin(
         db_admin.roles.append(admin_role)
     
     db.add(db_admin)
-    await db.commit()
-    await db.refresh(db_admin)
+    await db.flush()
     
     return db_admin
 
@@ -71,7 +70,7 @@ async def list_institutions(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
     current_user: User = Security(get_current_user, scopes=["super_admin"]),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """List all institutions"""
     result = await db.execute(
@@ -87,7 +86,8 @@ async def generate_reports(
     start_date: date,
     end_date: date,
     current_user: User = Security(get_current_user, scopes=["super_admin"]),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function"),
+    read_db: AsyncSession = Depends(get_read_db)
 ):
     """Generate system reports"""
     if start_date > end_date:
@@ -100,7 +100,7 @@ async def generate_reports(
     
     # Gather data based on report type
     if report_type == "user_registrations":
-        result = await db.execute(
+        result = await read_db.execute(
             select(User)
             .join(Role, User.roles)
             .where(
@@ -119,7 +119,7 @@ async def generate_reports(
             report_data["by_institution"][inst_id] = report_data["by_institution"].get(inst_id, 0) + 1
     
     elif report_type == "institutional_activity":
-        result = await db.execute(
+        result = await read_db.execute(
             select(Institution)
             .where(Institution.is_active == True)
         )
@@ -132,7 +132,7 @@ async def generate_reports(
         }
         
         # Get admin counts
-        admin_result = await db.execute(
+        admin_result = await read_db.execute(
             select(User)
             .join(Role, User.roles)
             .where(
@@ -150,8 +150,7 @@ async def generate_reports(
     )
     
     db.add(report)
-    await db.commit()
-    await db.refresh(report)
+    await db.flush()
     
     return report
 
@@ -160,7 +159,7 @@ async def suspend_institution(
     institution_id: int,
     reason: str,
     current_user: User = Security(get_current_user, scopes=["super_admin"]),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     """Suspend an institution and its admins"""
     institution = await db.get(Institution, institution_id)
@@ -185,7 +184,5 @@ async def suspend_institution(
     
     for admin in admins:
         admin.is_active = False
-
-    await db.commit()
     
     return {"message": "Institution and its admins have been suspended"} 
\ No newline at end of file
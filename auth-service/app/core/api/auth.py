@@ -1,20 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.core.database import get_db
-from app.core.models import User
+from app.core.models import User, Role
+from app.core.models.user import user_roles
 from app.core.auth.jwt import create_access_token, verify_password, get_current_user
 from app.core.schemas.auth import Token, UserResponse
 from datetime import timedelta
 from app.core.config import settings
+from shared.conditional import make_etag, not_modified
 
 router = APIRouter()
 
 @router.post("/token", response_model=Token)
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     """Login to get access token"""
     # Find user
@@ -47,6 +49,30 @@ async def login(
     }
 
 @router.get("/me", response_model=UserResponse)
-async def read_users_me(current_user: User = Depends(get_current_user)):
+async def read_users_me(
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db, scope="function")
+):
     """Get current user information"""
-    return current_user 
\ No newline at end of file
+    # Role grants do not touch users.updated_at, so the role set is part of the validator
+    result = await db.execute(
+        select(Role.name)
+        .join(user_roles, user_roles.c.role_id == Role.id)
+        .where(user_roles.c.user_id == current_user.id)
+    )
+    roles = sorted(result.scalars())
+    etag = make_etag("auth_user", current_user.id, current_user.updated_at, ",".join(roles))
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+    return UserResponse(
+        id=current_user.id,
+        username=current_user.username,
+        email=current_user.email,
+        institution_id=current_user.institution_id,
+        is_active=current_user.is_active,
+        created_at=current_user.created_at,
+        roles=roles
+    ) 
\ No newline at end of file
@@ -10,7 +10,8 @@ from .jwt import (
 )
 from .permissions import (
     Permissions,
-    has_permission,
+    require_permissions,
+    policy,
     require_institution_admin,
     check_institution_access,
     ROLE_PERMISSIONS
@@ -26,7 +27,8 @@ __all__ = [
     "get_password_hash",
     "create_access_token",
     "Permissions",
-    "has_permission",
+    "require_permissions",
+    "policy",
     "require_institution_admin",
     "check_institution_access",
     "ROLE_PERMISSIONS"
@@ -9,6 +9,7 @@ from app.core.database import get_db
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.core.config import settings
+from shared.logs import bind
 
 # Configuration
 SECRET_KEY = settings.JWT_SECRET_KEY
@@ -46,7 +47,7 @@ async def create_access_token(data: Dict[str, Any], expires_delta: Optional[time
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ) -> User:
     """Get current user from token"""
     credentials_exception = HTTPException(
@@ -74,6 +75,7 @@ async def get_current_user(
     
     if user is None:
         raise credentials_exception
+    bind(user_id=user.id)
     return user
 
 def require_role(role: UserRole):
@@ -2,6 +2,7 @@ from fastapi import Depends, HTTPException, status
 from typing import List, Callable
 from functools import wraps
 from app.core.models import User, UserRole
+from shared.policy import PolicyEngine, forbidden
 from .jwt import get_current_user
 
 class Permissions:
@@ -48,20 +49,19 @@ ROLE_PERMISSIONS = {
     ]
 }
 
-def has_permission(required_permissions: List[str]):
-    """Decorator to check if user has required permissions"""
-    def decorator(func: Callable):
-        @wraps(func)
-        async def wrapper(*args, current_user: User = Depends(get_current_user), **kwargs):
-            user_permissions = current_user.permissions
-            if not all(perm in user_permissions for perm in required_permissions):
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Not enough permissions"
-                )
-            return await func(*args, current_user=current_user, **kwargs)
-        return wrapper
-    return decorator
+# Compiled once at import; routes compile their own requirement when declared
+policy = PolicyEngine(ROLE_PERMISSIONS, superuser_roles=[UserRole.SUPER_ADMIN])
+
+def require_permissions(*required_permissions: str):
+    """Dependency that checks the caller's stored permissions against a precompiled requirement"""
+    check = policy.requirement(*required_permissions)
+
+    async def dependency(current_user: User = Depends(get_current_user)) -> User:
+        # Granted by the user's permissions alone, as before; roles imply nothing here
+        if not check((), current_user.permissions):
+            raise forbidden()
+        return current_user
+    return dependency
 
 async def check_institution_access(user: User, institution_id: int) -> bool:
     """Check if user has access to institution"""
@@ -1,3 +1,7 @@
 from sqlalchemy.ext.declarative import declarative_base
 
-Base = declarative_base()
\ No newline at end of file
+class _Base:
+    # Fetch server-generated values with RETURNING during flush instead of refreshing afterwards
+    __mapper_args__ = {"eager_defaults": True}
+
+Base = declarative_base(cls=_Base)
\ No newline at end of file
@@ -1,42 +1,18 @@
 from fastapi import FastAPI, Request
-from prometheus_client import Counter, Histogram, generate_latest
-from prometheus_fastapi_instrumentator import Instrumentator
+from shared.metrics import metrics_response
 import time
 import logging
 from typing import Callable
-import json
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-# Prometheus metrics
-REQUEST_COUNT = Counter(
-    "http_request_count_total",
-    "Total count of HTTP requests",
-    ["method", "endpoint", "status_code"]
-)
-
-REQUEST_LATENCY = Histogram(
-    "http_request_latency_seconds",
-    "HTTP request latency in seconds",
-    ["method", "endpoint"]
-)
-
-ERROR_COUNT = Counter(
-    "http_error_count_total",
-    "Total count of HTTP errors",
-    ["method", "endpoint", "error_type"]
-)
-
 def init_monitoring(app: FastAPI):
-    """Initialize monitoring for the FastAPI app"""
-    
-    # Initialize Prometheus metrics
-    Instrumentator().instrument(app).expose(app)
-    
-    @app.get("/metrics")
-    async def metrics():
-        return generate_latest()
+    """Expose /metrics and /health; request metrics come from shared.metrics"""
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics(request: Request):
+        return metrics_response(request)
     
     @app.get("/health")
     async def health_check():
@@ -47,37 +23,14 @@ def init_monitoring(app: FastAPI):
         }
 
 async def log_request_middleware(request: Request, call_next: Callable):
-    """Middleware to log requests and collect metrics"""
+    """One access log line per request; request id and route come from shared.logs"""
     start_time = time.time()
     method = request.method
     path = request.url.path
     
-    # Log request
-    logger.info(
-        f"Request started",
-        extra={
-            "method": method,
-            "path": path,
-            "client_ip": request.client.host,
-            "user_agent": request.headers.get("user-agent")
-        }
-    )
-    
     try:
         response = await call_next(request)
         
-        # Update metrics
-        REQUEST_COUNT.labels(
-            method=method,
-            endpoint=path,
-            status_code=response.status_code
-        ).inc()
-        
-        REQUEST_LATENCY.labels(
-            method=method,
-            endpoint=path
-        ).observe(time.time() - start_time)
-        
         # Log response
         logger.info(
             f"Request completed",
@@ -85,7 +38,9 @@ async def log_request_middleware(request: Request, call_next: Callable):
                 "method": method,
                 "path": path,
                 "status_code": response.status_code,
-                "duration": time.time() - start_time
+                "duration": time.time() - start_time,
+                "client_ip": request.client.host if request.client else None,
+                "user_agent": request.headers.get("user-agent")
             }
         )
         
@@ -103,12 +58,4 @@ async def log_request_middleware(request: Request, call_next: Callable):
             },
             exc_info=True
         )
-        
-        # Update error metrics
-        ERROR_COUNT.labels(
-            method=method,
-            endpoint=path,
-            error_type=type(e).__name__
-        ).inc()
-        
-        raise 
\ No newline at end of file
+        raise
@@ -4,14 +4,27 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.docs import get_swagger_ui_html, get_redoc_html
 from fastapi.staticfiles import StaticFiles
+from shared.compression import CompressionMiddleware
+from shared.unit_of_work import query_count_middleware
+from shared.metrics import RequestMetricsMiddleware
+from shared.logs import RequestContextMiddleware, configure_logging, shutdown_logging
+from shared.tracing import TracingMiddleware, configure_tracing, shutdown_tracing
+from shared.profiling import LoopMonitor, ProfilingMiddleware, profiling_router
 from app.core.api import auth, admin
-from app.core.database import engine
-from app.core.models.base import Base
+from app.core.config import settings
+from app.core.database import engine, read_router, schema
 import logging
 from app.core.monitoring import init_monitoring, log_request_middleware
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Non-blocking JSON logs; configured before anything else logs
+configure_logging("auth-service", settings.LOG_LEVEL, settings.LOG_INFO_SAMPLE_RATE, settings.LOG_QUEUE_SIZE)
+configure_tracing(
+    "auth-service",
+    settings.TRACE_EXPORTER,
+    settings.TRACE_FILE_PATH,
+    settings.TRACE_HEAD_SAMPLE_RATE,
+    settings.TRACE_TAIL_LATENCY_MS
+)
 logger = logging.getLogger(__name__)
 
 app = FastAPI(
@@ -22,6 +35,15 @@ app = FastAPI(
     redoc_url=None  # Disable default redoc
 )
 
+# Event-loop lag and the stack of any callback that blocks it
+loop_monitor = LoopMonitor("auth-service", settings.LOOP_STALL_THRESHOLD_MS / 1000)
+
+# Admin profiling under /debug when PROFILING_TOKEN is set; registered first so
+# the middleware is innermost and runs in the endpoint's task
+if settings.PROFILING_TOKEN:
+    app.add_middleware(ProfilingMiddleware, token=settings.PROFILING_TOKEN)
+    app.include_router(profiling_router(settings.PROFILING_TOKEN, loop_monitor), prefix="/debug")
+
 # Initialize monitoring
 init_monitoring(app)
 
@@ -34,9 +56,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Negotiated zstd/br/gzip for bodies over 1 KiB
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+# Return X-Min-LSN on writes so follow-up reads can avoid stale replicas
+app.middleware("http")(read_router.middleware())
+
+# X-DB-Query-Count and db_queries_per_request make N+1 regressions visible
+app.middleware("http")(query_count_middleware("auth-service"))
+
 # Add request logging middleware
 app.middleware("http")(log_request_middleware)
 
+# Server span per request, continuing the caller's traceparent; inside the request context
+app.add_middleware(TracingMiddleware)
+
+# Request id and route on every log record; inside the metrics middleware
+app.add_middleware(RequestContextMiddleware)
+
+# Latency by route template; registered last so it times the whole stack
+app.add_middleware(RequestMetricsMiddleware, service="auth-service")
+
 # Mount static files for custom docs
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
@@ -61,8 +101,17 @@ async def redoc_html():
 @app.on_event("startup")
 async def startup():
     logger.info("Starting up Auth Service")
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    # One revision check; migrations run as a separate job (python -m app.migrate)
+    await schema.prepare(engine, settings.DB_SCHEMA_MODE)
+    read_router.start()
+    loop_monitor.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await read_router.stop()
+    await loop_monitor.stop()
+    shutdown_tracing()
+    shutdown_logging()
 
 # Include routers
 app.include_router(
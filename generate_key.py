@@ -1,4 +1,7 @@
 from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+import base64
 import secrets
 
 def generate_encryption_key():
@@ -15,7 +18,21 @@ def generate_jwt_secret_key():
     print("\nAdd this to your .env file as:")
     print(f"JWT_SECRET_KEY={key}")
 
+def generate_credential_signing_key():
+    # Ed25519 private seed used by id-service to sign offline-verifiable credentials.
+    seed = Ed25519PrivateKey.generate().private_bytes(
+        encoding=serialization.Encoding.Raw,
+        format=serialization.PrivateFormat.Raw,
+        encryption_algorithm=serialization.NoEncryption()
+    )
+    key = base64.urlsafe_b64encode(seed).rstrip(b"=").decode()
+    print(f"Generated Credential Signing Key: {key}")
+    print("\nAdd this to your id-service .env file as:")
+    print(f"CREDENTIAL_SIGNING_KEY={key}")
+
 if __name__ == "__main__":
     generate_encryption_key()
     print("\n" + "="*60 + "\n")
     generate_jwt_secret_key()
+    print("\n" + "="*60 + "\n")
+    generate_credential_signing_key()
@@ -0,0 +1,56 @@
+from logging.config import fileConfig
+from sqlalchemy import create_engine
+from sqlalchemy import pool
+from alembic import context
+from app.core.models import Base
+from app.core.config import settings
+from shared.migrations import version_table
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = config.attributes.get("metadata", Base.metadata)
+# Services share one database, so each keeps its revision in its own table
+VERSION_TABLE = config.attributes.get("version_table", version_table("id-service"))
+
+def _sync_url() -> str:
+    return settings.DATABASE_URL.replace("+asyncpg", "", 1)
+
+def run_migrations_offline() -> None:
+    context.configure(
+        url=_sync_url(),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        version_table=VERSION_TABLE,
+        dialect_opts={"paramstyle": "named"},
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online() -> None:
+    # shared.migrations passes its connection, which holds the advisory lock
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        context.configure(connection=connection, target_metadata=target_metadata, version_table=VERSION_TABLE)
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
+    connectable = create_engine(_sync_url(), poolclass=pool.NullPool)
+    with connectable.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            version_table=VERSION_TABLE
+        )
+
+        with context.begin_transaction():
+            context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
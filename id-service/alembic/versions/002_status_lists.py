@@ -0,0 +1,55 @@
+"""status lists
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table(
+        'status_lists',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(20), nullable=False),
+        sa.Column('institution_id', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('version', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('size', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('bits', sa.LargeBinary(), nullable=False, server_default=sa.text("''::bytea")),
+        sa.Column('updated_at', sa.DateTime(), default=sa.func.now()),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('kind', 'institution_id', name='uq_status_lists_kind_institution')
+    )
+    op.create_index('ix_status_lists_id', 'status_lists', ['id'])
+
+    op.create_table(
+        'status_list_deltas',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('status_list_id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('index', sa.Integer(), nullable=False),
+        sa.Column('revoked', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), default=sa.func.now()),
+        sa.ForeignKeyConstraint(['status_list_id'], ['status_lists.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_status_list_deltas_id', 'status_list_deltas', ['id'])
+    op.create_index('ix_status_list_deltas_list_version', 'status_list_deltas', ['status_list_id', 'version'])
+
+    op.add_column('digital_ids', sa.Column('status_list_index', sa.Integer()))
+    op.add_column('institutional_ids', sa.Column('status_list_index', sa.Integer()))
+
+def downgrade() -> None:
+    op.drop_column('institutional_ids', 'status_list_index')
+    op.drop_column('digital_ids', 'status_list_index')
+    op.drop_index('ix_status_list_deltas_list_version')
+    op.drop_index('ix_status_list_deltas_id')
+    op.drop_table('status_list_deltas')
+    op.drop_index('ix_status_lists_id')
+    op.drop_table('status_lists')
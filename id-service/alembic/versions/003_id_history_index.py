@@ -0,0 +1,23 @@
+"""id history composite index
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_id_history_digital_id_changed_at',
+        'id_history',
+        ['digital_id_id', 'changed_at', 'id']
+    )
+
+def downgrade() -> None:
+    op.drop_index('ix_id_history_digital_id_changed_at')
@@ -0,0 +1,21 @@
+"""digital id row version
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column('digital_ids', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute("UPDATE digital_ids SET updated_at = issued_at")
+
+def downgrade() -> None:
+    op.drop_column('digital_ids', 'updated_at')
@@ -0,0 +1,47 @@
+"""status list index sequences
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # One sequence per list, continuing after the indexes already assigned;
+    # size now records how many indexes the bitstring covers
+    op.execute("""
+        DO $$
+        DECLARE
+            list record;
+        BEGIN
+            FOR list IN SELECT id, size FROM status_lists LOOP
+                EXECUTE format('CREATE SEQUENCE status_list_%s_seq MINVALUE 0 START %s', list.id, list.size);
+            END LOOP;
+        END
+        $$
+    """)
+    op.execute("UPDATE status_lists SET size = length(bits) * 8")
+
+def downgrade() -> None:
+    op.execute("""
+        DO $$
+        DECLARE
+            list record;
+        BEGIN
+            FOR list IN SELECT id FROM status_lists LOOP
+                EXECUTE format(
+                    'UPDATE status_lists SET size = (SELECT CASE WHEN is_called THEN last_value + 1 ELSE last_value END '
+                    'FROM status_list_%s_seq) WHERE id = %s',
+                    list.id, list.id
+                );
+                EXECUTE format('DROP SEQUENCE status_list_%s_seq', list.id);
+            END LOOP;
+        END
+        $$
+    """)
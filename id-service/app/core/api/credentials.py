@@ -0,0 +1,94 @@
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.models import DigitalID, StatusListKind
+from app.core.models.digital_id import IDStatus
+from app.core.credentials import credential_signer, CredentialError
+from app.core.status_list import status_list_cache
+from app.core.schemas.credential import (
+    CredentialVerifyRequest, CredentialVerification, PublicKeySet
+)
+from datetime import datetime
+from typing import List
+
+router = APIRouter()
+
+# Verification results embed revocation state, so shared caches may only hold them briefly
+VERIFY_CACHE_SECONDS = 30
+KEYS_CACHE_SECONDS = 3600
+
+async def _verify(credentials: List[str], db: AsyncSession) -> List[CredentialVerification]:
+    """Check signatures statelessly, then resolve revocation from the cached status lists"""
+    outcomes = await credential_signer.verify_many(credentials)
+
+    revoked = {}
+    unlisted_ids = set()
+    for claims in outcomes:
+        if isinstance(claims, CredentialError):
+            continue
+        snapshot = None
+        if claims.get("sli") is not None:
+            snapshot = await status_list_cache.get(db, StatusListKind.DIGITAL, claims.get("inst"))
+        if snapshot is None:
+            unlisted_ids.add(claims["id"])
+        else:
+            revoked[claims["id"]] = snapshot.is_revoked(claims["sli"])
+
+    # Credentials issued before status lists existed fall back to one batched row lookup
+    statuses = {}
+    if unlisted_ids:
+        result = await db.execute(
+            select(DigitalID.id, DigitalID.status).where(DigitalID.id.in_(unlisted_ids))
+        )
+        statuses = dict(result.all())
+        for id_pk in unlisted_ids:
+            revoked[id_pk] = statuses.get(id_pk) != IDStatus.ACTIVE
+
+    verifications = []
+    for claims in outcomes:
+        if isinstance(claims, CredentialError):
+            verifications.append(CredentialVerification(valid=False, reason=str(claims)))
+            continue
+
+        is_revoked = revoked[claims["id"]]
+        verifications.append(CredentialVerification(
+            valid=not is_revoked,
+            reason="Digital ID is not active" if is_revoked else None,
+            digital_id=claims["id"],
+            id_number=claims["num"],
+            status=statuses.get(claims["id"]),
+            expires_at=datetime.utcfromtimestamp(claims["exp"])
+        ))
+    return verifications
+
+@router.get("/keys", response_model=PublicKeySet)
+async def get_public_keys(response: Response):
+    """Public key set for offline credential verification"""
+    response.headers["Cache-Control"] = f"public, max-age={KEYS_CACHE_SECONDS}"
+    return {"keys": credential_signer.public_keys()}
+
+@router.get("/verify", response_model=CredentialVerification)
+async def verify_credential(
+    credential: str,
+    response: Response,
+    db: AsyncSession = Depends(get_db, scope="function")
+):
+    """Verify a single scanned credential"""
+    verifications = await _verify([credential], db)
+    response.headers["Cache-Control"] = f"public, max-age={VERIFY_CACHE_SECONDS}"
+    return verifications[0]
+
+@router.post("/verify", response_model=List[CredentialVerification])
+async def verify_credentials(
+    request: CredentialVerifyRequest,
+    db: AsyncSession = Depends(get_db, scope="function")
+):
+    """Verify a batch of scanned credentials"""
+    if len(request.credentials) > settings.CREDENTIAL_VERIFY_MAX_BATCH:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.CREDENTIAL_VERIFY_MAX_BATCH} credentials per request"
+        )
+    return await _verify(request.credentials, db)
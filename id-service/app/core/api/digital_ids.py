@@ -1,61 +1,154 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from app.core.database import get_db
-from app.core.models import DigitalID, IDHistory
+from sqlalchemy import select, func, tuple_
+from sqlalchemy.orm import aliased
+from app.core.database import get_db, get_read_db, read_router
+from app.core.models import DigitalID, IDHistory, StatusListKind
+from app.core.models.digital_id import IDStatus
 from app.core.schemas.digital_id import (
     DigitalIDCreate, DigitalIDResponse, DigitalIDUpdate,
     DigitalIDStatusUpdate, IDHistoryEntry
 )
-from app.core.auth import get_current_user, has_permission
+from app.core.schemas.credential import CredentialResponse
+from app.core.credentials import credential_signer
+from app.core.status_list import assign_index, set_revoked
+from app.core.cache import (
+    digital_id_cache, digital_id_key, digital_id_number_key,
+    serialize_row, invalidate_digital_id
+)
+from app.core.auth import require_permissions
 from app.core.auth.permissions import Permissions
-from typing import List, Optional
+from shared.conditional import make_etag, not_modified
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
+import base64
 
 router = APIRouter()
 
 @router.post("/", response_model=DigitalIDResponse)
-@has_permission([Permissions.CREATE_ID])
 async def create_digital_id(
     digital_id: DigitalIDCreate,
-    db: AsyncSession = Depends(get_db),
-    current_user = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db, scope="function"),
+    current_user = Depends(require_permissions(Permissions.CREATE_ID))
 ):
     """Create a new digital ID"""
     new_id = DigitalID(
         **digital_id.dict(),
         issuer_id=current_user.id
     )
+    new_id.status_list_index = await assign_index(
+        db, StatusListKind.DIGITAL, new_id.institution_id
+    )
     
     db.add(new_id)
-    await db.commit()
-    await db.refresh(new_id)
+    await db.flush()
+
+    # Issue the offline-verifiable credential alongside the new ID
+    new_id.credential = credential_signer.issue(new_id)
     return new_id
 
+async def _load_digital_id(*criteria) -> Optional[dict]:
+    # The result is cached for every client, so it comes from the primary: a
+    # lagging replica could put back a row that a revocation just invalidated
+    async with read_router.primary_session() as db:
+        result = await db.execute(select(DigitalID).filter(*criteria))
+        digital_id = result.scalar_one_or_none()
+        return serialize_row(digital_id) if digital_id else None
+
+@router.get("/by-number/{id_number}", response_model=DigitalIDResponse)
+async def get_digital_id_by_number(
+    id_number: str,
+    request: Request,
+    response: Response,
+    current_user = Depends(require_permissions(Permissions.READ_ID))
+):
+    """Get a digital ID by its printed ID number"""
+    digital_id = await digital_id_cache.get_or_load(
+        digital_id_number_key(id_number),
+        lambda: _load_digital_id(DigitalID.id_number == id_number)
+    )
+
+    if not digital_id:
+        raise HTTPException(status_code=404, detail="Digital ID not found")
+
+    etag = make_etag("digital_id", digital_id["id"], digital_id.get("updated_at"))
+    return not_modified(request, response, etag) or digital_id
+
 @router.get("/{id}", response_model=DigitalIDResponse)
-@has_permission([Permissions.READ_ID])
 async def get_digital_id(
     id: int,
-    db: AsyncSession = Depends(get_db),
-    current_user = Depends(get_current_user)
+    request: Request,
+    response: Response,
+    current_user = Depends(require_permissions(Permissions.READ_ID))
 ):
     """Get a digital ID by ID"""
-    result = await db.execute(select(DigitalID).filter(DigitalID.id == id))
-    digital_id = result.scalar_one_or_none()
+    digital_id = await digital_id_cache.get_or_load(
+        digital_id_key(id),
+        lambda: _load_digital_id(DigitalID.id == id)
+    )
     
     if not digital_id:
         raise HTTPException(status_code=404, detail="Digital ID not found")
     
-    return digital_id
+    etag = make_etag("digital_id", digital_id["id"], digital_id.get("updated_at"))
+    return not_modified(request, response, etag) or digital_id
+
+@router.get("/{id}/credential", response_model=CredentialResponse)
+async def get_digital_id_credential(
+    id: int,
+    db: AsyncSession = Depends(get_db, scope="function"),
+    current_user = Depends(require_permissions(Permissions.READ_ID))
+):
+    """Re-issue the signed credential for a digital ID"""
+    result = await db.execute(select(DigitalID).filter(DigitalID.id == id))
+    digital_id = result.scalar_one_or_none()
+
+    if not digital_id:
+        raise HTTPException(status_code=404, detail="Digital ID not found")
+
+    return CredentialResponse(
+        credential=credential_signer.issue(digital_id),
+        kid=credential_signer.key_id,
+        expires_at=digital_id.expires_at
+    )
+
+async def _latest_history(
+    db: AsyncSession,
+    digital_id_ids: List[int],
+    per_id: int
+) -> Dict[int, List[IDHistory]]:
+    """Latest history entries for many IDs in one window-function query"""
+    ranked = (
+        select(
+            IDHistory,
+            func.row_number().over(
+                partition_by=IDHistory.digital_id_id,
+                order_by=(IDHistory.changed_at.desc(), IDHistory.id.desc())
+            ).label("rank")
+        )
+        .where(IDHistory.digital_id_id.in_(digital_id_ids))
+        .subquery()
+    )
+    history = aliased(IDHistory, ranked)
+    result = await db.execute(
+        select(history)
+        .where(ranked.c.rank <= per_id)
+        .order_by(ranked.c.digital_id_id, ranked.c.rank)
+    )
+
+    entries: Dict[int, List[IDHistory]] = {}
+    for entry in result.scalars():
+        entries.setdefault(entry.digital_id_id, []).append(entry)
+    return entries
 
 @router.get("/", response_model=List[DigitalIDResponse])
-@has_permission([Permissions.READ_ID])
 async def list_digital_ids(
     skip: int = 0,
     limit: int = 100,
     institution_id: Optional[int] = None,
-    db: AsyncSession = Depends(get_db),
-    current_user = Depends(get_current_user)
+    history_limit: int = Query(0, ge=0, le=20, description="Embed the latest N history entries per ID"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user = Depends(require_permissions(Permissions.READ_ID))
 ):
     """List digital IDs"""
     query = select(DigitalID).offset(skip).limit(limit)
@@ -64,15 +157,21 @@ async def list_digital_ids(
         query = query.filter(DigitalID.institution_id == institution_id)
     
     result = await db.execute(query)
-    return result.scalars().all()
+    digital_ids = [serialize_row(row) for row in result.scalars()]
+
+    if history_limit and digital_ids:
+        history = await _latest_history(db, [row["id"] for row in digital_ids], history_limit)
+        for row in digital_ids:
+            row["history"] = history.get(row["id"], [])
+
+    return digital_ids
 
 @router.patch("/{id}", response_model=DigitalIDResponse)
-@has_permission([Permissions.UPDATE_ID])
 async def update_digital_id(
     id: int,
     update_data: DigitalIDUpdate,
-    db: AsyncSession = Depends(get_db),
-    current_user = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db, scope="function"),
+    current_user = Depends(require_permissions(Permissions.UPDATE_ID))
 ):
     """Update a digital ID"""
     result = await db.execute(select(DigitalID).filter(DigitalID.id == id))
@@ -83,18 +182,23 @@ async def update_digital_id(
     
     for field, value in update_data.dict(exclude_unset=True).items():
         setattr(digital_id, field, value)
+
+    if update_data.status is not None:
+        await set_revoked(
+            db, StatusListKind.DIGITAL, digital_id.institution_id,
+            digital_id.status_list_index, update_data.status != IDStatus.ACTIVE
+        )
     
     await db.commit()
-    await db.refresh(digital_id)
+    await invalidate_digital_id(digital_id)
     return digital_id
 
 @router.post("/{id}/status", response_model=DigitalIDResponse)
-@has_permission([Permissions.UPDATE_ID])
 async def update_id_status(
     id: int,
     status_update: DigitalIDStatusUpdate,
-    db: AsyncSession = Depends(get_db),
-    current_user = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db, scope="function"),
+    current_user = Depends(require_permissions(Permissions.UPDATE_ID))
 ):
     """Update digital ID status"""
     result = await db.execute(select(DigitalID).filter(DigitalID.id == id))
@@ -114,21 +218,51 @@ async def update_id_status(
     
     digital_id.status = status_update.status
     db.add(history_entry)
+    await set_revoked(
+        db, StatusListKind.DIGITAL, digital_id.institution_id,
+        digital_id.status_list_index, status_update.status != IDStatus.ACTIVE
+    )
     await db.commit()
-    await db.refresh(digital_id)
+    await invalidate_digital_id(digital_id)
     return digital_id
 
+def _encode_history_cursor(entry: IDHistory) -> str:
+    raw = f"{entry.changed_at.isoformat()}|{entry.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def _decode_history_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        changed_at, entry_id = raw.split("|")
+        return datetime.fromisoformat(changed_at), int(entry_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid history cursor")
+
 @router.get("/{id}/history", response_model=List[IDHistoryEntry])
-@has_permission([Permissions.READ_ID])
 async def get_id_history(
     id: int,
-    db: AsyncSession = Depends(get_db),
-    current_user = Depends(get_current_user)
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user = Depends(require_permissions(Permissions.READ_ID))
 ):
-    """Get status history for a digital ID"""
-    result = await db.execute(
+    """Get status history for a digital ID, newest first"""
+    query = (
         select(IDHistory)
         .filter(IDHistory.digital_id_id == id)
-        .order_by(IDHistory.changed_at.desc())
+        .order_by(IDHistory.changed_at.desc(), IDHistory.id.desc())
+        .limit(limit + 1)
     )
-    return result.scalars().all() 
\ No newline at end of file
+    if cursor:
+        query = query.filter(
+            tuple_(IDHistory.changed_at, IDHistory.id) < _decode_history_cursor(cursor)
+        )
+
+    result = await db.execute(query)
+    entries = result.scalars().all()
+
+    if len(entries) > limit:
+        entries = entries[:limit]
+        response.headers["X-Next-Cursor"] = _encode_history_cursor(entries[-1])
+    return entries
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, Security, Query
+from fastapi import APIRouter, Depends, HTTPException, Security, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.core.database import get_db
@@ -8,11 +8,17 @@ from app.core.schemas.institutional_id import (
     InstitutionalIDResponse,
     LimitedUserResponse
 )
-from app.core.models import Institution, InstitutionalID, User
+from app.core.models import Institution, InstitutionalID, User, StatusListKind
+from app.core.status_list import assign_index, set_revoked
+from app.core.cache import (
+    institutional_id_cache, institutional_id_key,
+    serialize_row, invalidate_institutional_id
+)
 from typing import List
 from datetime import datetime
-import httpx
+from app.core.upstreams import user_service
 from shared.config import settings
+from shared.conditional import make_etag, not_modified
 
 router = APIRouter()
 
@@ -20,7 +26,7 @@ router = APIRouter()
 async def issue_institutional_id(
     institutional_id: InstitutionalIDCreate,
     current_user: User = Security(get_current_user, scopes=["institution"]),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     """Issue a new institutional ID"""
     # Verify institution is active
@@ -32,17 +38,16 @@ async def issue_institutional_id(
         )
 
     # Verify user exists and is active
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"{settings.USER_SERVICE_URL}/users/by-main-id/{institutional_id.main_id}",
-            headers={"Authorization": f"Bearer {current_user.access_token}"}
+    response = await user_service.get(
+        f"/users/by-main-id/{institutional_id.main_id}",
+        headers={"Authorization": f"Bearer {current_user.access_token}"}
+    )
+    if response.status_code != 200:
+        raise HTTPException(
+            status_code=404,
+            detail="User not found or inactive"
         )
-        if response.status_code != 200:
-            raise HTTPException(
-                status_code=404,
-                detail="User not found or inactive"
-            )
-        user_data = response.json()
+    user_data = response.json()
 
     # Check for existing active ID of same type
     result = await db.execute(
@@ -66,9 +71,12 @@ async def issue_institutional_id(
         status="active",
         created_by=current_user.id
     )
+    db_id.status_list_index = await assign_index(
+        db, StatusListKind.INSTITUTIONAL, current_user.institution_id
+    )
     db.add(db_id)
+    # Commit before telling user-service; expire_on_commit=False keeps db_id loaded
     await db.commit()
-    await db.refresh(db_id)
 
     # Update user's institutional_ids in user service
     user_update_data = {
@@ -82,10 +90,12 @@ async def issue_institutional_id(
         }
     }
 
-    await client.patch(
-        f"{settings.USER_SERVICE_URL}/users/{user_data['id']}/institutional-ids",
+    # The PATCH replaces the whole map, so repeating it is safe
+    await user_service.patch(
+        f"/users/{user_data['id']}/institutional-ids",
         json=user_update_data,
-        headers={"Authorization": f"Bearer {current_user.access_token}"}
+        headers={"Authorization": f"Bearer {current_user.access_token}"},
+        idempotent=True
     )
 
     return db_id
@@ -93,17 +103,25 @@ async def issue_institutional_id(
 @router.get("/institutional-ids/{id_number}", response_model=InstitutionalIDResponse)
 async def get_institutional_id(
     id_number: str,
+    request: Request,
+    response: Response,
     current_user: User = Security(get_current_user, scopes=["institution"]),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     """Get details of a specific institutional ID"""
-    result = await db.execute(
-        select(InstitutionalID).where(
-            InstitutionalID.id_number == id_number,
-            InstitutionalID.institution_id == current_user.institution_id
+    async def load():
+        result = await db.execute(
+            select(InstitutionalID).where(
+                InstitutionalID.id_number == id_number,
+                InstitutionalID.institution_id == current_user.institution_id
+            )
         )
+        id_record = result.scalar_one_or_none()
+        return serialize_row(id_record) if id_record else None
+
+    id_record = await institutional_id_cache.get_or_load(
+        institutional_id_key(current_user.institution_id, id_number), load
     )
-    id_record = result.scalar_one_or_none()
     
     if not id_record:
         raise HTTPException(
@@ -111,26 +129,26 @@ async def get_institutional_id(
             detail="Institutional ID not found"
         )
     
-    return id_record
+    etag = make_etag("institutional_id", id_record["id"], id_record.get("updated_at"))
+    return not_modified(request, response, etag) or id_record
 
 @router.get("/users/{main_id}", response_model=LimitedUserResponse)
 async def view_user_details(
     main_id: str,
     current_user: User = Security(get_current_user, scopes=["institution"]),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     """View limited user details"""
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"{settings.USER_SERVICE_URL}/users/by-main-id/{main_id}",
-            headers={"Authorization": f"Bearer {current_user.access_token}"}
+    response = await user_service.get(
+        f"/users/by-main-id/{main_id}",
+        headers={"Authorization": f"Bearer {current_user.access_token}"}
+    )
+    if response.status_code != 200:
+        raise HTTPException(
+            status_code=404,
+            detail="User not found"
         )
-        if response.status_code != 200:
-            raise HTTPException(
-                status_code=404,
-                detail="User not found"
-            )
-        user_data = response.json()
+    user_data = response.json()
 
     # Filter institutional IDs to only show this institution's IDs
     filtered_ids = {
@@ -151,7 +169,7 @@ async def revoke_institutional_id(
     id_number: str,
     reason: str,
     current_user: User = Security(get_current_user, scopes=["institution"]),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     """Revoke an institutional ID"""
     result = await db.execute(
@@ -178,25 +196,30 @@ async def revoke_institutional_id(
     id_record.revocation_reason = reason
     id_record.revoked_at = datetime.utcnow()
     id_record.revoked_by = current_user.id
+    await set_revoked(
+        db, StatusListKind.INSTITUTIONAL, id_record.institution_id,
+        id_record.status_list_index, True
+    )
     
     await db.commit()
+    await invalidate_institutional_id(id_record)
     
     # Update user's institutional_ids in user service
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"{settings.USER_SERVICE_URL}/users/by-main-id/{id_record.main_id}",
-            headers={"Authorization": f"Bearer {current_user.access_token}"}
+    response = await user_service.get(
+        f"/users/by-main-id/{id_record.main_id}",
+        headers={"Authorization": f"Bearer {current_user.access_token}"}
+    )
+    if response.status_code == 200:
+        user_data = response.json()
+        institutional_ids = user_data.get("institutional_ids", {})
+        if str(current_user.institution_id) in institutional_ids:
+            del institutional_ids[str(current_user.institution_id)]
+
+        await user_service.patch(
+            f"/users/{user_data['id']}/institutional-ids",
+            json={"institutional_ids": institutional_ids},
+            headers={"Authorization": f"Bearer {current_user.access_token}"},
+            idempotent=True
         )
-        if response.status_code == 200:
-            user_data = response.json()
-            institutional_ids = user_data.get("institutional_ids", {})
-            if str(current_user.institution_id) in institutional_ids:
-                del institutional_ids[str(current_user.institution_id)]
-                
-            await client.patch(
-                f"{settings.USER_SERVICE_URL}/users/{user_data['id']}/institutional-ids",
-                json={"institutional_ids": institutional_ids},
-                headers={"Authorization": f"Bearer {current_user.access_token}"}
-            )
     
     return {"message": "Institutional ID revoked successfully"} 
\ No newline at end of file
@@ -0,0 +1,75 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_db
+from app.core.models import StatusListKind
+from app.core.schemas.status_list import StatusListDeltaResponse
+from app.core.status_list import get_deltas, status_list_cache
+
+router = APIRouter()
+
+SNAPSHOT_CACHE_SECONDS = 60
+
+def _not_modified(request: Request, etag: str) -> bool:
+    return etag in request.headers.get("if-none-match", "")
+
+async def _get_snapshot(db: AsyncSession, kind: StatusListKind, institution_id: int):
+    snapshot = await status_list_cache.get(db, kind, institution_id)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="Status list not found")
+    return snapshot
+
+@router.get("/{kind}/{institution_id}")
+async def get_status_list(
+    kind: StatusListKind,
+    institution_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_db, scope="function")
+):
+    """Download the gzip-compressed revocation bitstring for an institution"""
+    snapshot = await _get_snapshot(db, kind, institution_id)
+    headers = {
+        "ETag": snapshot.etag,
+        "Cache-Control": f"public, max-age={SNAPSHOT_CACHE_SECONDS}",
+        "X-Status-List-Version": str(snapshot.version),
+        "X-Status-List-Size": str(snapshot.size),
+    }
+    if _not_modified(request, snapshot.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=snapshot.compressed, media_type="application/gzip", headers=headers)
+
+@router.get("/{kind}/{institution_id}/deltas", response_model=StatusListDeltaResponse)
+async def get_status_list_deltas(
+    kind: StatusListKind,
+    institution_id: int,
+    since: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db, scope="function")
+):
+    """Bit changes since a previously downloaded version"""
+    snapshot = await _get_snapshot(db, kind, institution_id)
+    if since > snapshot.version:
+        raise HTTPException(status_code=400, detail="Unknown status list version")
+
+    etag = f'"{kind.value}-{institution_id}-v{snapshot.version}-since{since}"'
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = f"public, max-age={SNAPSHOT_CACHE_SECONDS}"
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers=dict(response.headers))
+
+    changes = {}
+    if since < snapshot.version:
+        changes = await get_deltas(db, snapshot.list_id, since, snapshot.version)
+        if changes is None:
+            raise HTTPException(
+                status_code=410,
+                detail="Too many changes since this version; download the full status list"
+            )
+
+    return StatusListDeltaResponse(
+        kind=kind,
+        institution_id=institution_id,
+        from_version=since,
+        version=snapshot.version,
+        changes=[{"index": index, "revoked": revoked} for index, revoked in sorted(changes.items())]
+    )
@@ -1,6 +1,7 @@
 from .jwt import get_current_user
 from .permissions import (
-    has_permission,
+    require_permissions,
+    policy,
     Permissions,
     RoleType,
     ROLE_PERMISSIONS,
@@ -10,7 +11,8 @@ from .permissions import (
 
 __all__ = [
     "get_current_user",
-    "has_permission",
+    "require_permissions",
+    "policy",
     "Permissions",
     "RoleType",
     "ROLE_PERMISSIONS",
@@ -1,8 +1,9 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-import httpx
-from app.core.config import settings
+from app.core.upstreams import auth_service
+from shared.logs import bind
+from shared.resilience import UpstreamUnavailable
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
@@ -14,13 +15,19 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     )
     
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{settings.AUTH_SERVICE_URL}/auth/verify",
-                json={"token": token}
-            )
-            if response.status_code != 200:
-                raise credentials_exception
-            return response.json()
+        # Verification has no side effects, so it may be retried and hedged
+        response = await auth_service.post(
+            "/auth/verify",
+            json={"token": token},
+            idempotent=True
+        )
+        if response.status_code != 200:
+            raise credentials_exception
+        user = response.json()
+        bind(user_id=user.get("id") or user.get("sub"))
+        return user
+    except UpstreamUnavailable:
+        # Surface as 503/504; an outage is not a bad token
+        raise
     except Exception:
         raise credentials_exception 
\ No newline at end of file
@@ -2,6 +2,7 @@ from fastapi import Depends, HTTPException, status
 from typing import List, Callable, Dict
 from functools import wraps
 from enum import Enum
+from shared.policy import PolicyEngine, forbidden
 from .jwt import get_current_user
 
 class RoleType(str, Enum):
@@ -62,29 +63,18 @@ ROLE_PERMISSIONS: Dict[str, List[str]] = {
     ],
 }
 
-def has_permission(required_permissions: List[str]) -> Callable:
-    def decorator(func: Callable) -> Callable:
-        @wraps(func)
-        async def wrapper(*args, current_user=Depends(get_current_user), **kwargs):
-            # Super admin has all permissions
-            if RoleType.SUPER_ADMIN in current_user.get("roles", []):
-                return await func(*args, current_user=current_user, **kwargs)
-            
-            # Get user's role-based permissions
-            user_permissions = []
-            for role in current_user.get("roles", []):
-                user_permissions.extend(ROLE_PERMISSIONS.get(role, []))
-            
-            # Check if user has all required permissions
-            if not all(perm in user_permissions for perm in required_permissions):
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Not enough permissions"
-                )
-            
-            return await func(*args, current_user=current_user, **kwargs)
-        return wrapper
-    return decorator
+# Compiled once at import; routes compile their own requirement when declared
+policy = PolicyEngine(ROLE_PERMISSIONS, superuser_roles=[RoleType.SUPER_ADMIN])
+
+def require_permissions(*required_permissions: str) -> Callable:
+    """Dependency that checks the caller's roles against a precompiled requirement"""
+    check = policy.requirement(*required_permissions)
+
+    async def dependency(current_user = Depends(get_current_user)):
+        if not check(current_user.get("roles", ())):
+            raise forbidden()
+        return current_user
+    return dependency
 
 async def validate_institution_access(user_id: int, institution_id: int) -> bool:
     """Validate if user has access to the specified institution"""
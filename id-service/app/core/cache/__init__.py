@@ -0,0 +1,26 @@
+from .two_tier import LRUCache, TwoTierCache
+from .ids import (
+    digital_id_cache,
+    institutional_id_cache,
+    digital_id_key,
+    digital_id_number_key,
+    institutional_id_key,
+    serialize_row,
+    invalidate_digital_id,
+    invalidate_institutional_id,
+    invalidation_listener
+)
+
+__all__ = [
+    "LRUCache",
+    "TwoTierCache",
+    "digital_id_cache",
+    "institutional_id_cache",
+    "digital_id_key",
+    "digital_id_number_key",
+    "institutional_id_key",
+    "serialize_row",
+    "invalidate_digital_id",
+    "invalidate_institutional_id",
+    "invalidation_listener"
+]
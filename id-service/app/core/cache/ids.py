@@ -0,0 +1,91 @@
+import asyncio
+import json
+import logging
+from typing import Optional
+from app.core.config import settings
+from app.core.models import DigitalID, InstitutionalID
+from .two_tier import LRUCache, TwoTierCache
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "id-service:cache-invalidation"
+
+def _create_redis():
+    if not settings.REDIS_URL:
+        return None
+    import redis.asyncio as aioredis
+    return aioredis.from_url(settings.REDIS_URL)
+
+redis_client = _create_redis()
+
+def _create_cache(name: str) -> TwoTierCache:
+    return TwoTierCache(
+        name,
+        LRUCache(settings.ID_CACHE_LOCAL_SIZE, settings.ID_CACHE_LOCAL_TTL_SECONDS),
+        redis=redis_client,
+        redis_ttl_seconds=settings.ID_CACHE_REDIS_TTL_SECONDS,
+        channel=INVALIDATION_CHANNEL
+    )
+
+digital_id_cache = _create_cache("digital_id")
+institutional_id_cache = _create_cache("institutional_id")
+
+def digital_id_key(id: int) -> str:
+    return f"id:{id}"
+
+def digital_id_number_key(id_number: str) -> str:
+    return f"number:{id_number}"
+
+def institutional_id_key(institution_id: int, id_number: str) -> str:
+    return f"{institution_id}:{id_number}"
+
+def serialize_row(row) -> dict:
+    """Column values only; relationships are never loaded into the cache"""
+    return {column.name: getattr(row, column.name) for column in row.__table__.columns}
+
+async def invalidate_digital_id(digital_id: DigitalID) -> None:
+    """Change event for a committed digital ID update"""
+    await digital_id_cache.invalidate([
+        digital_id_key(digital_id.id),
+        digital_id_number_key(digital_id.id_number)
+    ])
+
+async def invalidate_institutional_id(institutional_id: InstitutionalID) -> None:
+    """Change event for a committed institutional ID update"""
+    await institutional_id_cache.invalidate([
+        institutional_id_key(institutional_id.institution_id, institutional_id.id_number)
+    ])
+
+class InvalidationListener:
+    """Applies change events published by other replicas to the local tier"""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if redis_client is not None and self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                pubsub = redis_client.pubsub()
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    event = json.loads(message["data"])
+                    digital_id_cache.handle_event(event)
+                    institutional_id_cache.handle_event(event)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("Cache invalidation listener disconnected, retrying", exc_info=True)
+                await asyncio.sleep(1)
+
+invalidation_listener = InvalidationListener()
@@ -0,0 +1,218 @@
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+from fastapi.encoders import jsonable_encoder
+from prometheus_client import Counter
+
+logger = logging.getLogger(__name__)
+
+CACHE_REQUESTS = Counter(
+    "id_cache_requests_total",
+    "Cache lookups by tier and result",
+    ["cache", "tier", "result"]
+)
+
+CACHE_INVALIDATIONS = Counter(
+    "id_cache_invalidations_total",
+    "Keys invalidated through change events",
+    ["cache", "source"]
+)
+
+class LRUCache:
+    """Bounded in-process LRU with per-entry expiry"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+# Store the value only if the key's generation is still the one read before loading
+STORE_IF_CURRENT = """
+local generation = redis.call('GET', KEYS[2]) or '0'
+if generation ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+class TwoTierCache:
+    """Read-through cache: in-process LRU in front of a shared Redis tier.
+
+    Concurrent misses for the same key share one loader call. Writers call
+    ``invalidate`` after committing; the keys are dropped from Redis, their
+    Redis generation is bumped and a change event is published so every
+    replica evicts its local copy. A load only writes back to either tier if
+    no invalidation happened while it ran.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        local: LRUCache,
+        redis=None,
+        redis_ttl_seconds: int = 300,
+        channel: str = "id-service:cache-invalidation"
+    ):
+        self.name = name
+        self.local = local
+        self.redis = redis
+        self.redis_ttl_seconds = redis_ttl_seconds
+        self.channel = channel
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # Bumped when a key is invalidated mid-load so the stale result is not stored
+        self._generations: Dict[str, int] = {}
+        self._stats = {"hits": 0, "misses": 0}
+        self._store_if_current = redis.register_script(STORE_IF_CURRENT) if redis is not None else None
+
+    def _prefixed(self, key: str) -> str:
+        return f"{self.name}:{key}"
+
+    def _generation_key(self, key: str) -> str:
+        return f"{self.name}:generation:{key}"
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Optional[dict]]]) -> Optional[dict]:
+        value = self.local.get(key)
+        if value is not None:
+            self._record("local", "hit")
+            return value
+        self._record("local", "miss")
+
+        redis_generation = None
+        if self.redis is not None:
+            try:
+                # The generation read here is what the write-back is checked against
+                raw, redis_generation = await self.redis.mget(self._prefixed(key), self._generation_key(key))
+                redis_generation = (redis_generation or b"0").decode()
+            except Exception:
+                logger.warning("Redis cache read failed for %s", key, exc_info=True)
+                raw = None
+            if raw is not None:
+                self._record("redis", "hit")
+                value = json.loads(raw)
+                self.local.set(key, value)
+                return value
+            self._record("redis", "miss")
+
+        while True:
+            future = self._inflight.get(key)
+            if future is None:
+                break
+            self._record("singleflight", "hit")
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # Load again, leading if nobody else is, only when the leader was
+                # cancelled and this caller was not
+                if not future.cancelled() or asyncio.current_task().cancelling():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        self._generations[key] = generation = 0
+        self._stats["misses"] += 1
+        try:
+            value = await loader()
+            if value is not None:
+                value = jsonable_encoder(value)
+                if self._generations[key] == generation:
+                    await self._store(key, value, redis_generation)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Mark the exception retrieved when nobody else was waiting
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+            del self._generations[key]
+
+    async def _store(self, key: str, value: dict, redis_generation: Optional[str]) -> None:
+        self.local.set(key, value)
+        if self.redis is None or redis_generation is None:
+            return
+        try:
+            stored = await self._store_if_current(
+                keys=[self._prefixed(key), self._generation_key(key)],
+                args=[redis_generation, json.dumps(value), self.redis_ttl_seconds]
+            )
+        except Exception:
+            logger.warning("Redis cache write failed for %s", key, exc_info=True)
+            return
+        if not stored:
+            # Invalidated on another replica while loading; the event evicts
+            # the local copy too, but it may not have arrived yet
+            self.local.delete(key)
+
+    async def invalidate(self, keys: Iterable[str]) -> None:
+        """Drop keys everywhere and publish a change event for other replicas"""
+        keys = list(keys)
+        self._evict_local(keys, "local")
+        if self.redis is None:
+            return
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.delete(*(self._prefixed(key) for key in keys))
+                for key in keys:
+                    # Outlives any load in flight, so a stale write-back always loses
+                    pipe.incr(self._generation_key(key))
+                    pipe.expire(self._generation_key(key), self.redis_ttl_seconds)
+                await pipe.execute()
+            await self.redis.publish(self.channel, json.dumps({"cache": self.name, "keys": keys}))
+        except Exception:
+            logger.warning("Redis cache invalidation failed for %s", keys, exc_info=True)
+
+    def handle_event(self, event: dict) -> None:
+        """Apply a change event received from another replica"""
+        if event.get("cache") == self.name:
+            self._evict_local(event.get("keys", []), "event")
+
+    def _evict_local(self, keys: Iterable[str], source: str) -> None:
+        for key in keys:
+            self.local.delete(key)
+            if key in self._generations:
+                self._generations[key] += 1
+            CACHE_INVALIDATIONS.labels(cache=self.name, source=source).inc()
+
+    def _record(self, tier: str, result: str) -> None:
+        CACHE_REQUESTS.labels(cache=self.name, tier=tier, result=result).inc()
+        if result == "hit":
+            self._stats["hits"] += 1
+
+    def stats(self) -> dict:
+        total = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "hit_ratio": self._stats["hits"] / total if total else 0.0,
+            "local_entries": len(self.local),
+        }
@@ -1,6 +1,7 @@
 import os
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings
+from typing import Optional
 
 # Load environment variables first
 load_dotenv()
@@ -14,11 +15,66 @@ class Settings(BaseSettings):
     # Database Settings
     DATABASE_URL: str
 
+    # Database pool; DB_POOL_SIZE=0 splits DB_MAX_CONNECTIONS across WEB_CONCURRENCY workers
+    DB_POOL_SIZE: int = 0
+    DB_MAX_OVERFLOW: int = 5
+    DB_MAX_CONNECTIONS: int = 20  # This replica's share of Postgres max_connections
+    DB_POOL_TIMEOUT_SECONDS: float = 5.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_STATEMENT_TIMEOUT_MS: int = 5000
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 256  # 0 behind PgBouncer transaction pooling
+    DB_SQL_LOG_SAMPLE_RATE: float = 0.0
+    DB_SLOW_QUERY_MS: int = 500
+    DB_SCHEMA_MODE: str = "check"  # "migrate" applies migrations at startup, for single-instance development
+
+    # JSON logs through a bounded queue; INFO and below can be sampled under load
+    LOG_LEVEL: str = "INFO"
+    LOG_INFO_SAMPLE_RATE: float = 1.0
+    LOG_QUEUE_SIZE: int = 10000  # Records beyond this are dropped and counted
+
+    # Tracing: "none" only propagates traceparent, "file" appends JSON lines, "memory" keeps spans in-process
+    TRACE_EXPORTER: str = "none"
+    TRACE_FILE_PATH: str = "traces.jsonl"
+    TRACE_HEAD_SAMPLE_RATE: float = 0.01
+    TRACE_TAIL_LATENCY_MS: int = 500  # Also keep failed traces and those this slow; 0 disables
+
+    # Admin profiling endpoints under /debug, enabled by setting a token
+    PROFILING_TOKEN: str = ""
+    LOOP_STALL_THRESHOLD_MS: int = 100  # Blocking callbacks longer than this are logged with their stack
+
+    # Read replicas for read-only endpoints; reads use the primary when unset
+    DATABASE_REPLICA_URLS: str = ""  # Comma-separated
+    DB_REPLICA_MAX_LAG_SECONDS: float = 2.0
+
     # Service URLs
     AUTH_SERVICE_URL: str = "http://localhost:8000"
     USER_SERVICE_URL: str = "http://localhost:8001"
     ID_SERVICE_URL: str = "http://localhost:8002"
 
+    # Credential Signing Settings
+    CREDENTIAL_SIGNING_KEY: Optional[str] = None  # base64url Ed25519 private seed
+    CREDENTIAL_KEY_ID: str = "id-service-1"
+    CREDENTIAL_RETIRED_KEYS: str = ""  # comma-separated kid=base64url public key pairs
+    CREDENTIAL_VERIFY_CACHE_SIZE: int = 10000
+    CREDENTIAL_VERIFY_MAX_BATCH: int = 500
+
+    # Cache Settings
+    REDIS_URL: Optional[str] = None  # Local-only caching when unset
+    ID_CACHE_LOCAL_SIZE: int = 10000
+    ID_CACHE_LOCAL_TTL_SECONDS: int = 30
+    ID_CACHE_REDIS_TTL_SECONDS: int = 300
+
+    # User status events from user-service; not consumed when unset
+    RABBITMQ_URL: Optional[str] = None
+    USER_EVENTS_EXCHANGE: str = "user-events"
+    USER_EVENTS_QUEUE: str = "id-service.user-events"  # Shared by all replicas
+
+    # Upstream resilience
+    AUTH_SERVICE_TIMEOUT: float = 2.0
+    USER_SERVICE_TIMEOUT: float = 5.0
+    REQUEST_DEADLINE_SECONDS: float = 10.0  # Used when the caller sends no deadline
+    UPSTREAM_MAX_RETRIES: int = 2
+
     class Config:
         case_sensitive = True
 
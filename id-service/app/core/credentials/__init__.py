@@ -0,0 +1,7 @@
+from .signing import CredentialSigner, CredentialError, credential_signer
+
+__all__ = [
+    "CredentialSigner",
+    "CredentialError",
+    "credential_signer"
+]
@@ -0,0 +1,183 @@
+import asyncio
+import base64
+import calendar
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Union
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey, Ed25519PublicKey
+from app.core.config import settings
+
+CREDENTIAL_VERSION = 1
+
+# Credentials below this count are verified inline; larger batches are split
+# into chunks and verified on the default executor so the event loop stays free
+INLINE_VERIFY_LIMIT = 8
+VERIFY_CHUNK_SIZE = 64
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+def _epoch(value: datetime) -> int:
+    """Convert a naive UTC datetime to epoch seconds"""
+    return calendar.timegm(value.utctimetuple())
+
+class CredentialError(Exception):
+    """Raised when a credential cannot be parsed or verified"""
+
+class CredentialSigner:
+    """Issues and verifies compact Ed25519-signed digital ID credentials.
+
+    A credential is ``<payload>.<signature>``: the payload is base64url-encoded
+    compact JSON and the signature is Ed25519 over the encoded payload, so the
+    whole string fits in a QR code and can be checked offline against the
+    published key set.
+    """
+
+    def __init__(
+        self,
+        signing_key: Optional[str],
+        key_id: str,
+        retired_keys: str = "",
+        cache_size: int = 10000
+    ):
+        # Ephemeral key for development; issued credentials do not survive a restart
+        self.ephemeral = not signing_key
+        if signing_key:
+            self._private_key = Ed25519PrivateKey.from_private_bytes(_b64decode(signing_key))
+        else:
+            self._private_key = Ed25519PrivateKey.generate()
+
+        self.key_id = key_id
+        self._public_keys: Dict[str, Ed25519PublicKey] = {
+            key_id: self._private_key.public_key()
+        }
+        for entry in filter(None, (item.strip() for item in retired_keys.split(","))):
+            kid, _, raw_key = entry.partition("=")
+            self._public_keys[kid] = Ed25519PublicKey.from_public_bytes(_b64decode(raw_key))
+
+        # Signature checks are deterministic, so verified credentials can be remembered
+        self._verified: "OrderedDict[str, dict]" = OrderedDict()
+        self._cache_size = cache_size
+
+    def issue(self, digital_id) -> str:
+        """Sign a credential for a digital ID"""
+        claims = {
+            "v": CREDENTIAL_VERSION,
+            "kid": self.key_id,
+            "id": digital_id.id,
+            "num": digital_id.id_number,
+            "uid": digital_id.user_id,
+            "inst": digital_id.institution_id,
+            "iat": _epoch(digital_id.issued_at or datetime.utcnow()),
+            "exp": _epoch(digital_id.expires_at),
+        }
+        if digital_id.status_list_index is not None:
+            claims["sli"] = digital_id.status_list_index
+        payload = _b64encode(
+            json.dumps(claims, separators=(",", ":"), sort_keys=True).encode()
+        )
+        signature = _b64encode(self._private_key.sign(payload.encode("ascii")))
+        return f"{payload}.{signature}"
+
+    def public_keys(self) -> List[dict]:
+        """Public keys in JWK form, current key first"""
+        return [
+            {
+                "kty": "OKP",
+                "crv": "Ed25519",
+                "kid": kid,
+                "x": _b64encode(key.public_bytes(
+                    encoding=serialization.Encoding.Raw,
+                    format=serialization.PublicFormat.Raw
+                )),
+                "use": "sig",
+                "alg": "EdDSA",
+            }
+            for kid, key in self._public_keys.items()
+        ]
+
+    async def verify_many(self, credentials: List[str]) -> List[Union[dict, CredentialError]]:
+        """Verify credentials, returning claims or a CredentialError for each"""
+        results: Dict[str, Union[dict, CredentialError]] = {}
+        pending = []
+        for credential in dict.fromkeys(credentials):
+            claims = self._verified.get(credential)
+            if claims is None:
+                pending.append(credential)
+            else:
+                self._verified.move_to_end(credential)
+                results[credential] = claims
+
+        if len(pending) <= INLINE_VERIFY_LIMIT:
+            outcomes = self._verify_chunk(pending)
+        else:
+            loop = asyncio.get_running_loop()
+            chunks = [
+                pending[i:i + VERIFY_CHUNK_SIZE]
+                for i in range(0, len(pending), VERIFY_CHUNK_SIZE)
+            ]
+            chunk_outcomes = await asyncio.gather(*(
+                loop.run_in_executor(None, self._verify_chunk, chunk)
+                for chunk in chunks
+            ))
+            outcomes = [outcome for chunk in chunk_outcomes for outcome in chunk]
+
+        for credential, outcome in zip(pending, outcomes):
+            if not isinstance(outcome, CredentialError):
+                self._remember(credential, outcome)
+            results[credential] = outcome
+
+        now = time.time()
+        return [self._check_expiry(results[credential], now) for credential in credentials]
+
+    def _verify_chunk(self, credentials: List[str]) -> List[Union[dict, CredentialError]]:
+        return [self._verify_signature(credential) for credential in credentials]
+
+    def _verify_signature(self, credential: str) -> Union[dict, CredentialError]:
+        try:
+            payload, signature = credential.split(".")
+            claims = json.loads(_b64decode(payload))
+            kid = claims["kid"]
+            # Claims are untrusted until verified; a non-str kid would not be hashable
+            if not isinstance(kid, str) or not isinstance(claims.get("exp", 0), (int, float)):
+                raise TypeError("Unexpected claim type")
+            public_key = self._public_keys.get(kid)
+        except (ValueError, KeyError, TypeError):
+            return CredentialError("Malformed credential")
+
+        if public_key is None:
+            return CredentialError("Unknown signing key")
+
+        try:
+            public_key.verify(_b64decode(signature), payload.encode("ascii"))
+        except (InvalidSignature, ValueError):
+            return CredentialError("Invalid signature")
+        return claims
+
+    def _check_expiry(
+        self,
+        outcome: Union[dict, CredentialError],
+        now: float
+    ) -> Union[dict, CredentialError]:
+        if isinstance(outcome, dict) and outcome.get("exp", 0) < now:
+            return CredentialError("Credential has expired")
+        return outcome
+
+    def _remember(self, credential: str, claims: dict) -> None:
+        self._verified[credential] = claims
+        if len(self._verified) > self._cache_size:
+            self._verified.popitem(last=False)
+
+credential_signer = CredentialSigner(
+    settings.CREDENTIAL_SIGNING_KEY,
+    settings.CREDENTIAL_KEY_ID,
+    settings.CREDENTIAL_RETIRED_KEYS,
+    settings.CREDENTIAL_VERIFY_CACHE_SIZE
+)
@@ -0,0 +1,3 @@
+from .holders import apply_user_event, holder_events
+
+__all__ = ["apply_user_event", "holder_events"]
@@ -0,0 +1,68 @@
+from typing import List
+from sqlalchemy import select
+from shared.events import EventSubscriber
+from app.core.config import settings
+from app.core.database import async_session
+from app.core.models import DigitalID, IDHistory, StatusListKind
+from app.core.models.digital_id import IDStatus
+from app.core.status_list import set_revoked
+from app.core.cache import invalidate_digital_id
+
+# History reasons for changes made here; reactivation only undoes our own suspensions
+HOLDER_SUSPENDED = "Holder suspended in user-service"
+HOLDER_REACTIVATED = "Holder reactivated in user-service"
+# changed_by for status changes no user made directly
+SYSTEM_USER_ID = 0
+
+async def _set_holder_status(user_id: int, old: IDStatus, new: IDStatus, reason: str) -> None:
+    query = (
+        select(DigitalID)
+        .filter(DigitalID.user_id == user_id, DigitalID.status == old)
+        .with_for_update()
+    )
+    if new == IDStatus.ACTIVE:
+        # Leave IDs an admin suspended, or changed since, as they are
+        last_reason = (
+            select(IDHistory.reason)
+            .where(IDHistory.digital_id_id == DigitalID.id)
+            .order_by(IDHistory.changed_at.desc(), IDHistory.id.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
+        query = query.filter(last_reason == HOLDER_SUSPENDED)
+
+    async with async_session() as db:
+        digital_ids: List[DigitalID] = (await db.execute(query)).scalars().all()
+        for digital_id in digital_ids:
+            db.add(IDHistory(
+                digital_id_id=digital_id.id,
+                old_status=old,
+                new_status=new,
+                changed_by=SYSTEM_USER_ID,
+                reason=reason
+            ))
+            digital_id.status = new
+            await set_revoked(
+                db, StatusListKind.DIGITAL, digital_id.institution_id,
+                digital_id.status_list_index, new != IDStatus.ACTIVE
+            )
+        await db.commit()
+
+    for digital_id in digital_ids:
+        await invalidate_digital_id(digital_id)
+
+async def apply_user_event(event_type: str, data: dict) -> None:
+    """Suspends a holder's active IDs with them, and restores those IDs on reactivation"""
+    if event_type == "user.suspended":
+        await _set_holder_status(int(data["user_id"]), IDStatus.ACTIVE, IDStatus.SUSPENDED, HOLDER_SUSPENDED)
+    elif event_type == "user.reactivated":
+        await _set_holder_status(int(data["user_id"]), IDStatus.SUSPENDED, IDStatus.ACTIVE, HOLDER_REACTIVATED)
+
+# One durable queue shared by all id-service replicas, so each event is applied once
+holder_events = EventSubscriber(
+    "id-service",
+    settings.RABBITMQ_URL,
+    settings.USER_EVENTS_EXCHANGE,
+    apply_user_event,
+    queue_name=settings.USER_EVENTS_QUEUE
+)
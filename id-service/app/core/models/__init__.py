@@ -3,5 +3,7 @@ from .institutional_id import InstitutionalID
 from .base import Base
 from .digital_id import DigitalID
 from .id_history import IDHistory
+from .status_list import StatusList, StatusListDelta, StatusListKind
 
-__all__ = ['Institution', 'InstitutionalID', 'Base', 'DigitalID', 'IDHistory'] 
\ No newline at end of file
+__all__ = ['Institution', 'InstitutionalID', 'Base', 'DigitalID', 'IDHistory',
+           'StatusList', 'StatusListDelta', 'StatusListKind'] 
\ No newline at end of file
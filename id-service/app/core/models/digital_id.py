@@ -18,11 +18,14 @@ class DigitalID(Base):
     id_number = Column(String(50), unique=True, nullable=False)
     status = Column(SQLEnum(IDStatus), default=IDStatus.ACTIVE)
     issued_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     expires_at = Column(DateTime, nullable=False)
     issuer_id = Column(Integer, nullable=False)
     # metadata = Column(String(1000))  # JSON string for additional data
     institution_id = Column(Integer, ForeignKey('institutions.id'))
+    status_list_index = Column(Integer)  # Position in the institution's revocation status list
 
     # Relationships
-    history = relationship("IDHistory", back_populates="digital_id")
+    # Never lazy-loaded; history is fetched explicitly with pagination or a batched query
+    history = relationship("IDHistory", back_populates="digital_id", lazy="noload")
     institution = relationship("Institution", back_populates="digital_ids") 
\ No newline at end of file
@@ -1,11 +1,15 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from .base import Base
 from .digital_id import IDStatus
 
 class IDHistory(Base):
     __tablename__ = "id_history"
+    __table_args__ = (
+        # Serves both cursor pagination and the latest-N window query
+        Index("ix_id_history_digital_id_changed_at", "digital_id_id", "changed_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     digital_id_id = Column(Integer, ForeignKey('digital_ids.id'))
@@ -10,6 +10,7 @@ class InstitutionalID(Base):
     main_id = Column(String(12), nullable=False)
     institution_id = Column(Integer, ForeignKey('institutions.id'))
     id_number = Column(String(50), nullable=False)
+    status_list_index = Column(Integer)  # Position in the institution's revocation status list
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
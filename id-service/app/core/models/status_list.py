@@ -0,0 +1,46 @@
+from datetime import datetime
+from enum import Enum
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, LargeBinary, ForeignKey, UniqueConstraint, Index
+from sqlalchemy.orm import relationship
+from .base import Base
+
+class StatusListKind(str, Enum):
+    DIGITAL = "digital"
+    INSTITUTIONAL = "institutional"
+
+class StatusList(Base):
+    """Revocation bitstring for every ID of one kind issued by one institution.
+
+    Bit ``n`` is bit ``n % 8`` (least significant first) of byte ``n // 8``,
+    matching Postgres ``get_bit``/``set_bit`` on bytea. A set bit means the ID
+    is no longer valid.
+    """
+    __tablename__ = "status_lists"
+    __table_args__ = (
+        UniqueConstraint("kind", "institution_id", name="uq_status_lists_kind_institution"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(20), nullable=False)
+    institution_id = Column(Integer, nullable=False, default=0)  # 0 for IDs without an institution
+    version = Column(Integer, nullable=False, default=0)
+    size = Column(Integer, nullable=False, default=0)  # Indexes the bitstring covers; assigned from status_list_<id>_seq
+    bits = Column(LargeBinary, nullable=False, default=b"")
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    deltas = relationship("StatusListDelta", back_populates="status_list")
+
+class StatusListDelta(Base):
+    __tablename__ = "status_list_deltas"
+    __table_args__ = (
+        Index("ix_status_list_deltas_list_version", "status_list_id", "version"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    status_list_id = Column(Integer, ForeignKey('status_lists.id'), nullable=False)
+    version = Column(Integer, nullable=False)
+    index = Column(Integer, nullable=False)
+    revoked = Column(Boolean, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    status_list = relationship("StatusList", back_populates="deltas")
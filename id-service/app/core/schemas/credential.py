@@ -0,0 +1,31 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Optional, List
+from app.core.models.digital_id import IDStatus
+
+class CredentialResponse(BaseModel):
+    credential: str
+    kid: str
+    expires_at: datetime
+
+class CredentialVerifyRequest(BaseModel):
+    credentials: List[str] = Field(..., min_length=1)
+
+class CredentialVerification(BaseModel):
+    valid: bool
+    reason: Optional[str] = None
+    digital_id: Optional[int] = None
+    id_number: Optional[str] = None
+    status: Optional[IDStatus] = None
+    expires_at: Optional[datetime] = None
+
+class PublicKey(BaseModel):
+    kty: str
+    crv: str
+    kid: str
+    x: str
+    use: str
+    alg: str
+
+class PublicKeySet(BaseModel):
+    keys: List[PublicKey]
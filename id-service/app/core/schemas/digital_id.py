@@ -32,8 +32,10 @@ class DigitalIDResponse(DigitalIDBase):
     id: int
     status: IDStatus
     issued_at: datetime
+    updated_at: Optional[datetime] = None
     issuer_id: int
     history: Optional[List[IDHistoryEntry]] = None
+    credential: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -34,6 +34,7 @@ class InstitutionalIDResponse(BaseModel):
     valid_until: Optional[datetime]
     access_level: Optional[str]
     status: str
+    status_list_index: Optional[int] = None  # Bit to check in /api/status-lists/institutional/{institution_id}
     created_at: datetime
     updated_at: datetime
 
@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from typing import List
+from app.core.models.status_list import StatusListKind
+
+class StatusListChange(BaseModel):
+    index: int
+    revoked: bool
+
+class StatusListDeltaResponse(BaseModel):
+    kind: StatusListKind
+    institution_id: int
+    from_version: int
+    version: int
+    changes: List[StatusListChange]
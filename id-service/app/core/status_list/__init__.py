@@ -0,0 +1,15 @@
+from .service import (
+    assign_index,
+    set_revoked,
+    get_deltas,
+    StatusListSnapshot,
+    status_list_cache
+)
+
+__all__ = [
+    "assign_index",
+    "set_revoked",
+    "get_deltas",
+    "StatusListSnapshot",
+    "status_list_cache"
+]
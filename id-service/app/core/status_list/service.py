@@ -0,0 +1,202 @@
+import gzip
+import time
+from typing import Dict, Optional, Tuple
+from sqlalchemy import select, update, func, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.models import StatusList, StatusListDelta, StatusListKind
+
+# Bitstrings grow in 2 KiB blocks (16384 IDs) so issuing an ID rarely rewrites the row
+BLOCK_BYTES = 2048
+# Verifiers further behind than this should refetch the snapshot instead of a delta
+MAX_DELTA_CHANGES = 10000
+# How long a cached snapshot is trusted before its version is re-checked
+SNAPSHOT_REFRESH_SECONDS = 5
+
+def _list_filter(kind: StatusListKind, institution_id: Optional[int]):
+    return (
+        StatusList.kind == kind.value,
+        StatusList.institution_id == (institution_id or 0)
+    )
+
+# List ids never change once created, so each process remembers them
+_list_ids: Dict[Tuple[str, int], int] = {}
+
+def sequence_name(list_id: int) -> str:
+    """Postgres sequence that hands out a status list's indexes"""
+    return f"status_list_{int(list_id)}_seq"
+
+async def _list_id(db: AsyncSession, kind: StatusListKind, institution_id: Optional[int]) -> int:
+    key = (kind.value, institution_id or 0)
+    list_id = _list_ids.get(key)
+    if list_id is not None:
+        return list_id
+
+    result = await db.execute(select(StatusList.id).where(*_list_filter(kind, institution_id)))
+    list_id = result.scalar_one_or_none()
+    if list_id is None:
+        # First ID for this institution; a concurrent creator waits on the unique
+        # constraint, so only the transaction that inserts the row makes the sequence
+        result = await db.execute(
+            insert(StatusList)
+            .values(kind=kind.value, institution_id=institution_id or 0, version=0, size=0, bits=b"")
+            .on_conflict_do_nothing(constraint="uq_status_lists_kind_institution")
+            .returning(StatusList.id)
+        )
+        list_id = result.scalar_one_or_none()
+        if list_id is not None:
+            await db.execute(text(f"CREATE SEQUENCE {sequence_name(list_id)} MINVALUE 0 START 0"))
+            # Not cached until committed; the insert may still roll back
+            return list_id
+        result = await db.execute(select(StatusList.id).where(*_list_filter(kind, institution_id)))
+        list_id = result.scalar_one()
+    _list_ids[key] = list_id
+    return list_id
+
+async def assign_index(
+    db: AsyncSession,
+    kind: StatusListKind,
+    institution_id: Optional[int]
+) -> int:
+    """Reserve the next status list index for a newly issued ID.
+
+    Indexes come from the list's sequence, so concurrent issuers never queue
+    on the status_lists row; a rolled-back issue leaves an unused, unrevoked
+    bit. The row is only written when an index falls past the bitstring,
+    once per block.
+    """
+    list_id = await _list_id(db, kind, institution_id)
+    result = await db.execute(select(func.nextval(sequence_name(list_id))))
+    index = result.scalar_one()
+
+    covered = (index // (BLOCK_BYTES * 8) + 1) * BLOCK_BYTES
+    await db.execute(
+        update(StatusList)
+        .where(StatusList.id == list_id, func.length(StatusList.bits) < covered)
+        .values(
+            size=covered * 8,
+            bits=StatusList.bits.op("||")(
+                func.decode(func.repeat("00", covered - func.length(StatusList.bits)), "hex")
+            )
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return index
+
+async def set_revoked(
+    db: AsyncSession,
+    kind: StatusListKind,
+    institution_id: Optional[int],
+    index: Optional[int],
+    revoked: bool
+) -> None:
+    """Flip a single status bit in place and record the change as a delta"""
+    if index is None:
+        return
+
+    bit = 1 if revoked else 0
+    result = await db.execute(
+        update(StatusList)
+        .where(
+            *_list_filter(kind, institution_id),
+            func.get_bit(StatusList.bits, index) != bit
+        )
+        .values(
+            bits=func.set_bit(StatusList.bits, index, bit),
+            version=StatusList.version + 1
+        )
+        .returning(StatusList.id, StatusList.version)
+        .execution_options(synchronize_session=False)
+    )
+    row = result.first()
+    if row is not None:
+        db.add(StatusListDelta(
+            status_list_id=row.id,
+            version=row.version,
+            index=index,
+            revoked=revoked
+        ))
+
+async def get_deltas(
+    db: AsyncSession,
+    status_list_id: int,
+    since_version: int,
+    until_version: int
+) -> Optional[Dict[int, bool]]:
+    """Net bit changes between two versions, or None if the client should refetch the snapshot"""
+    result = await db.execute(
+        select(StatusListDelta.index, StatusListDelta.revoked)
+        .where(
+            StatusListDelta.status_list_id == status_list_id,
+            StatusListDelta.version > since_version,
+            StatusListDelta.version <= until_version
+        )
+        .order_by(StatusListDelta.version)
+        .limit(MAX_DELTA_CHANGES + 1)
+    )
+    rows = result.all()
+    if len(rows) > MAX_DELTA_CHANGES:
+        return None
+
+    # Later changes to the same index win
+    return {index: revoked for index, revoked in rows}
+
+class StatusListSnapshot:
+    """Immutable published version of a status list"""
+
+    def __init__(self, list_id: int, kind: str, institution_id: int, version: int, size: int, bits: bytes):
+        self.list_id = list_id
+        self.kind = kind
+        self.institution_id = institution_id
+        self.version = version
+        self.size = size
+        self.bits = bits[:(size + 7) // 8]
+        self.compressed = gzip.compress(self.bits, compresslevel=9)
+        self.etag = f'"{kind}-{institution_id}-v{version}"'
+        self.checked_at = time.monotonic()
+
+    def is_revoked(self, index: int) -> bool:
+        if index >= self.size:
+            return False
+        return bool(self.bits[index // 8] >> (index % 8) & 1)
+
+class StatusListCache:
+    """Per-process cache of compressed snapshots, refreshed only when the version moves"""
+
+    def __init__(self, refresh_seconds: float = SNAPSHOT_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self._snapshots: Dict[Tuple[str, int], StatusListSnapshot] = {}
+
+    async def get(
+        self,
+        db: AsyncSession,
+        kind: StatusListKind,
+        institution_id: Optional[int]
+    ) -> Optional[StatusListSnapshot]:
+        key = (kind.value, institution_id or 0)
+        snapshot = self._snapshots.get(key)
+        now = time.monotonic()
+        if snapshot is not None and now - snapshot.checked_at < self.refresh_seconds:
+            return snapshot
+
+        result = await db.execute(
+            select(StatusList.id, StatusList.version).where(*_list_filter(kind, institution_id))
+        )
+        row = result.first()
+        if row is None:
+            return None
+
+        if snapshot is not None and snapshot.version == row.version:
+            snapshot.checked_at = now
+            return snapshot
+
+        result = await db.execute(
+            select(StatusList.version, StatusList.size, StatusList.bits)
+            .where(StatusList.id == row.id)
+        )
+        version, size, bits = result.one()
+        snapshot = StatusListSnapshot(row.id, key[0], key[1], version, size, bits)
+        self._snapshots[key] = snapshot
+        return snapshot
+
+status_list_cache = StatusListCache()
@@ -0,0 +1,18 @@
+from shared.resilience import ResilientClient
+from app.core.config import settings
+
+auth_service = ResilientClient(
+    "auth-service",
+    settings.AUTH_SERVICE_URL,
+    timeout=settings.AUTH_SERVICE_TIMEOUT,
+    max_retries=settings.UPSTREAM_MAX_RETRIES
+)
+
+user_service = ResilientClient(
+    "user-service",
+    settings.USER_SERVICE_URL,
+    timeout=settings.USER_SERVICE_TIMEOUT,
+    max_retries=settings.UPSTREAM_MAX_RETRIES
+)
+
+UPSTREAMS = [auth_service, user_service]
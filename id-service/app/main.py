@@ -1,3 +1,4 @@
+import logging
 import sys
 import os
 from dotenv import load_dotenv
@@ -7,24 +8,44 @@ from enum import Enum
 # Load environment variables from .env file
 load_dotenv()
 
-from fastapi import FastAPI, Security
+from fastapi import FastAPI, Request, Security
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.openapi.docs import get_swagger_ui_html
 from fastapi.openapi.utils import get_openapi
 from fastapi.security import OAuth2PasswordBearer
-from app.core.database import engine
-from app.core.models import Base
-from app.core.api import digital_ids
+from shared.compression import CompressionMiddleware
+from shared.openapi import OpenAPIDocument
+from shared.unit_of_work import query_count_middleware
+from shared.metrics import RequestMetricsMiddleware, metrics_response
+from shared.logs import RequestContextMiddleware, configure_logging, shutdown_logging
+from shared.tracing import TracingMiddleware, configure_tracing, shutdown_tracing
+from shared.profiling import LoopMonitor, ProfilingMiddleware, profiling_router
+from app.core.database import engine, read_router, schema
+from app.core.api import digital_ids, credentials, status_lists
+from app.core.credentials import credential_signer
 from app.core.auth.permissions import Permissions, ROLE_PERMISSIONS
+from app.core.cache import invalidation_listener
+from app.core.events import holder_events
+from app.core.config import settings
+from app.core.upstreams import UPSTREAMS
+from shared.resilience import UpstreamUnavailable, deadline_middleware, upstream_unavailable_handler
+
+# Non-blocking JSON logs; configured before anything else logs
+configure_logging("id-service", settings.LOG_LEVEL, settings.LOG_INFO_SAMPLE_RATE, settings.LOG_QUEUE_SIZE)
+configure_tracing(
+    "id-service",
+    settings.TRACE_EXPORTER,
+    settings.TRACE_FILE_PATH,
+    settings.TRACE_HEAD_SAMPLE_RATE,
+    settings.TRACE_TAIL_LATENCY_MS
+)
 
 # Ensure the app directory is in the Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 def custom_openapi():
-    if app.openapi_schema:
-        return app.openapi_schema
-
+    """Build the schema; served through openapi_document, which runs this once"""
     openapi_schema = get_openapi(
         title=app.title,
         version=app.version,
@@ -38,10 +59,11 @@ This service manages digital identification documents and their lifecycle.
 - ID Verification
 - ID Status Management
 - Revocation Handling
+- Offline-verifiable Signed Credentials
 - ID Document Generation
 
 ## Authentication
-All endpoints require a valid JWT token obtained through the auth service.
+All endpoints except credential verification require a valid JWT token obtained through the auth service.
 Include the token in the Authorization header as: `Bearer <token>`
 
 ## Error Responses
@@ -74,17 +96,30 @@ Include the token in the Authorization header as: `Bearer <token>`
         }
     }
 
-    app.openapi_schema = openapi_schema
-    return app.openapi_schema
+    return openapi_schema
 
 app = FastAPI(
     title="Digital ID System - ID Service",
     description="API for managing digital identification documents",
     version="1.0.0",
     docs_url=None,  # Disable default docs
-    redoc_url=None  # Disable default redoc
+    redoc_url=None,  # Disable default redoc
+    openapi_url=None  # Served by the /openapi.json route below, from openapi_document
 )
 
+# Event-loop lag and the stack of any callback that blocks it
+loop_monitor = LoopMonitor("id-service", settings.LOOP_STALL_THRESHOLD_MS / 1000)
+
+# Admin profiling under /debug when PROFILING_TOKEN is set; registered first so
+# the middleware is innermost and runs in the endpoint's task
+if settings.PROFILING_TOKEN:
+    app.add_middleware(ProfilingMiddleware, token=settings.PROFILING_TOKEN)
+    app.include_router(profiling_router(settings.PROFILING_TOKEN, loop_monitor), prefix="/debug")
+
+# Built once in the background at startup, then served as stored bytes
+openapi_document = OpenAPIDocument(app, custom_openapi)
+app.openapi = openapi_document.schema
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -94,9 +129,30 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Update the static files path
+# Negotiated zstd/br/gzip for bodies over 1 KiB
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+# Return X-Min-LSN on writes so follow-up reads can avoid stale replicas
+app.middleware("http")(read_router.middleware())
+
+# X-DB-Query-Count and db_queries_per_request make N+1 regressions visible
+app.middleware("http")(query_count_middleware("id-service"))
+
+# Honour the caller's X-Deadline-Ms and propagate what is left to auth/user-service
+app.middleware("http")(deadline_middleware(settings.REQUEST_DEADLINE_SECONDS))
+app.add_exception_handler(UpstreamUnavailable, upstream_unavailable_handler)
+
+# Server span per request, continuing the caller's traceparent; inside the request context
+app.add_middleware(TracingMiddleware)
+
+# Request id and route on every log record; inside the metrics middleware
+app.add_middleware(RequestContextMiddleware)
+
+# Latency by route template; registered last so it times the whole stack
+app.add_middleware(RequestMetricsMiddleware, service="id-service")
+
+# Swagger UI assets are vendored in static/, so docs work offline
 static_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "static")
-os.makedirs(static_dir, exist_ok=True)
 
 # Mount static files before the app routes
 app.mount("/static", StaticFiles(directory=static_dir), name="static")
@@ -112,14 +168,44 @@ async def custom_swagger_ui_html():
     )
 
 @app.get("/openapi.json", include_in_schema=False)
-async def get_open_api_endpoint():
-    return custom_openapi()
+async def get_open_api_endpoint(request: Request):
+    return await openapi_document.response(request)
 
 @app.on_event("startup")
 async def startup():
-    # Create database tables
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    # One revision check; migrations run as a separate job (python -m app.migrate)
+    await schema.prepare(engine, settings.DB_SCHEMA_MODE)
+
+    openapi_document.start()
+
+    if credential_signer.ephemeral:
+        logging.getLogger(__name__).warning(
+            "CREDENTIAL_SIGNING_KEY is not set; signing with a generated key. Credentials "
+            "issued now fail verification after a restart and on other replicas"
+        )
+
+    # Apply cache change events published by other replicas
+    invalidation_listener.start()
+    read_router.start()
+
+    # Suspend and restore holders' IDs as user-service changes their status
+    holder_events.start()
+    loop_monitor.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await holder_events.stop()
+    await invalidation_listener.stop()
+    await read_router.stop()
+    for upstream in UPSTREAMS:
+        await upstream.aclose()
+    await loop_monitor.stop()
+    shutdown_tracing()
+    shutdown_logging()
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    return metrics_response(request)
 
 # Include routers
 app.include_router(
@@ -132,4 +218,23 @@ app.include_router(
         404: {"description": "Not found"},
         422: {"description": "Validation Error"}
     }
-) 
\ No newline at end of file
+) 
+app.include_router(
+    credentials.router,
+    prefix="/api/credentials",
+    tags=["credentials"],
+    responses={
+        413: {"description": "Too many credentials in one request"},
+        422: {"description": "Validation Error"}
+    }
+)
+
+app.include_router(
+    status_lists.router,
+    prefix="/api/status-lists",
+    tags=["status-lists"],
+    responses={
+        404: {"description": "Status list not found"},
+        410: {"description": "Delta window exceeded; download the full status list"}
+    }
+)
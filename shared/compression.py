@@ -0,0 +1,208 @@
+import zlib
+from typing import List, Optional
+
+try:
+    import brotli
+except ImportError:  # Optional; gzip is always available
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/problem+json",
+    "application/javascript",
+    "application/xml",
+    "application/x-ndjson",
+    "text/",
+)
+
+# Suffixes appended to strong ETags so each encoding has its own validator
+ETAG_SUFFIXES = ("-zstd", "-br", "-gzip")
+_ETAG_SUFFIX_BYTES = tuple(f'{suffix}"'.encode() for suffix in ETAG_SUFFIXES)
+
+class _GzipEncoder:
+    name = "gzip"
+
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+class _BrotliEncoder:
+    name = "br"
+
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.finish()
+
+class _ZstdEncoder:
+    name = "zstd"
+
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+def available_encoders() -> dict:
+    encoders = {"gzip": _GzipEncoder}
+    if brotli is not None:
+        encoders["br"] = _BrotliEncoder
+    if zstandard is not None:
+        encoders["zstd"] = _ZstdEncoder
+    return encoders
+
+def negotiate(accept_encoding: str, preference: List[str]) -> Optional[str]:
+    """Pick the first preferred coding the client accepts with q > 0"""
+    accepted = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+    wildcard = accepted.get("*", 0.0)
+    for coding in preference:
+        if accepted.get(coding, wildcard) > 0:
+            return coding
+    return None
+
+class CompressionMiddleware:
+    """Negotiated zstd/br/gzip response compression.
+
+    Bodies smaller than ``minimum_size`` and non-text content are sent as-is.
+    Levels default low (zstd 3, brotli 4, gzip 5): on JSON they keep most of
+    the size reduction for a fraction of the CPU of the maximum settings.
+    Streaming bodies are compressed chunk by chunk.
+    """
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = 1024,
+        gzip_level: int = 5,
+        brotli_quality: int = 4,
+        zstd_level: int = 3
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = {"gzip": gzip_level, "br": brotli_quality, "zstd": zstd_level}
+        self.encoders = available_encoders()
+        self.preference = [name for name in ("zstd", "br", "gzip") if name in self.encoders]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        coding = negotiate(headers.get(b"accept-encoding", b"").decode("latin-1"), self.preference)
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressingResponder(self, coding, send)
+        await self.app(scope, receive, responder.send)
+
+class _CompressingResponder:
+    def __init__(self, middleware: CompressionMiddleware, coding: str, send):
+        self.middleware = middleware
+        self.coding = coding
+        self._send = send
+        self.start_message = None
+        self.encoder = None
+        self.passthrough = False
+
+    async def send(self, message) -> None:
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            self.passthrough = not self._compressible(message)
+            if self.passthrough:
+                await self._send(self._start(compressed=False))
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.encoder is None:
+            if not more_body and len(body) < self.middleware.minimum_size:
+                self.passthrough = True
+                await self._send(self._start(compressed=False))
+                await self._send(message)
+                return
+            self.encoder = self.middleware.encoders[self.coding](self.middleware.levels[self.coding])
+            await self._send(self._start(compressed=True))
+
+        data = self.encoder.compress(body)
+        if not more_body:
+            data += self.encoder.flush()
+        await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+    def _compressible(self, message) -> bool:
+        if message["status"] < 200 or message["status"] in (204, 304):
+            return False
+        content_type, encoded = "", False
+        for name, value in message.get("headers", []):
+            if name == b"content-type":
+                content_type = value.decode("latin-1")
+            elif name == b"content-encoding":
+                encoded = True
+        if encoded or content_type.startswith("text/event-stream"):
+            return False
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    def _start(self, compressed: bool) -> dict:
+        """Start message with the negotiated coding's ETag.
+
+        The suffix depends only on the coding, not on whether this body was
+        large enough to compress, so a 304 carries the validator of the 200
+        it revalidates. Responses with their own Content-Encoding and error
+        responses are left as they are.
+        """
+        status = self.start_message["status"]
+        retag = compressed or (
+            (200 <= status < 300 or status == 304)
+            and not any(name == b"content-encoding" for name, _ in self.start_message.get("headers", []))
+        )
+        if not retag:
+            return self.start_message
+
+        headers = []
+        vary = None
+        for name, value in self.start_message.get("headers", []):
+            if name == b"content-length" and compressed:
+                continue
+            if name == b"vary":
+                vary = value
+                continue
+            if name == b"etag" and not value.startswith(b"W/") and not value.endswith(_ETAG_SUFFIX_BYTES):
+                value = value[:-1] + f"-{self.coding}\"".encode()
+            headers.append((name, value))
+        if compressed:
+            headers.append((b"content-encoding", self.coding.encode()))
+        headers.append((b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"))
+        return {**self.start_message, "headers": headers}
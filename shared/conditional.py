@@ -0,0 +1,46 @@
+import hashlib
+from datetime import datetime
+from typing import Optional
+from fastapi import Request, Response
+from shared.compression import ETAG_SUFFIXES
+
+def make_etag(kind: str, id, *versions) -> str:
+    """Strong ETag from the row identity and its version columns (``updated_at``)"""
+    version = "|".join(
+        value.isoformat() if isinstance(value, datetime) else str(value) for value in versions
+    )
+    digest = hashlib.sha1(f"{kind}:{id}:{version}".encode()).hexdigest()[:20]
+    return f'"{digest}"'
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    # A proxy that recompresses may have appended more than one suffix
+    stripped = True
+    while stripped:
+        stripped = False
+        for suffix in ETAG_SUFFIXES:
+            if tag.endswith(f'{suffix}"'):
+                tag = tag[:-len(suffix) - 1] + '"'
+                stripped = True
+    return tag
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison as required for If-None-Match, ignoring encoding suffixes"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(_opaque(tag) == etag for tag in if_none_match.split(","))
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """Set the validator on the response; return a 304 when the client already has it"""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(
+            status_code=304,
+            headers={"ETag": etag, "Cache-Control": "private, no-cache"}
+        )
+    return None
@@ -0,0 +1,180 @@
+import logging
+import os
+import random
+import time
+
+from prometheus_client import Gauge, Histogram
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from shared.tracing import start_span
+
+POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection",
+    ["service"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+
+POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Connections currently checked out of the pool",
+    ["service"]
+)
+
+POOL_CAPACITY = Gauge(
+    "db_pool_capacity",
+    "Maximum connections the pool may open (pool_size + max_overflow)",
+    ["service"]
+)
+
+# Written through the service's non-blocking pipeline (shared.logs)
+_sql_logger = logging.getLogger("sql")
+
+def _enable_sql_logging() -> None:
+    _sql_logger.setLevel(logging.INFO)
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited"""
+
+    _service = "unknown"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            POOL_CHECKOUT_WAIT.labels(service=self._service).observe(time.perf_counter() - started)
+
+    def recreate(self):
+        # Pool.recreate rebuilds from __init__ arguments; carry the label over
+        pool = super().recreate()
+        pool._service = self._service
+        return pool
+
+def default_pool_size(max_connections: int, max_overflow: int) -> int:
+    """Split this service's connection budget across the worker processes.
+
+    ``max_connections`` is the share of Postgres max_connections given to one
+    replica of the service; each worker gets an equal slice including overflow.
+    """
+    workers = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+    return max(1, max_connections // workers - max_overflow)
+
+def create_engine(
+    url: str,
+    service: str,
+    pool_size: int = 0,
+    max_overflow: int = 5,
+    max_connections: int = 20,
+    pool_timeout: float = 5.0,
+    pool_recycle: int = 1800,
+    pool_pre_ping: bool = True,
+    statement_timeout_ms: int = 5000,
+    prepared_statement_cache_size: int = 256,
+    sql_log_sample_rate: float = 0.0,
+    slow_query_ms: int = 500
+) -> AsyncEngine:
+    """Async engine with bounded, instrumented pooling and per-session timeouts.
+
+    ``pool_size`` of 0 derives the size from ``max_connections`` and the
+    WEB_CONCURRENCY worker count. Set ``prepared_statement_cache_size`` to 0
+    behind PgBouncer in transaction mode.
+    """
+    connect_args = {}
+    if url.startswith("postgresql+asyncpg"):
+        connect_args = {
+            "prepared_statement_cache_size": prepared_statement_cache_size,
+            "server_settings": {
+                "application_name": service,
+                "statement_timeout": str(statement_timeout_ms),
+            },
+        }
+
+    if not pool_size:
+        pool_size = default_pool_size(max_connections, max_overflow)
+
+    engine = create_async_engine(
+        url,
+        poolclass=InstrumentedPool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout,
+        pool_recycle=pool_recycle,
+        pool_pre_ping=pool_pre_ping,
+        connect_args=connect_args,
+        future=True
+    )
+
+    pool = engine.sync_engine.pool
+    pool._service = service
+    POOL_CAPACITY.labels(service=service).set(pool_size + max_overflow)
+    POOL_CHECKED_OUT.labels(service=service).set_function(lambda: engine.sync_engine.pool.checkedout())
+
+    if sql_log_sample_rate > 0 or slow_query_ms > 0:
+        _instrument_sql_logging(engine, sql_log_sample_rate, slow_query_ms)
+    _instrument_tracing(engine)
+    return engine
+
+def engine_options(settings) -> dict:
+    """create_engine keyword arguments from the DB_* fields of a service's Settings"""
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "max_connections": settings.DB_MAX_CONNECTIONS,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "statement_timeout_ms": settings.DB_STATEMENT_TIMEOUT_MS,
+        "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+        "sql_log_sample_rate": settings.DB_SQL_LOG_SAMPLE_RATE,
+        "slow_query_ms": settings.DB_SLOW_QUERY_MS,
+    }
+
+def engine_from_settings(url: str, service: str, settings) -> AsyncEngine:
+    """Build the service engine from the DB_* fields of its Settings"""
+    return create_engine(url, service, **engine_options(settings))
+
+def _instrument_sql_logging(engine: AsyncEngine, sample_rate: float, slow_query_ms: int) -> None:
+    """Log a sample of statements plus every slow one, off the event loop thread"""
+    _enable_sql_logging()
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - conn.info["query_started"].pop()) * 1000
+        if slow_query_ms and elapsed_ms >= slow_query_ms:
+            _sql_logger.warning("slow query %.1fms: %s", elapsed_ms, statement)
+        elif sample_rate and random.random() < sample_rate:
+            _sql_logger.info("%.1fms: %s", elapsed_ms, statement)
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def handle_error(context):
+        started = context.connection.info.get("query_started") if context.connection else None
+        if started:
+            started.pop()
+
+def _instrument_tracing(engine: AsyncEngine) -> None:
+    """A client span per statement inside a traced request; parameters are never recorded"""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def start_query_span(conn, cursor, statement, parameters, context, executemany):
+        span = start_span(f"db {statement.split(None, 1)[0].upper()}", "client")
+        if span.recording:
+            span.set_attribute("db.system", engine.dialect.name)
+            span.set_attribute("db.statement", statement[:2048])
+        conn.info.setdefault("query_spans", []).append(span)
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def end_query_span(conn, cursor, statement, parameters, context, executemany):
+        conn.info["query_spans"].pop().end()
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def fail_query_span(context):
+        spans = context.connection.info.get("query_spans") if context.connection else None
+        if spans:
+            span = spans.pop()
+            span.record_exception(context.original_exception)
+            span.end()
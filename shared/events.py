@@ -0,0 +1,116 @@
+import asyncio
+import json
+import logging
+import threading
+from typing import Awaitable, Callable, Optional
+
+import pika
+from prometheus_client import Counter
+
+logger = logging.getLogger(__name__)
+
+EVENTS_CONSUMED = Counter(
+    "events_consumed_total",
+    "Consumed events by exchange, type and outcome",
+    ["service", "exchange", "event_type", "result"]
+)
+
+EventHandler = Callable[[str, dict], Awaitable[None]]
+
+def declare_fanout(channel, exchange: str) -> None:
+    """Publishers and subscribers declare the exchange identically, whichever starts first"""
+    channel.exchange_declare(exchange=exchange, exchange_type="fanout", durable=True)
+
+class EventSubscriber:
+    """Consumes a fanout exchange on a thread and runs each event's handler on the event loop.
+
+    Without ``queue_name`` the replica binds its own exclusive queue and sees
+    every event, which suits per-replica caches. With one, the queue is durable
+    and shared, so each event is handled once per service. A message is
+    acknowledged once its handler returns; a failed one is requeued once. The
+    thread waits for messages with ``process_data_events``, which also answers
+    heartbeats, and reconnects after a broker or network failure.
+    """
+
+    def __init__(
+        self,
+        service: str,
+        rabbitmq_url: Optional[str],
+        exchange: str,
+        handler: EventHandler,
+        queue_name: Optional[str] = None,
+        handler_timeout: float = 30.0
+    ):
+        self.service = service
+        self.rabbitmq_url = rabbitmq_url
+        self.exchange = exchange
+        self.handler = handler
+        self.queue_name = queue_name
+        self.handler_timeout = handler_timeout
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    def start(self) -> None:
+        if not self.rabbitmq_url or self._thread is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name=f"{self.exchange}-subscriber", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stopping.set()
+        await asyncio.to_thread(self._thread.join, self.handler_timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            connection = None
+            try:
+                connection = pika.BlockingConnection(pika.URLParameters(self.rabbitmq_url))
+                channel = connection.channel()
+                declare_fanout(channel, self.exchange)
+                if self.queue_name:
+                    queue = channel.queue_declare(queue=self.queue_name, durable=True).method.queue
+                else:
+                    queue = channel.queue_declare(queue="", exclusive=True).method.queue
+                channel.queue_bind(queue=queue, exchange=self.exchange)
+                channel.basic_qos(prefetch_count=1)
+                channel.basic_consume(queue=queue, on_message_callback=self._on_message)
+                logger.info("Consuming %s through %s", self.exchange, queue)
+                while not self._stopping.is_set():
+                    connection.process_data_events(time_limit=1)
+            except Exception:
+                if self._stopping.is_set():
+                    break
+                logger.warning("Subscriber for %s disconnected, retrying", self.exchange, exc_info=True)
+                self._stopping.wait(1)
+            finally:
+                if connection is not None and connection.is_open:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+
+    def _on_message(self, channel, method, properties, body) -> None:
+        event_type = properties.content_type or ""
+        try:
+            future = asyncio.run_coroutine_threadsafe(
+                self.handler(event_type, json.loads(body)), self._loop
+            )
+            try:
+                future.result(self.handler_timeout)
+            except BaseException:
+                future.cancel()
+                raise
+        except Exception:
+            logger.exception("Handling %s from %s failed", event_type, self.exchange)
+            EVENTS_CONSUMED.labels(self.service, self.exchange, event_type, "error").inc()
+            # A second failure drops the message rather than redelivering it forever
+            channel.basic_nack(delivery_tag=method.delivery_tag, requeue=not method.redelivered)
+            return
+        EVENTS_CONSUMED.labels(self.service, self.exchange, event_type, "ok").inc()
+        channel.basic_ack(delivery_tag=method.delivery_tag)
@@ -0,0 +1,163 @@
+import argparse
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from typing import Optional, Sequence
+
+from prometheus_client import Gauge
+from sqlalchemy import MetaData, create_engine, inspect, pool, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_STARTUP_SECONDS = Gauge(
+    "db_schema_startup_seconds",
+    "Time this process's startup spent checking or migrating the schema",
+    ["service", "mode"]
+)
+
+SCHEMA_MODES = ("check", "migrate")
+
+class SchemaOutOfDate(RuntimeError):
+    pass
+
+def version_table(service: str) -> str:
+    """Each service's own Alembic version table; they share one database and reuse revision ids"""
+    return "alembic_version_" + service.replace("-", "_")
+
+class SchemaManager:
+    """Alembic migrations for one service, applied by a single job.
+
+    Pods only compare the service's ``version_table`` with the head revision of the
+    scripts they ship, one indexed read. The migration job (``python -m
+    app.migrate``) holds a per-service advisory lock, so concurrent jobs or
+    ``migrate``-mode pods queue behind one another and find nothing left to
+    do. An empty database is built from the models and stamped at head,
+    because the early revisions assume tables that create_all used to make.
+    """
+
+    def __init__(
+        self,
+        service: str,
+        service_root: str,
+        database_url: str,
+        metadata: MetaData,
+        bootstrap: Sequence[str] = ()
+    ):
+        self.service = service
+        self.script_location = os.path.join(service_root, "alembic")
+        # Alembic runs on the synchronous driver
+        self.database_url = database_url.replace("+asyncpg", "", 1)
+        self.metadata = metadata
+        self.bootstrap = tuple(bootstrap)
+        self.version_table = version_table(service)
+        digest = hashlib.sha256(f"alembic:{service}".encode()).digest()
+        self.lock_key = int.from_bytes(digest[:8], "big", signed=True)
+        self._head: Optional[str] = None
+
+    def config(self, connection=None):
+        from alembic.config import Config
+        config = Config()
+        config.set_main_option("script_location", self.script_location)
+        config.attributes["connection"] = connection
+        config.attributes["metadata"] = self.metadata
+        config.attributes["version_table"] = self.version_table
+        return config
+
+    @property
+    def head(self) -> str:
+        if self._head is None:
+            from alembic.script import ScriptDirectory
+            self._head = ScriptDirectory.from_config(self.config()).get_current_head()
+        return self._head
+
+    def _locked(self, work) -> None:
+        engine = create_engine(self.database_url, poolclass=pool.NullPool)
+        try:
+            with engine.connect() as connection:
+                # Session-level, so it spans every migration transaction
+                connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": self.lock_key})
+                connection.commit()
+                try:
+                    work(connection)
+                    connection.commit()
+                finally:
+                    connection.rollback()
+                    connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.lock_key})
+                    connection.commit()
+        finally:
+            engine.dispose()
+
+    def upgrade(self) -> None:
+        """Bring the database to head; safe to run from several pods at once"""
+        from alembic import command
+
+        def work(connection) -> None:
+            tables = inspect(connection).get_table_names()
+            # End the inspection's implicit transaction; Alembic's autocommit_block
+            # (CREATE INDEX CONCURRENTLY) cannot run inside one it did not begin
+            connection.commit()
+            if self.version_table in tables:
+                command.upgrade(self.config(connection), "head")
+                return
+            existing = sorted(set(tables) & set(self.metadata.tables))
+            if existing:
+                raise SchemaOutOfDate(
+                    f"{self.service} has tables ({', '.join(existing)}) but no {self.version_table}; "
+                    "record the revision they match with --stamp before migrating"
+                )
+            logger.info("Building empty %s database at revision %s", self.service, self.head)
+            for statement in self.bootstrap:
+                connection.execute(text(statement))
+            self.metadata.create_all(connection)
+            command.stamp(self.config(connection), "head")
+
+        started = time.perf_counter()
+        self._locked(work)
+        logger.info("%s schema at %s after %.2fs", self.service, self.head, time.perf_counter() - started)
+
+    def stamp(self, revision: str) -> None:
+        """Record ``revision`` as applied without running it"""
+        from alembic import command
+        self._locked(lambda connection: command.stamp(self.config(connection), revision))
+
+    async def current(self, engine: AsyncEngine) -> Optional[str]:
+        try:
+            async with engine.connect() as connection:
+                result = await connection.execute(text(f"SELECT version_num FROM {self.version_table}"))
+                return result.scalar()
+        except DBAPIError:
+            return None
+
+    async def prepare(self, engine: AsyncEngine, mode: str) -> None:
+        """Startup hook: ``check`` only verifies the revision, ``migrate`` upgrades first"""
+        if mode not in SCHEMA_MODES:
+            raise ValueError(f"Unknown schema mode {mode!r}; expected one of {SCHEMA_MODES}")
+        started = time.perf_counter()
+        if mode == "migrate":
+            await asyncio.to_thread(self.upgrade)
+        current = await self.current(engine)
+        if current != self.head:
+            raise SchemaOutOfDate(
+                f"{self.service} database is at revision {current}, this build expects "
+                f"{self.head}; run the migration job"
+            )
+        elapsed = time.perf_counter() - started
+        SCHEMA_STARTUP_SECONDS.labels(service=self.service, mode=mode).set(elapsed)
+        logger.info("%s schema %s at %s took %.3fs", self.service, mode, current, elapsed)
+
+def main(schema: SchemaManager, argv: Optional[Sequence[str]] = None) -> None:
+    """Entry point of each service's ``python -m app.migrate`` job"""
+    parser = argparse.ArgumentParser(description=f"Apply {schema.service} migrations")
+    parser.add_argument(
+        "--stamp", metavar="REVISION",
+        help="mark REVISION as applied without running it, for databases built by create_all"
+    )
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    if args.stamp:
+        schema.stamp(args.stamp)
+    schema.upgrade()
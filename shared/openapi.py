@@ -0,0 +1,70 @@
+import asyncio
+import hashlib
+import json
+from typing import Callable, Dict, Optional
+
+from fastapi import FastAPI, Request, Response
+from shared.compression import available_encoders, negotiate
+from shared.conditional import etag_matches
+
+# Encoded once per process, so the slowest, smallest settings are affordable
+_LEVELS = {"gzip": 9, "br": 11, "zstd": 19}
+
+class OpenAPIDocument:
+    """The service's OpenAPI schema, generated and encoded once.
+
+    ``start`` builds the schema in a thread during startup, so neither startup
+    nor the first /openapi.json request pays for walking the routes. The JSON
+    is serialized once and compressed once per available coding; requests
+    get the stored bytes, a strong ETag and a 304 on revalidation.
+    """
+
+    def __init__(self, app: FastAPI, build: Callable[[], dict]):
+        self.app = app
+        self.build = build
+        self.etag: Optional[str] = None
+        self._bodies: Dict[Optional[str], bytes] = {}
+        self._preference = []
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def _prepare(self) -> None:
+        schema = self.build()
+        body = json.dumps(schema, ensure_ascii=False, separators=(",", ":")).encode()
+        bodies = {None: body}
+        for name, encoder_class in available_encoders().items():
+            encoder = encoder_class(_LEVELS[name])
+            bodies[name] = encoder.compress(body) + encoder.flush()
+        self.app.openapi_schema = schema
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:20]}"'
+        self._preference = [name for name in ("zstd", "br", "gzip") if name in bodies]
+        self._bodies = bodies
+
+    async def prepare(self) -> None:
+        async with self._lock:
+            if not self._bodies:
+                await asyncio.to_thread(self._prepare)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.prepare())
+
+    def schema(self) -> dict:
+        """FastAPI ``app.openapi`` replacement; builds synchronously if startup has not yet"""
+        if not self._bodies:
+            self._prepare()
+        return self.app.openapi_schema
+
+    async def response(self, request: Request) -> Response:
+        await self.prepare()
+        headers = {"ETag": self.etag, "Cache-Control": "public, no-cache", "Vary": "Accept-Encoding"}
+        coding = negotiate(request.headers.get("accept-encoding", ""), self._preference)
+        if coding is not None:
+            # Same per-coding validator CompressionMiddleware would have produced, on the 304 too
+            headers["ETag"] = f'{self.etag[:-1]}-{coding}"'
+        if etag_matches(request.headers.get("if-none-match"), self.etag):
+            return Response(status_code=304, headers=headers)
+
+        if coding is not None:
+            headers["Content-Encoding"] = coding
+        return Response(self._bodies[coding], media_type="application/json", headers=headers)
@@ -0,0 +1,366 @@
+import asyncio
+import hmac
+import logging
+import os
+import sys
+import sysconfig
+import threading
+import time
+import uuid
+from collections import Counter as StackCounts, OrderedDict, deque
+from types import CodeType, FrameType
+from typing import Dict, Iterable, List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from prometheus_client import Counter, Histogram
+from shared.logs import request_id
+
+logger = logging.getLogger(__name__)
+
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "How late the loop monitor's timer fired",
+    ["service"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+
+EVENT_LOOP_STALLS = Counter(
+    "event_loop_stalls_total",
+    "Times one callback blocked the event loop past the stall threshold",
+    ["service"]
+)
+
+_frame_names: Dict[CodeType, str] = {}
+
+# Prefixes stripped from file names in profiles
+_PATH_PREFIXES = ("site-packages" + os.sep, sysconfig.get_paths()["stdlib"] + os.sep, os.getcwd() + os.sep)
+
+def _frame_name(frame: FrameType) -> str:
+    code = frame.f_code
+    name = _frame_names.get(code)
+    if name is None:
+        path = code.co_filename
+        for prefix in _PATH_PREFIXES:
+            if prefix in path:
+                path = path.split(prefix, 1)[1]
+                break
+        name = _frame_names[code] = f"{getattr(code, 'co_qualname', code.co_name)} ({path}:{code.co_firstlineno})"
+    return name
+
+def _stack(frame: Optional[FrameType], stop: Optional[FrameType] = None) -> Optional[List[str]]:
+    """Root-first frame names above ``frame``; None if ``stop`` is given and never reached"""
+    names = []
+    while frame is not None:
+        if frame is stop:
+            break
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    else:
+        if stop is not None:
+            return None
+    names.reverse()
+    return names
+
+def _cpu_clock(ident: int) -> Optional[float]:
+    try:
+        return time.clock_gettime(time.pthread_getcpuclockid(ident))
+    except (AttributeError, OSError):
+        return None
+
+def folded(stacks: StackCounts) -> str:
+    """Collapsed-stack text, as read by flamegraph.pl, inferno and speedscope"""
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+def sample_threads(
+    seconds: float,
+    interval: float = 0.01,
+    mode: str = "wall",
+    thread_ids: Optional[Iterable[int]] = None
+) -> StackCounts:
+    """Sample thread stacks for ``seconds``; blocking, so run it in a worker thread.
+
+    ``wall`` counts every sample. ``cpu`` counts a thread only if its CPU
+    clock advanced since the previous sample, so threads waiting on a lock or
+    socket drop out (it falls back to ``wall`` where per-thread clocks are
+    unavailable). Each stack starts with the thread's name.
+    """
+    own = threading.get_ident()
+    wanted = None if thread_ids is None else set(thread_ids)
+    names = {thread.ident: thread.name for thread in threading.enumerate()}
+    clocks: Dict[int, Optional[float]] = {}
+    stacks: StackCounts = StackCounts()
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        for ident, frame in sys._current_frames().items():
+            if ident == own or (wanted is not None and ident not in wanted):
+                continue
+            if mode == "cpu":
+                used = _cpu_clock(ident)
+                previous, clocks[ident] = clocks.get(ident), used
+                if used is not None and (previous is None or used <= previous):
+                    continue
+            stacks[";".join([names.get(ident, str(ident))] + _stack(frame))] += 1
+        time.sleep(interval)
+    return stacks
+
+def _await_stack(coro, marker: FrameType) -> Optional[List[str]]:
+    """Where a suspended task waits: its await chain below ``marker``"""
+    names = []
+    inside = False
+    node = coro
+    while node is not None:
+        frame = getattr(node, "cr_frame", None) or getattr(node, "gi_frame", None) or getattr(node, "ag_frame", None)
+        if frame is None:
+            if inside:
+                names.append(f"<waiting on {type(node).__name__}>")
+            break
+        if inside:
+            names.append(_frame_name(frame))
+        elif frame is marker:
+            inside = True
+        node = getattr(node, "cr_await", None) or getattr(node, "gi_yieldfrom", None) or getattr(node, "ag_await", None)
+    return names if inside else None
+
+class RequestProfiler:
+    """Samples one request from a thread while it runs on the event loop.
+
+    ``marker`` is the profiling middleware's own frame. A sample in which the
+    loop thread is executing below it is on-CPU time for this request; any
+    other sample is time the request spent suspended, recorded as the await
+    chain of its task (``<waiting on ...>`` at the leaf). Other requests that
+    the loop runs meanwhile are not counted.
+    """
+
+    def __init__(self, task: asyncio.Task, marker: FrameType, interval: float = 0.005):
+        self.task = task
+        self.marker = marker
+        self.interval = interval
+        self.loop_thread = threading.get_ident()
+        self.stacks: StackCounts = StackCounts()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> str:
+        self._stop.set()
+        self._thread.join()
+        return folded(self.stacks)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            names = _stack(sys._current_frames().get(self.loop_thread), self.marker)
+            if names is None:
+                names = _await_stack(self.task.get_coro(), self.marker)
+            if names:
+                self.stacks[";".join(names)] += 1
+
+# Finished request profiles by request id, newest last
+_request_profiles: "OrderedDict[str, str]" = OrderedDict()
+_MAX_REQUEST_PROFILES = 20
+
+# One timed profile at a time; they are for an operator, not for load
+_profile_lock = threading.Lock()
+
+class ProfilingMiddleware:
+    """Profiles requests that carry a valid X-Profiling-Token.
+
+    The profile is kept under the request id and its path returned in the
+    X-Profile response header. Register it first, so it is the innermost
+    middleware and runs in the same task as the endpoint. Other requests pay
+    one header scan.
+    """
+
+    def __init__(self, app, token: str, interval: float = 0.005):
+        self.app = app
+        self.token = token.encode()
+        self.interval = interval
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        supplied = None
+        for name, value in scope["headers"]:
+            if name == b"x-profiling-token":
+                supplied = value
+                break
+        if supplied is None or not hmac.compare_digest(supplied, self.token):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = request_id() or uuid.uuid4().hex
+        location = f"/debug/profiles/{profile_id}".encode("latin-1")
+
+        async def send_with_location(message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile", location)]
+            await send(message)
+
+        profiler = RequestProfiler(asyncio.current_task(), sys._getframe(), self.interval)
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_location)
+        finally:
+            _request_profiles[profile_id] = profiler.stop()
+            while len(_request_profiles) > _MAX_REQUEST_PROFILES:
+                _request_profiles.popitem(last=False)
+
+class LoopMonitor:
+    """Event-loop lag as a histogram, with the stack of any callback that blocks it.
+
+    A task sleeps ``interval`` at a time and records how late it wakes. A
+    watchdog thread checks that heartbeat; when the loop has not come back
+    for ``stall_threshold`` it captures the loop thread's stack, which is the
+    callback still running. Recent stalls are kept for ``/debug/loop`` and
+    logged. Idle cost is one timer and one thread wakeup per interval.
+    """
+
+    def __init__(self, service: str, stall_threshold: float = 0.1, interval: float = 0.1, history: int = 20):
+        self.service = service
+        self.stall_threshold = stall_threshold
+        self.interval = interval
+        self.stalls: deque = deque(maxlen=history)
+        self._lag = EVENT_LOOP_LAG.labels(service=service)
+        self._stall_count = EVENT_LOOP_STALLS.labels(service=service)
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._heartbeat = time.monotonic()
+        self._loop_thread: Optional[int] = None
+        self._current_stall: Optional[dict] = None
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._loop_thread = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._run())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+            self._stop.set()
+            self._watchdog.join()
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self._lag.observe(lag)
+            self._heartbeat = time.monotonic()
+            stall, self._current_stall = self._current_stall, None
+            if stall is not None:
+                stall["blocked_ms"] = round(lag * 1000, 1)
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.stall_threshold / 2):
+            blocked = time.monotonic() - self._heartbeat - self.interval
+            if blocked < self.stall_threshold or self._current_stall is not None:
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            stack = ";".join(_stack(frame))
+            stall = {"at": time.time(), "blocked_ms": round(blocked * 1000, 1), "stack": stack}
+            self._current_stall = stall
+            self.stalls.append(stall)
+            self._stall_count.inc()
+            logger.warning("Event loop blocked for over %.0fms", blocked * 1000, extra={"stack": stack})
+
+def profiling_router(token: str, monitor: LoopMonitor) -> APIRouter:
+    """Admin endpoints, all requiring X-Profiling-Token: timed profiles, request profiles, loop stalls"""
+
+    async def require_token(x_profiling_token: Optional[str] = Header(None)) -> None:
+        if not x_profiling_token or not hmac.compare_digest(x_profiling_token.encode(), token.encode()):
+            raise HTTPException(
+                status_code=403,
+                detail="Profiling token required"
+            )
+
+    router = APIRouter(dependencies=[Depends(require_token)], include_in_schema=False)
+
+    @router.get("/profile", response_class=PlainTextResponse)
+    async def profile(
+        seconds: float = Query(10.0, gt=0, le=60),
+        mode: str = Query("wall", pattern="^(wall|cpu)$"),
+        threads: str = Query("loop", pattern="^(loop|all)$"),
+        interval_ms: int = Query(10, ge=1, le=1000)
+    ):
+        """Folded stacks sampled over the next ``seconds``"""
+        if not _profile_lock.acquire(blocking=False):
+            raise HTTPException(
+                status_code=409,
+                detail="A profile is already running"
+            )
+        try:
+            thread_ids = [threading.get_ident()] if threads == "loop" else None
+            stacks = await asyncio.to_thread(sample_threads, seconds, interval_ms / 1000, mode, thread_ids)
+        finally:
+            _profile_lock.release()
+        return PlainTextResponse(folded(stacks))
+
+    @router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+    async def request_profile(profile_id: str):
+        """Folded stacks of a request profiled with X-Profiling-Token"""
+        stacks = _request_profiles.get(profile_id)
+        if stacks is None:
+            raise HTTPException(
+                status_code=404,
+                detail="Profile not found"
+            )
+        return PlainTextResponse(stacks)
+
+    @router.get("/loop")
+    async def loop_stalls():
+        return {
+            "stall_threshold_ms": monitor.stall_threshold * 1000,
+            "stalls": list(monitor.stalls)
+        }
+
+    return router
+
+if __name__ == "__main__":
+    # python -m shared.profiling: idle cost, and what a stall report looks like
+    async def endpoint(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    headers = [(b"host", b"localhost"), (b"accept", b"*/*"), (b"authorization", b"Bearer x")]
+
+    async def run(app, number: int) -> float:
+        started = time.perf_counter()
+        for _ in range(number):
+            await app({"type": "http", "method": "GET", "path": "/", "headers": headers}, receive, send)
+        return time.perf_counter() - started
+
+    number = 200_000
+    bare = min(asyncio.run(run(endpoint, number)) for _ in range(3))
+    wrapped = min(asyncio.run(run(ProfilingMiddleware(endpoint, "secret"), number)) for _ in range(3))
+    print(f"middleware, no token: {(wrapped - bare) / number * 1e9:5.0f} ns/request")
+
+    def hash_password():
+        time.sleep(0.3)  # stands in for bcrypt on the event loop
+
+    async def stall():
+        monitor = LoopMonitor("benchmark", stall_threshold=0.1)
+        monitor.start()
+        await asyncio.sleep(0.2)
+        hash_password()
+        await asyncio.sleep(0.2)
+        await monitor.stop()
+        return monitor.stalls
+
+    for stall in asyncio.run(stall()):
+        print(f"stall of {stall['blocked_ms']}ms in {stall['stack'].rsplit(';', 1)[-1]}")
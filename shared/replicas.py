@@ -0,0 +1,165 @@
+import asyncio
+import logging
+import random
+from typing import List, Optional
+
+from fastapi import Request
+from prometheus_client import Counter, Gauge
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from shared.engine import create_engine
+from shared.unit_of_work import session_factory
+
+logger = logging.getLogger(__name__)
+
+# Primary WAL position after a write; clients echo it back to read their own writes
+LSN_HEADER = "X-Min-LSN"
+
+REPLICA_LAG = Gauge(
+    "db_replica_lag_seconds",
+    "Replay lag of each read replica as last observed",
+    ["service", "replica"]
+)
+
+READ_ROUTING = Counter(
+    "db_read_routing_total",
+    "Read-only sessions by the node they were routed to and why",
+    ["service", "target", "reason"]
+)
+
+def parse_lsn(lsn: Optional[str]) -> int:
+    """Postgres 'X/Y' LSN as a comparable integer; 0 when absent or malformed"""
+    if not lsn:
+        return 0
+    try:
+        high, low = lsn.split("/")
+        return (int(high, 16) << 32) | int(low, 16)
+    except ValueError:
+        return 0
+
+def to_async_url(url: str) -> str:
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    return url
+
+class Replica:
+    def __init__(self, name: str, engine: AsyncEngine):
+        self.name = name
+        self.engine = engine
+        self.session_factory = session_factory(engine, read_only=True)
+        self.lag_seconds: Optional[float] = None  # None until the first successful probe
+        self.replay_lsn = 0
+
+class ReplicaRouter:
+    """Routes read-only sessions to replicas that are caught up enough.
+
+    A poller samples each replica's replay LSN and lag. A read goes to a
+    random replica whose lag is under ``max_lag_seconds`` and whose replay
+    position has reached the client's ``X-Min-LSN`` token; otherwise it
+    falls back to the primary.
+    """
+
+    def __init__(
+        self,
+        service: str,
+        primary: AsyncEngine,
+        replica_urls: List[str],
+        max_lag_seconds: float = 2.0,
+        poll_interval: float = 1.0,
+        **engine_options
+    ):
+        self.service = service
+        self.primary = primary
+        self.primary_session_factory = session_factory(primary, read_only=True)
+        self.max_lag_seconds = max_lag_seconds
+        self.poll_interval = poll_interval
+        self.replicas = [
+            Replica(f"replica-{index}", create_engine(to_async_url(url), f"{service}-replica-{index}", **engine_options))
+            for index, url in enumerate(replica_urls)
+        ]
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self.replicas and self._task is None:
+            self._task = asyncio.create_task(self._poll())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+    async def _poll(self) -> None:
+        while True:
+            await asyncio.gather(*(self._probe(replica) for replica in self.replicas))
+            await asyncio.sleep(self.poll_interval)
+
+    async def _probe(self, replica: Replica) -> None:
+        try:
+            async with replica.engine.connect() as conn:
+                row = (await conn.execute(text(
+                    "SELECT pg_last_wal_replay_lsn()::text, "
+                    "CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+                    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+                ))).one()
+            replica.replay_lsn = parse_lsn(row[0])
+            replica.lag_seconds = float(row[1] or 0)
+        except Exception:
+            logger.warning("Replica probe failed for %s", replica.name, exc_info=True)
+            replica.lag_seconds = None
+        REPLICA_LAG.labels(service=self.service, replica=replica.name).set(
+            replica.lag_seconds if replica.lag_seconds is not None else float("inf")
+        )
+
+    def choose(self, min_lsn: int = 0) -> Optional[Replica]:
+        """A healthy replica that has replayed ``min_lsn``, or None for the primary"""
+        if not self.replicas:
+            return None
+        fresh = [
+            replica for replica in self.replicas
+            if replica.lag_seconds is not None and replica.lag_seconds <= self.max_lag_seconds
+        ]
+        if not fresh:
+            READ_ROUTING.labels(service=self.service, target="primary", reason="lag").inc()
+            return None
+        caught_up = [replica for replica in fresh if replica.replay_lsn >= min_lsn]
+        if not caught_up:
+            READ_ROUTING.labels(service=self.service, target="primary", reason="read_your_writes").inc()
+            return None
+        READ_ROUTING.labels(service=self.service, target="replica", reason="ok").inc()
+        return random.choice(caught_up)
+
+    async def get_read_db(self, request: Request):
+        """Dependency for read-only handlers; sessions run in autocommit"""
+        replica = self.choose(parse_lsn(request.headers.get(LSN_HEADER)))
+        factory = replica.session_factory if replica else self.primary_session_factory
+        async with factory() as session:
+            yield session
+
+    def primary_session(self):
+        """Read-only session on the primary, for results that are cached for every client"""
+        return self.primary_session_factory()
+
+    async def write_position(self) -> Optional[str]:
+        """Current primary WAL position for the read-your-writes token"""
+        if not self.replicas:
+            return None
+        try:
+            async with self.primary.connect() as conn:
+                return (await conn.execute(text("SELECT pg_current_wal_lsn()::text"))).scalar()
+        except Exception:
+            logger.warning("Could not read primary WAL position", exc_info=True)
+            return None
+
+    def middleware(self):
+        """Stamp successful writes with the LSN clients should send on later reads"""
+        async def middleware(request: Request, call_next):
+            response = await call_next(request)
+            if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+                lsn = await self.write_position()
+                if lsn:
+                    response.headers[LSN_HEADER] = lsn
+            return response
+        return middleware
@@ -0,0 +1,389 @@
+import asyncio
+import contextvars
+import random
+import time
+from collections import deque
+from typing import Optional
+
+import httpx
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from prometheus_client import Counter, Gauge
+from shared.logs import REQUEST_ID_HEADER, request_id
+from shared.tracing import inject, start_span
+
+# Remaining request budget in milliseconds, relative so clock skew between pods does not matter
+DEADLINE_HEADER = "X-Deadline-Ms"
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+CIRCUIT_STATE = Gauge(
+    "upstream_circuit_state",
+    "Circuit breaker state (0=closed, 1=half-open, 2=open)",
+    ["upstream"]
+)
+
+UPSTREAM_REQUESTS = Counter(
+    "upstream_requests_total",
+    "Inter-service call attempts by outcome",
+    ["upstream", "outcome"]
+)
+
+UPSTREAM_HEDGES = Counter(
+    "upstream_hedged_requests_total",
+    "Hedge attempts sent after the primary exceeded the p95 delay",
+    ["upstream"]
+)
+
+UPSTREAM_RETRIES = Counter(
+    "upstream_retries_total",
+    "Retries attempted or refused by the retry budget",
+    ["upstream", "result"]
+)
+
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "request_deadline", default=None
+)
+
+class UpstreamUnavailable(Exception):
+    """Raised when an upstream call is refused or fails after retries"""
+
+class CircuitOpen(UpstreamUnavailable):
+    """Raised when the upstream's circuit breaker rejects the call"""
+
+class DeadlineExceeded(UpstreamUnavailable):
+    """Raised when the caller's deadline leaves no time for the call"""
+
+def remaining_seconds() -> Optional[float]:
+    """Time left before the current request's deadline, if one is set"""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+def deadline_middleware(default_budget_seconds: float):
+    """Adopt the caller's deadline, or start a fresh budget at the edge"""
+    async def middleware(request: Request, call_next):
+        budget = default_budget_seconds
+        header = request.headers.get(DEADLINE_HEADER)
+        if header:
+            try:
+                budget = min(budget, int(header) / 1000)
+            except ValueError:
+                pass
+        token = _deadline.set(time.monotonic() + budget)
+        try:
+            return await call_next(request)
+        finally:
+            _deadline.reset(token)
+    return middleware
+
+async def upstream_unavailable_handler(request: Request, exc: UpstreamUnavailable):
+    """Map upstream failures to 503/504 instead of a generic 500"""
+    status_code = 504 if isinstance(exc, DeadlineExceeded) else 503
+    headers = {"Retry-After": "1"} if isinstance(exc, CircuitOpen) else None
+    return JSONResponse(status_code=status_code, content={"detail": str(exc)}, headers=headers)
+
+class CircuitBreaker:
+    CLOSED = 0
+    HALF_OPEN = 1
+    OPEN = 2
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        recovery_seconds: float = 10.0,
+        half_open_probes: int = 1
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.half_open_probes = half_open_probes
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probes = 0
+        self._transition(self.CLOSED)
+
+    def allow(self) -> bool:
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.recovery_seconds:
+                return False
+            self._transition(self.HALF_OPEN)
+        if self.state == self.HALF_OPEN:
+            if self._probes >= self.half_open_probes:
+                return False
+            self._probes += 1
+        return True
+
+    def record_success(self) -> None:
+        if self.state != self.CLOSED:
+            self._transition(self.CLOSED)
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        if self.state == self.HALF_OPEN:
+            self._transition(self.OPEN)
+            return
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            self._transition(self.OPEN)
+
+    def record_cancelled(self) -> None:
+        """Give back a half-open probe slot whose call never completed"""
+        if self.state == self.HALF_OPEN and self._probes:
+            self._probes -= 1
+
+    def _transition(self, state: int) -> None:
+        self.state = state
+        self._probes = 0
+        if state == self.OPEN:
+            self.opened_at = time.monotonic()
+        elif state == self.CLOSED:
+            self.failures = 0
+        CIRCUIT_STATE.labels(upstream=self.name).set(state)
+
+class RetryBudget:
+    """Caps retries and hedges at a fraction of recent regular requests"""
+
+    def __init__(self, ratio: float = 0.1, min_per_second: float = 5.0, window_seconds: float = 10.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.window_seconds = window_seconds
+        self._requests = deque()
+        self._retries = deque()
+
+    def _trim(self, now: float) -> None:
+        cutoff = now - self.window_seconds
+        for window in (self._requests, self._retries):
+            while window and window[0] < cutoff:
+                window.popleft()
+
+    def record_request(self) -> None:
+        self._requests.append(time.monotonic())
+
+    def try_spend(self) -> bool:
+        now = time.monotonic()
+        self._trim(now)
+        allowed = self.min_per_second * self.window_seconds + self.ratio * len(self._requests)
+        if len(self._retries) >= allowed:
+            return False
+        self._retries.append(now)
+        return True
+
+class LatencyTracker:
+    """Sliding window of successful call latencies for hedge delays"""
+
+    def __init__(self, size: int = 512, min_samples: int = 50, refresh_every: int = 32):
+        self._samples = deque(maxlen=size)
+        self.min_samples = min_samples
+        self.refresh_every = refresh_every
+        self._since_refresh = 0
+        self._p95: Optional[float] = None
+
+    def observe(self, seconds: float) -> None:
+        self._samples.append(seconds)
+        self._since_refresh += 1
+        if self._since_refresh >= self.refresh_every and len(self._samples) >= self.min_samples:
+            ordered = sorted(self._samples)
+            self._p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+            self._since_refresh = 0
+
+    def p95(self) -> Optional[float]:
+        return self._p95
+
+class ResilientClient:
+    """Pooled httpx client for one upstream with deadlines, a circuit breaker,
+    budgeted retries and p95-delayed hedging of idempotent requests.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        base_url: str,
+        timeout: float = 5.0,
+        max_retries: int = 2,
+        hedge: bool = True,
+        min_hedge_delay: float = 0.01,
+        breaker: Optional[CircuitBreaker] = None,
+        retry_budget: Optional[RetryBudget] = None,
+        endpoints=None
+    ):
+        self.name = name
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.hedge = hedge
+        self.min_hedge_delay = min_hedge_delay
+        self.breaker = breaker or CircuitBreaker(name)
+        self.retry_budget = retry_budget or RetryBudget()
+        self.latency = LatencyTracker()
+        # Optional replica balancer with pick/acquire/release of endpoints carrying url,
+        # host and server_name; base_url is used when unset
+        self.endpoints = endpoints
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout)
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def get(self, path: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", path, **kwargs)
+
+    async def post(self, path: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", path, **kwargs)
+
+    async def patch(self, path: str, **kwargs) -> httpx.Response:
+        return await self.request("PATCH", path, **kwargs)
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        idempotent: Optional[bool] = None,
+        **kwargs
+    ) -> httpx.Response:
+        """Send a request; only idempotent calls are hedged or retried"""
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        self.retry_budget.record_request()
+
+        attempt = 0
+        while True:
+            response, error = None, None
+            try:
+                if idempotent and self.hedge:
+                    response = await self._hedged(method, path, kwargs)
+                else:
+                    response = await self._attempt(method, path, kwargs)
+            except (CircuitOpen, DeadlineExceeded):
+                raise
+            except httpx.TransportError as exc:
+                error = exc
+
+            if error is None and response.status_code < 500:
+                return response
+            if not idempotent or attempt >= self.max_retries:
+                break
+            if not self.retry_budget.try_spend():
+                UPSTREAM_RETRIES.labels(upstream=self.name, result="budget_exhausted").inc()
+                break
+
+            attempt += 1
+            UPSTREAM_RETRIES.labels(upstream=self.name, result="attempted").inc()
+            backoff = random.uniform(0, 0.05 * 2 ** attempt)
+            remaining = remaining_seconds()
+            if remaining is not None and remaining <= backoff:
+                break
+            await asyncio.sleep(backoff)
+
+        if response is not None:
+            return response
+        raise UpstreamUnavailable(f"{self.name} is unavailable") from error
+
+    def _attempt_timeout(self) -> float:
+        remaining = remaining_seconds()
+        if remaining is None:
+            return self.timeout
+        if remaining <= 0:
+            raise DeadlineExceeded(f"Deadline exceeded before calling {self.name}")
+        return min(self.timeout, remaining)
+
+    async def _attempt(self, method: str, path: str, kwargs: dict) -> httpx.Response:
+        timeout = self._attempt_timeout()
+        if not self.breaker.allow():
+            UPSTREAM_REQUESTS.labels(upstream=self.name, outcome="rejected").inc()
+            raise CircuitOpen(f"Circuit open for {self.name}")
+
+        headers = dict(kwargs.get("headers") or {})
+        headers[DEADLINE_HEADER] = str(int(timeout * 1000))
+        current_request_id = request_id()
+        if current_request_id:
+            headers.setdefault(REQUEST_ID_HEADER, current_request_id)
+        options = {key: value for key, value in kwargs.items() if key != "headers"}
+
+        endpoint = None
+        url = path
+        if self.endpoints is not None:
+            endpoint = self.endpoints.pick()
+            self.endpoints.acquire(endpoint)
+            url = endpoint.url + path
+            if endpoint.host:
+                # Addressed by IP; keep the service's name for Host and TLS SNI
+                headers["Host"] = endpoint.host
+                options["extensions"] = {
+                    **options.get("extensions", {}),
+                    "sni_hostname": endpoint.server_name
+                }
+
+        # One client span per attempt, so retries and hedges show up separately
+        with start_span(f"{method} {self.name}", "client", {
+            "peer.service": self.name, "http.method": method, "http.url": url
+        }) as span:
+            inject(headers, span)
+            started = time.perf_counter()
+            elapsed, ok = None, False
+            try:
+                response = await self.client.request(method, url, headers=headers, timeout=timeout, **options)
+                elapsed, ok = time.perf_counter() - started, response.status_code < 500
+            except httpx.TransportError:
+                elapsed = time.perf_counter() - started
+                self.breaker.record_failure()
+                UPSTREAM_REQUESTS.labels(upstream=self.name, outcome="transport_error").inc()
+                raise
+            except BaseException:
+                # Cancelled, or failed without reaching the upstream; says nothing about its health
+                self.breaker.record_cancelled()
+                raise
+            finally:
+                # Whatever was raised, the endpoint's in-flight slot is given back
+                if endpoint is not None:
+                    self.endpoints.release(endpoint, elapsed, ok)
+            span.set_attribute("http.status_code", response.status_code)
+            if response.status_code >= 500:
+                span.set_error()
+
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+            UPSTREAM_REQUESTS.labels(upstream=self.name, outcome="server_error").inc()
+        else:
+            self.breaker.record_success()
+            self.latency.observe(time.perf_counter() - started)
+            UPSTREAM_REQUESTS.labels(upstream=self.name, outcome="success").inc()
+        return response
+
+    async def _hedged(self, method: str, path: str, kwargs: dict) -> httpx.Response:
+        primary = asyncio.ensure_future(self._attempt(method, path, kwargs))
+        delay = self.latency.p95()
+        if delay is None:
+            return await primary
+
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=max(delay, self.min_hedge_delay))
+            if done or not self.retry_budget.try_spend():
+                return await primary
+
+            UPSTREAM_HEDGES.labels(upstream=self.name).inc()
+            pending.add(asyncio.ensure_future(self._attempt(method, path, kwargs)))
+
+            response, error = None, None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = error or task.exception()
+                        continue
+                    response = task.result()
+                    if response.status_code < 500:
+                        return response
+            if response is not None:
+                return response
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
@@ -0,0 +1,454 @@
+import asyncio
+import contextvars
+import functools
+import json
+import queue
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from prometheus_client import Counter
+from shared.logs import bind
+
+TRACEPARENT_HEADER = "traceparent"
+UNMATCHED_ROUTE = "<unmatched>"
+
+TRACES_FINISHED = Counter(
+    "traces_finished_total",
+    "Local traces by sampling decision (head, tail_error, tail_slow or dropped)",
+    ["decision"]
+)
+
+SPANS_DROPPED = Counter(
+    "trace_spans_dropped_total",
+    "Spans of kept traces that were never exported",
+    ["reason"]
+)
+
+_SPANS_OVER_LIMIT = SPANS_DROPPED.labels(reason="trace_too_large")
+
+_TRACES_BY_DECISION = {
+    decision: TRACES_FINISHED.labels(decision=decision)
+    for decision in ("head", "tail_error", "tail_slow", "dropped")
+}
+
+class SpanContext(NamedTuple):
+    trace_id: str
+    span_id: str
+    sampled: bool
+
+def parse_traceparent(value: str) -> Optional[SpanContext]:
+    """SpanContext of a W3C ``traceparent`` header, or None if it is malformed"""
+    parts = value.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16 or len(parts[3]) != 2:
+        return None
+    try:
+        flags = int(parts[3], 16)
+        if not int(parts[1], 16) or not int(parts[2], 16):
+            return None
+    except ValueError:
+        return None
+    return SpanContext(parts[1].lower(), parts[2].lower(), bool(flags & 1))
+
+def format_traceparent(context: SpanContext) -> str:
+    return f"00-{context.trace_id}-{context.span_id}-{'01' if context.sampled else '00'}"
+
+def _new_id(bits: int) -> str:
+    return "%0*x" % (bits // 4, random.getrandbits(bits) or 1)
+
+# Spans keep only perf_counter readings; wall-clock times are derived on export
+_EPOCH_OFFSET = time.time() - time.perf_counter()
+
+class NonRecordingSpan:
+    """Carries a trace context downstream without recording anything"""
+
+    recording = False
+
+    def __init__(self, context: Optional[SpanContext]):
+        self.context = context
+
+    def set_attribute(self, key: str, value) -> None:
+        pass
+
+    def record_exception(self, exc: BaseException) -> None:
+        pass
+
+    def set_error(self) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+    # Never made current, so nested spans see the same parent it passes through
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        pass
+
+_NO_SPAN = NonRecordingSpan(None)
+
+_current: contextvars.ContextVar = contextvars.ContextVar("current_span", default=_NO_SPAN)
+
+class _LocalTrace:
+    """The spans one process recorded for a trace, held until its local root ends"""
+
+    __slots__ = ("root", "spans", "sampled", "error", "kept")
+
+    def __init__(self, sampled: bool):
+        self.root: Optional["Span"] = None
+        self.spans: List["Span"] = []
+        self.sampled = sampled
+        self.error = False
+        self.kept: Optional[bool] = None
+
+class Span:
+    __slots__ = ("name", "kind", "trace_id", "span_id", "parent_id", "attributes", "duration", "error",
+                 "_trace", "_started", "_token")
+
+    recording = True
+
+    def __init__(self, name: str, kind: str, trace_id: str, parent_id: Optional[str],
+                 trace: _LocalTrace, attributes: Optional[dict] = None):
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = _new_id(64)
+        self.parent_id = parent_id
+        self.attributes = dict(attributes) if attributes else {}
+        self.duration: Optional[float] = None
+        self.error = False
+        self._trace = trace
+        self._started = time.perf_counter()
+        self._token = None
+
+    @property
+    def context(self) -> SpanContext:
+        return SpanContext(self.trace_id, self.span_id, self._trace.sampled)
+
+    def set_attribute(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.error = True
+        self.attributes["error.type"] = type(exc).__name__
+        self.attributes["error.message"] = str(exc)[:256]
+
+    def set_error(self) -> None:
+        self.error = True
+
+    def end(self) -> None:
+        if self.duration is None:
+            self.duration = time.perf_counter() - self._started
+            tracer.finish(self)
+
+    def __enter__(self):
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        if exc is not None and not isinstance(exc, asyncio.CancelledError):
+            self.record_exception(exc)
+        _current.reset(self._token)
+        self.end()
+
+    def to_dict(self, service: str) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "service": service,
+            "name": self.name,
+            "kind": self.kind,
+            "start": round(_EPOCH_OFFSET + self._started, 6),
+            "duration_ms": round(self.duration * 1000, 3),
+            "status": "error" if self.error else "ok",
+            "attributes": self.attributes,
+        }
+
+class InMemoryExporter:
+    """Keeps the most recent spans; the collector stand-in for tests and local runs"""
+
+    def __init__(self, max_spans: int = 10000):
+        self.spans: deque = deque(maxlen=max_spans)
+
+    def export(self, service: str, spans: List[Span]) -> None:
+        self.spans.extend(span.to_dict(service) for span in spans)
+
+    def traces(self) -> Dict[str, List[dict]]:
+        grouped: Dict[str, List[dict]] = {}
+        for span in self.spans:
+            grouped.setdefault(span["trace_id"], []).append(span)
+        return grouped
+
+    def shutdown(self) -> None:
+        pass
+
+class FileExporter:
+    """Appends spans as JSON lines from a writer thread; drops when it falls behind"""
+
+    def __init__(self, path: str, queue_size: int = 1000):
+        self.path = path
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._write, name="trace-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, service: str, spans: List[Span]) -> None:
+        try:
+            self._queue.put_nowait((service, spans))
+        except queue.Full:
+            SPANS_DROPPED.labels(reason="queue_full").inc(len(spans))
+
+    def _write(self) -> None:
+        with open(self.path, "a", encoding="utf-8") as output:
+            while True:
+                batch = self._queue.get()
+                if batch is None:
+                    return
+                service, spans = batch
+                output.write("".join(
+                    json.dumps(span.to_dict(service), default=str, separators=(",", ":")) + "\n"
+                    for span in spans
+                ))
+                if self._queue.empty():
+                    output.flush()
+
+    def shutdown(self) -> None:
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+class Tracer:
+    """Records spans for sampled traces and hands finished ones to the exporter.
+
+    Head sampling follows the caller's ``traceparent`` flag, or samples new
+    traces at ``head_sample_rate``. With tail sampling (``tail_latency_seconds``
+    above 0) every request is recorded in memory until its local root span
+    ends, and unsampled traces are still exported if they failed or were slow.
+    That decision is per service: a slow id-service request is kept in full,
+    the user-service calls inside it only if they were slow themselves.
+    Without an exporter nothing is recorded, but an incoming trace context is
+    still passed downstream.
+    """
+
+    def __init__(self):
+        self.service = "unknown"
+        self.exporter = None
+        self.head_sample_rate = 1.0
+        self.tail_latency_seconds = 0.0
+        self.max_spans_per_trace = 256
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def start_trace(self, name: str, remote: Optional[SpanContext] = None, kind: str = "server",
+                    attributes: Optional[dict] = None):
+        """Local root span, continuing ``remote`` if the caller sent one"""
+        if remote is not None:
+            sampled = remote.sampled
+        else:
+            sampled = self.enabled and random.random() < self.head_sample_rate
+        if not (self.enabled and (sampled or self.tail_latency_seconds > 0)):
+            if remote is not None:
+                return NonRecordingSpan(remote)
+            if not self.enabled:
+                return _NO_SPAN
+            # Unsampled, but downstream services should still join one trace
+            return NonRecordingSpan(SpanContext(_new_id(128), _new_id(64), False))
+
+        trace_id = remote.trace_id if remote is not None else _new_id(128)
+        trace = _LocalTrace(sampled)
+        span = Span(name, kind, trace_id, remote.span_id if remote is not None else None, trace, attributes)
+        trace.root = span
+        return span
+
+    def start_span(self, name: str, kind: str = "internal", attributes: Optional[dict] = None):
+        """Child of the current span; outside a recorded trace, the current span itself"""
+        parent = _current.get()
+        if not parent.recording:
+            return parent
+        return Span(name, kind, parent.trace_id, parent.span_id, parent._trace, attributes)
+
+    def finish(self, span: Span) -> None:
+        trace = span._trace
+        if span.error:
+            trace.error = True
+        if trace.kept is not None:
+            # Ended after its local root, e.g. a losing hedge that was cancelled
+            if trace.kept and self.exporter is not None:
+                self.exporter.export(self.service, [span])
+            return
+        if len(trace.spans) < self.max_spans_per_trace:
+            trace.spans.append(span)
+        else:
+            _SPANS_OVER_LIMIT.inc()
+        if span is not trace.root:
+            return
+
+        if trace.sampled:
+            decision = "head"
+        elif trace.error:
+            decision = "tail_error"
+        elif span.duration >= self.tail_latency_seconds:
+            decision = "tail_slow"
+        else:
+            decision = "dropped"
+        _TRACES_BY_DECISION[decision].inc()
+        trace.kept = decision != "dropped"
+        if trace.kept and self.exporter is not None:
+            self.exporter.export(self.service, trace.spans)
+        # Breaks the trace/span reference cycle so no garbage collection is needed
+        trace.root = None
+        trace.spans = []
+
+tracer = Tracer()
+
+def configure_tracing(
+    service: str,
+    exporter: str = "none",
+    file_path: str = "traces.jsonl",
+    head_sample_rate: float = 0.01,
+    tail_latency_ms: int = 500
+) -> None:
+    """Set the service's exporter (``none``, ``file`` or ``memory``) and sampling"""
+    if exporter not in ("none", "file", "memory"):
+        raise ValueError(f"Unknown trace exporter {exporter!r}; expected none, file or memory")
+    shutdown_tracing()
+    tracer.service = service
+    tracer.head_sample_rate = head_sample_rate
+    tracer.tail_latency_seconds = tail_latency_ms / 1000
+    if exporter == "file":
+        tracer.exporter = FileExporter(file_path)
+    elif exporter == "memory":
+        tracer.exporter = InMemoryExporter()
+    else:
+        tracer.exporter = None
+
+def shutdown_tracing() -> None:
+    """Write out what the exporter holds"""
+    if tracer.exporter is not None:
+        tracer.exporter.shutdown()
+        tracer.exporter = None
+
+def current_span():
+    return _current.get()
+
+def start_span(name: str, kind: str = "internal", attributes: Optional[dict] = None):
+    """Child of the current span; use as a context manager to make it current"""
+    return tracer.start_span(name, kind, attributes)
+
+def inject(headers: dict, span=None) -> None:
+    """Add the ``traceparent`` of ``span``, by default the current one, to outgoing headers"""
+    context = (span or _current.get()).context
+    if context is not None:
+        headers[TRACEPARENT_HEADER] = format_traceparent(context)
+
+def traced(name: str):
+    """Decorator wrapping each call of a function or coroutine function in a span"""
+    def decorate(function):
+        if asyncio.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def wrapper(*args, **kwargs):
+                with tracer.start_span(name):
+                    return await function(*args, **kwargs)
+        else:
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with tracer.start_span(name):
+                    return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+class TracingMiddleware:
+    """Server span per request, continuing the caller's ``traceparent``.
+
+    The span is named after the route template once routing has run, and its
+    trace id is added to the request's log context. Register it inside
+    RequestContextMiddleware.
+    """
+
+    def __init__(self, app, exclude: Iterable[str] = ("/metrics", "/health")):
+        self.app = app
+        self.exclude = frozenset(exclude)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exclude:
+            await self.app(scope, receive, send)
+            return
+
+        remote = None
+        for name, value in scope["headers"]:
+            if name == b"traceparent":
+                remote = parse_traceparent(value.decode("latin-1"))
+                break
+        method = scope["method"]
+        span = tracer.start_trace(method, remote, attributes={"http.method": method, "http.target": scope["path"]})
+        if span.context is None:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        token = _current.set(span)
+        bind(trace_id=span.context.trace_id)
+        try:
+            await self.app(scope, receive, send_with_status)
+        except Exception as exc:
+            span.record_exception(exc)
+            raise
+        finally:
+            _current.reset(token)
+            if span.recording:
+                route = scope.get("route")
+                span.name = f"{method} {route.path if route is not None else UNMATCHED_ROUTE}"
+                span.set_attribute("http.status_code", status)
+                if status >= 500:
+                    span.set_error()
+            span.end()
+
+if __name__ == "__main__":
+    # python -m shared.tracing: tracing cost per request with three child spans
+    route = type("Route", (), {"path": "/institutional-ids"})()
+
+    async def endpoint(scope, receive, send):
+        scope["route"] = route
+        for name in ("auth.verify", "db SELECT", "db UPDATE"):
+            with start_span(name, "client"):
+                pass
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    async def run(app, number: int) -> float:
+        started = time.perf_counter()
+        for _ in range(number):
+            scope = {"type": "http", "method": "POST", "path": "/institutional-ids", "headers": []}
+            await app(scope, receive, send)
+        return time.perf_counter() - started
+
+    number = 100_000
+    traced_app = TracingMiddleware(endpoint)
+    bare = min(asyncio.run(run(endpoint, number)) for _ in range(3))
+    for label, exporter, head, tail in (
+        ("disabled", "none", 0.0, 0),
+        ("head 1%", "memory", 0.01, 0),
+        ("head 1% + tail", "memory", 0.01, 500),
+        ("head 100%", "memory", 1.0, 0),
+    ):
+        configure_tracing("benchmark", exporter, head_sample_rate=head, tail_latency_ms=tail)
+        timed = min(asyncio.run(run(traced_app, number)) for _ in range(3))
+        print(f"{label:>15}: {(timed - bare) / number * 1e9:7.0f} ns/request overhead")
+    shutdown_tracing()
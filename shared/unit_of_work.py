@@ -0,0 +1,107 @@
+import contextvars
+import re
+from typing import Optional
+
+from fastapi import Request
+from prometheus_client import Histogram
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql.elements import TextClause
+
+QUERY_COUNT_HEADER = "X-DB-Query-Count"
+
+QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request",
+    "SQL statements executed while handling one request",
+    ["service", "method"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+)
+
+_query_count: contextvars.ContextVar[Optional[list]] = contextvars.ContextVar("db_query_count", default=None)
+
+class UnitOfWorkSession(Session):
+    """Session that remembers whether the current transaction wrote anything"""
+
+# Raw SQL is treated as a write unless it plainly only reads
+_READ_ONLY_SQL = re.compile(r"\s*(SELECT|SHOW|EXPLAIN)\b", re.IGNORECASE)
+
+@event.listens_for(UnitOfWorkSession, "do_orm_execute")
+def _mark_dml(state):
+    if state.is_insert or state.is_update or state.is_delete:
+        state.session.info["writes"] = True
+    elif isinstance(state.statement, TextClause) and not _READ_ONLY_SQL.match(state.statement.text):
+        state.session.info["writes"] = True
+
+@event.listens_for(UnitOfWorkSession, "after_flush")
+def _mark_flush(session, flush_context):
+    session.info["writes"] = True
+
+@event.listens_for(UnitOfWorkSession, "after_commit")
+@event.listens_for(UnitOfWorkSession, "after_rollback")
+def _reset_writes(session):
+    session.info["writes"] = False
+
+def session_factory(engine: AsyncEngine, read_only: bool = False) -> sessionmaker:
+    """Sessions for the unit of work; read-only ones run in autocommit, without BEGIN/COMMIT"""
+    if read_only:
+        engine = engine.execution_options(isolation_level="AUTOCOMMIT")
+    return sessionmaker(
+        engine,
+        class_=AsyncSession,
+        sync_session_class=UnitOfWorkSession,
+        expire_on_commit=False
+    )
+
+def unit_of_work(factory: sessionmaker):
+    """Request-scoped session dependency that commits once, and only after writes.
+
+    Handlers add or change objects and ``flush()`` when they need generated
+    keys; the dependency flushes what is left and commits once. Declare it
+    as ``Depends(get_db, scope="function")`` so the commit runs when the
+    handler returns, before the response is sent: a failed commit is then a
+    500, not a 2xx, and the X-Min-LSN token is read after the commit.
+    Handlers that must act after the commit (cache invalidation, calls to
+    other services) may still commit themselves; nothing is re-committed
+    unless they write again. Writes are detected from ORM flushes, Core
+    DML and ``text()`` SQL other than SELECT/SHOW/EXPLAIN; statements run on
+    ``session.connection()`` directly are not seen and need an explicit
+    commit. Requests that only read end with a rollback, which sends
+    nothing when no transaction was started.
+    """
+    async def get_db():
+        async with factory() as session:
+            try:
+                yield session
+                if session.new or session.dirty or session.deleted:
+                    await session.flush()
+                if session.info.get("writes"):
+                    await session.commit()
+                else:
+                    await session.rollback()
+            except Exception:
+                await session.rollback()
+                raise
+    return get_db
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    # Primary and replica engines alike; counted against the request that issued them
+    counter = _query_count.get()
+    if counter is not None:
+        counter[0] += 1
+
+def query_count_middleware(service: str):
+    """Expose the per-request statement count as a header and a histogram"""
+    async def middleware(request: Request, call_next):
+        counter = [0]
+        token = _query_count.set(counter)
+        try:
+            response = await call_next(request)
+        finally:
+            _query_count.reset(token)
+        QUERIES_PER_REQUEST.labels(service=service, method=request.method).observe(counter[0])
+        response.headers[QUERY_COUNT_HEADER] = str(counter[0])
+        return response
+    return middleware
@@ -0,0 +1,56 @@
+"""resident search columns and indexes
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    op.add_column('users', sa.Column('institution_id', sa.Integer()))
+    # Filled by the ORM on write and by the service's search indexer for existing rows
+    op.add_column('users', sa.Column('search_name', sa.String(255, collation='C')))
+    op.add_column('users', sa.Column('phonetic_keys', postgresql.ARRAY(sa.String(16))))
+
+    # Built without blocking writes on a populated table
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_users_search_name_trgm', 'users', ['search_name'],
+            postgresql_using='gin', postgresql_ops={'search_name': 'gin_trgm_ops'},
+            postgresql_concurrently=True
+        )
+        op.create_index('ix_users_search_name', 'users', ['search_name', 'id'], postgresql_concurrently=True)
+        op.create_index(
+            'ix_users_phonetic_keys', 'users', ['phonetic_keys'],
+            postgresql_using='gin', postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_users_institution_status_dob', 'users',
+            ['institution_id', 'status', 'date_of_birth', 'id'],
+            postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_users_search_pending', 'users', ['id'],
+            postgresql_where=sa.text('search_name IS NULL'),
+            postgresql_concurrently=True
+        )
+
+def downgrade() -> None:
+    op.drop_index('ix_users_search_pending')
+    op.drop_index('ix_users_institution_status_dob')
+    op.drop_index('ix_users_phonetic_keys')
+    op.drop_index('ix_users_search_name')
+    op.drop_index('ix_users_search_name_trgm')
+    op.drop_column('users', 'phonetic_keys')
+    op.drop_column('users', 'search_name')
+    op.drop_column('users', 'institution_id')
@@ -0,0 +1,70 @@
+"""duplicate registration detection
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # Filled with the search columns by the service's indexer, which now tracks this column
+    op.add_column('users', sa.Column('blocking_keys', postgresql.ARRAY(sa.String(64))))
+    op.add_column('users', sa.Column('duplicates_checked_at', sa.DateTime()))
+
+    op.create_table(
+        'duplicate_candidates',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('duplicate_user_id', sa.Integer(), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.Column('status', sa.String(20), nullable=False, server_default='open'),
+        sa.Column('source', sa.String(20), nullable=False),
+        sa.Column('detected_at', sa.DateTime(), default=sa.func.now()),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['duplicate_user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'duplicate_user_id', name='uq_duplicate_candidates_pair')
+    )
+    op.create_index('ix_duplicate_candidates_id', 'duplicate_candidates', ['id'])
+    op.create_index('ix_duplicate_candidates_duplicate_user_id', 'duplicate_candidates', ['duplicate_user_id'])
+
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_users_search_pending', postgresql_concurrently=True)
+        op.create_index(
+            'ix_users_index_pending', 'users', ['id'],
+            postgresql_where=sa.text('blocking_keys IS NULL'),
+            postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_users_blocking_keys', 'users', ['blocking_keys'],
+            postgresql_using='gin', postgresql_concurrently=True
+        )
+        op.create_index('ix_users_phone_number', 'users', ['phone_number'], postgresql_concurrently=True)
+        op.create_index(
+            'ix_users_duplicates_pending', 'users', ['id'],
+            postgresql_where=sa.text('duplicates_checked_at IS NULL'),
+            postgresql_concurrently=True
+        )
+
+def downgrade() -> None:
+    op.drop_index('ix_users_duplicates_pending')
+    op.drop_index('ix_users_phone_number')
+    op.drop_index('ix_users_blocking_keys')
+    op.drop_index('ix_users_index_pending')
+    op.create_index(
+        'ix_users_search_pending', 'users', ['id'],
+        postgresql_where=sa.text('search_name IS NULL')
+    )
+    op.drop_index('ix_duplicate_candidates_duplicate_user_id')
+    op.drop_index('ix_duplicate_candidates_id')
+    op.drop_table('duplicate_candidates')
+    op.drop_column('users', 'duplicates_checked_at')
+    op.drop_column('users', 'blocking_keys')
@@ -0,0 +1,78 @@
+"""bulk resident import
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.execute(sa.schema.CreateSequence(sa.Sequence('resident_main_id_seq')))
+
+    op.create_table(
+        'import_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('institution_id', sa.Integer()),
+        sa.Column('created_by', sa.Integer(), nullable=False),
+        sa.Column('format', sa.String(10), nullable=False),
+        sa.Column('filename', sa.String(255)),
+        sa.Column('spool_path', sa.String(500), nullable=False),
+        sa.Column('status', sa.String(20), nullable=False, server_default='pending'),
+        sa.Column('records_processed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('records_inserted', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('records_rejected', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('active_seconds', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('read_seconds', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('write_seconds', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('error', sa.String(1000)),
+        sa.Column('created_at', sa.DateTime(), default=sa.func.now()),
+        sa.Column('started_at', sa.DateTime()),
+        sa.Column('finished_at', sa.DateTime()),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_import_jobs_id', 'import_jobs', ['id'])
+
+    op.create_table(
+        'import_rejects',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('job_id', sa.Integer(), nullable=False),
+        sa.Column('record_number', sa.Integer(), nullable=False),
+        sa.Column('errors', postgresql.JSON(astext_type=sa.Text()), nullable=False),
+        sa.ForeignKeyConstraint(['job_id'], ['import_jobs.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_import_rejects_job_id', 'import_rejects', ['job_id'])
+
+    op.create_table(
+        'biometric_enrollments',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('import_job_id', sa.Integer()),
+        sa.Column('status', sa.String(20), nullable=False, server_default='pending'),
+        sa.Column('requested_at', sa.DateTime(), default=sa.func.now()),
+        sa.Column('completed_at', sa.DateTime()),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['import_job_id'], ['import_jobs.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id')
+    )
+    op.create_index('ix_biometric_enrollments_id', 'biometric_enrollments', ['id'])
+    op.create_index('ix_biometric_enrollments_status', 'biometric_enrollments', ['status'])
+
+def downgrade() -> None:
+    op.drop_index('ix_biometric_enrollments_status')
+    op.drop_index('ix_biometric_enrollments_id')
+    op.drop_table('biometric_enrollments')
+    op.drop_index('ix_import_rejects_job_id')
+    op.drop_table('import_rejects')
+    op.drop_index('ix_import_jobs_id')
+    op.drop_table('import_jobs')
+    op.execute(sa.schema.DropSequence(sa.Sequence('resident_main_id_seq')))
@@ -0,0 +1,37 @@
+"""admin action audit trail
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table(
+        'admin_actions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('admin_id', sa.Integer(), nullable=False),
+        sa.Column('action_type', sa.String(50), nullable=False),
+        sa.Column('user_id', sa.Integer()),
+        sa.Column('details', postgresql.JSON(astext_type=sa.Text())),
+        sa.Column('created_at', sa.DateTime(), default=sa.func.now()),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_admin_actions_id', 'admin_actions', ['id'])
+    op.create_index('ix_admin_actions_admin_id', 'admin_actions', ['admin_id'])
+    op.create_index('ix_admin_actions_user_id', 'admin_actions', ['user_id'])
+
+def downgrade() -> None:
+    op.drop_index('ix_admin_actions_user_id')
+    op.drop_index('ix_admin_actions_admin_id')
+    op.drop_index('ix_admin_actions_id')
+    op.drop_table('admin_actions')
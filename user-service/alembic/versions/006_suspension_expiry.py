@@ -0,0 +1,25 @@
+"""suspension end dates and expiry index
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('suspension_end_date', sa.DateTime()))
+    op.create_index(
+        'ix_users_suspension_expiry', 'users', ['suspension_end_date', 'id'],
+        postgresql_where=sa.text("status = 'suspended' AND suspension_end_date IS NOT NULL")
+    )
+
+def downgrade() -> None:
+    op.drop_index('ix_users_suspension_expiry')
+    op.drop_column('users', 'suspension_end_date')
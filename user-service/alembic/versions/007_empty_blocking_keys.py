@@ -0,0 +1,28 @@
+"""drop blocking keys built from empty names
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+_EMPTY_NAME_KEY = "key = 'n:|' OR key LIKE 'f:|%' OR key LIKE 'l:|%'"
+
+def upgrade() -> None:
+    # Such keys grouped every resident missing a name into one block
+    op.execute(f"""
+        UPDATE users
+        SET blocking_keys = ARRAY(
+            SELECT key FROM unnest(blocking_keys) AS key WHERE NOT ({_EMPTY_NAME_KEY})
+        )
+        WHERE EXISTS (SELECT 1 FROM unnest(blocking_keys) AS key WHERE {_EMPTY_NAME_KEY})
+    """)
+
+def downgrade() -> None:
+    pass
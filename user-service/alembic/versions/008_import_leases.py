@@ -0,0 +1,35 @@
+"""import job leases and spooled uploads in the database
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column('import_jobs', sa.Column('lease_owner', sa.String(100)))
+    op.add_column('import_jobs', sa.Column('lease_expires_at', sa.DateTime()))
+    op.alter_column('import_jobs', 'spool_path', existing_type=sa.String(500), nullable=True)
+
+    op.create_table(
+        'import_spool_chunks',
+        sa.Column('job_id', sa.Integer(), nullable=False),
+        sa.Column('sequence', sa.Integer(), nullable=False),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+        sa.ForeignKeyConstraint(['job_id'], ['import_jobs.id'], ),
+        sa.PrimaryKeyConstraint('job_id', 'sequence')
+    )
+
+def downgrade() -> None:
+    op.drop_table('import_spool_chunks')
+    op.execute("UPDATE import_jobs SET spool_path = '' WHERE spool_path IS NULL")
+    op.alter_column('import_jobs', 'spool_path', existing_type=sa.String(500), nullable=False)
+    op.drop_column('import_jobs', 'lease_expires_at')
+    op.drop_column('import_jobs', 'lease_owner')
@@ -0,0 +1,127 @@
+from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import insert
+from sqlalchemy.future import select
+from app.core.database import get_db, get_read_db
+from app.core.auth import require_permissions, Permissions, Principal
+from app.core.models import User, ImportJob, ImportReject, ImportSpoolChunk, BiometricEnrollment
+from app.core.schemas.imports import ImportJobResponse, ImportRejectResponse, BiometricEnrollmentResponse
+from app.core.imports import import_runner
+from typing import List, Optional
+
+router = APIRouter()
+
+require_import = require_permissions(Permissions.IMPORT_USERS)
+
+def _institution_for(principal: Principal, institution_id: Optional[int]) -> Optional[int]:
+    if principal.is_super_admin:
+        return institution_id
+    if principal.institution_id is None or institution_id not in (None, principal.institution_id):
+        raise HTTPException(status_code=403, detail="Cannot import into a different institution")
+    return principal.institution_id
+
+async def _get_job(db: AsyncSession, job_id: int, principal: Principal) -> ImportJob:
+    job = await db.get(ImportJob, job_id)
+    if job is None or (not principal.is_super_admin and job.institution_id != principal.institution_id):
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
+
+@router.post("/", response_model=ImportJobResponse, status_code=202)
+async def create_import(
+    file: UploadFile = File(..., description="CSV with a header row, or NDJSON"),
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$", description="Defaults from the file extension"),
+    institution_id: Optional[int] = None,
+    principal: Principal = Depends(require_import),
+    db: AsyncSession = Depends(get_db, scope="function")
+):
+    """Start a bulk resident import; progress is polled from the returned job"""
+    institution_id = _institution_for(principal, institution_id)
+    format = format or ("csv" if (file.filename or "").lower().endswith(".csv") else "ndjson")
+
+    job = ImportJob(
+        institution_id=institution_id,
+        created_by=principal.user_id,
+        format=format,
+        filename=file.filename
+    )
+    db.add(job)
+    await db.flush()
+
+    # Spool to the database in 1 MiB pieces, so any replica can resume from the same bytes;
+    # core inserts keep the pieces out of the session
+    sequence = 0
+    while True:
+        piece = await file.read(1 << 20)
+        if not piece:
+            break
+        await db.execute(insert(ImportSpoolChunk).values(job_id=job.id, sequence=sequence, data=piece))
+        sequence += 1
+
+    # The runner reads the job in its own session
+    await db.commit()
+    import_runner.submit(job.id)
+    return job
+
+@router.get("/enrollments", response_model=List[BiometricEnrollmentResponse])
+async def list_enrollments(
+    status: str = "pending",
+    after_id: int = Query(0, ge=0, description="Last id of the previous page"),
+    limit: int = Query(100, ge=1, le=1000),
+    principal: Principal = Depends(require_import),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Residents waiting for biometric capture, oldest first"""
+    query = select(BiometricEnrollment).where(
+        BiometricEnrollment.status == status,
+        BiometricEnrollment.id > after_id
+    )
+    if not principal.is_super_admin:
+        query = query.join(User, User.id == BiometricEnrollment.user_id).where(
+            User.institution_id == principal.institution_id
+        )
+    result = await db.execute(query.order_by(BiometricEnrollment.id).limit(limit))
+    return result.scalars().all()
+
+@router.get("/{job_id}", response_model=ImportJobResponse)
+async def get_import(
+    job_id: int,
+    principal: Principal = Depends(require_import),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Job progress and throughput report"""
+    return await _get_job(db, job_id, principal)
+
+@router.get("/{job_id}/rejects", response_model=List[ImportRejectResponse])
+async def list_import_rejects(
+    job_id: int,
+    after_record: int = Query(0, ge=0, description="Last record_number of the previous page"),
+    limit: int = Query(100, ge=1, le=1000),
+    principal: Principal = Depends(require_import),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Records that failed validation or conflicted with existing residents"""
+    await _get_job(db, job_id, principal)
+    result = await db.execute(
+        select(ImportReject)
+        .where(ImportReject.job_id == job_id, ImportReject.record_number > after_record)
+        .order_by(ImportReject.record_number)
+        .limit(limit)
+    )
+    return result.scalars().all()
+
+@router.post("/{job_id}/resume", response_model=ImportJobResponse, status_code=202)
+async def resume_import(
+    job_id: int,
+    principal: Principal = Depends(require_import),
+    db: AsyncSession = Depends(get_db, scope="function")
+):
+    """Continue a failed job from its last committed chunk"""
+    job = await _get_job(db, job_id, principal)
+    if job.status != "failed":
+        raise HTTPException(status_code=409, detail=f"Import job is {job.status}")
+    job.status = "pending"
+    job.error = None
+    job.finished_at = None
+    await db.commit()
+    import_runner.submit(job.id)
+    return job
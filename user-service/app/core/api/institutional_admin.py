@@ -1,15 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, Security, File, UploadFile, Query
+from fastapi import APIRouter, Depends, HTTPException, Security, File, UploadFile, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import or_, update
 from sqlalchemy.future import select
-from app.core.database import get_db
-from app.core.auth import get_current_user, require_institutional_admin, has_permission
-from app.core.schemas.user import UserCreate, UserResponse, UserUpdate
-from app.core.schemas.institutional_admin import UserSuspend, UpdateApproval, AdminActionLog
-from app.core.models import User, BiometricData, UpdateRequest, AdminAction
+from app.core.config import settings
+from app.core.database import get_db, get_read_db
+from app.core.auth import (
+    get_current_user, require_institutional_admin, require_permissions,
+    Permissions, Principal
+)
+from app.core.schemas.user import UserCreate, UserResponse, UserUpdate, ResidentSuggestion
+from app.core.search import ResidentFilters, search_residents, typeahead, duplicate_detector
+from app.core.schemas.institutional_admin import (
+    UserSuspend, UpdateApproval, AdminActionLog, DuplicateCandidateResponse,
+    BatchReview, ReviewResult
+)
+from app.core.reviews import review_batch
+from app.core.suspensions import suspension_scheduler
+from app.core.events.publisher import user_events
+from app.core.models import User, BiometricData, BiometricEnrollment, UpdateRequest, AdminAction, DuplicateCandidate
 from app.core.biometrics.fingerprint_handler import FingerPrintHandler
 from app.core.utils.serializer import DataSerializer
 from typing import List, Optional
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import asyncio
 
 router = APIRouter()
@@ -20,8 +32,9 @@ serializer = DataSerializer()
 async def register_user(
     user: UserCreate,
     photo_file: UploadFile = File(...),
+    allow_duplicates: bool = Query(False, description="Register even if probable duplicates are found"),
     current_user: User = Security(get_current_user, scopes=["institutional_admin"]),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     """Register a new resident"""
     # Verify admin's institution is active
@@ -39,27 +52,45 @@ async def register_user(
         )
 
     try:
-        # Check for existing user with same email or phone
-        result = await db.execute(
-            select(User).where(
-                (User.email == user.email) | 
-                (User.phone_number == user.phone_number)
-            )
-        )
-        if result.scalar_one_or_none():
+        # Check for existing user with same email or phone; both columns are indexed
+        contacts = []
+        if user.email:
+            contacts.append(User.email == user.email)
+        if user.phone_number:
+            contacts.append(User.phone_number == user.phone_number)
+        if contacts:
+            result = await db.execute(select(User.id).where(or_(*contacts)).limit(1))
+            if result.scalar_one_or_none() is not None:
+                raise HTTPException(
+                    status_code=400,
+                    detail="User with this email or phone number already exists"
+                )
+
+        # Same person under a variant spelling or mistyped birth date
+        duplicates = await duplicate_detector.find(user.dict())
+        if duplicates and not allow_duplicates:
             raise HTTPException(
-                status_code=400,
-                detail="User with this email or phone number already exists"
+                status_code=409,
+                detail={
+                    "message": "Probable duplicate registration",
+                    "candidates": [
+                        {"user_id": user_id, "score": score} for user_id, score in duplicates
+                    ]
+                }
             )
 
         # Create user
         db_user = User(
             **user.dict(),
             created_by=current_user.id,
-            institution_id=current_user.institution_id
+            institution_id=current_user.institution_id,
+            # Left unset when the check timed out so the background scan covers it
+            duplicates_checked_at=datetime.utcnow() if duplicates is not None else None
         )
         db.add(db_user)
         await db.flush()
+        if duplicates:
+            duplicate_detector.record(db, db_user.id, duplicates, source="registration")
 
         # Capture and store biometric data
         template = await capture_fingerprint_with_retry()
@@ -81,10 +112,12 @@ async def register_user(
         )
         db.add(action_log)
 
-        await db.commit()
-        await db.refresh(db_user)
+        await db.flush()
         return db_user
 
+    except HTTPException:
+        await db.rollback()
+        raise
     except Exception as e:
         await db.rollback()
         raise HTTPException(
@@ -94,12 +127,49 @@ async def register_user(
     finally:
         fingerprint_handler.close()
 
+@router.post("/users/{user_id}/biometrics", response_model=UserResponse)
+async def enroll_biometrics(
+    user_id: int,
+    photo_file: UploadFile = File(...),
+    current_user: User = Security(get_current_user, scopes=["institutional_admin"]),
+    db: AsyncSession = Depends(get_db, scope="function")
+):
+    """Capture biometrics for a resident registered without them, e.g. by bulk import"""
+    user = await db.get(User, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    if user.institution_id != current_user.institution_id:
+        raise HTTPException(
+            status_code=403,
+            detail="Cannot enroll user from different institution"
+        )
+
+    if not fingerprint_handler.initialize():
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to initialize fingerprint system"
+        )
+
+    try:
+        template = await capture_fingerprint_with_retry()
+        if not template:
+            raise HTTPException(
+                status_code=400,
+                detail="Failed to capture fingerprint"
+            )
+        await save_biometric_data(db, user, template, photo_file)
+        await db.flush()
+        return user
+    finally:
+        fingerprint_handler.close()
+
 @router.patch("/users/{user_id}/suspend", response_model=UserResponse)
 async def suspend_user_id(
     user_id: int,
     suspension: UserSuspend,
     current_user: User = Security(get_current_user, scopes=["institutional_admin"]),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     """Suspend a user's ID"""
     # Get user and verify institution
@@ -117,7 +187,8 @@ async def suspend_user_id(
     user.status = "suspended"
     user.last_updated_by = current_user.id
     
-    # Calculate suspension end date if duration provided
+    # Calculate suspension end date if duration provided; otherwise until lifted
+    user.suspension_end_date = None
     if suspension.suspension_duration_days:
         user.suspension_end_date = datetime.utcnow() + timedelta(
             days=suspension.suspension_duration_days
@@ -136,8 +207,15 @@ async def suspend_user_id(
     )
     db.add(action_log)
 
+    # Commit before evicting so no request re-caches the old status
     await db.commit()
-    await db.refresh(user)
+    await user_events.publish("user.suspended", {
+        "user_id": user_id,
+        "institution_id": user.institution_id,
+        "suspension_end_date": user.suspension_end_date.isoformat() if user.suspension_end_date else None
+    })
+    if user.suspension_end_date:
+        suspension_scheduler.notify(user.suspension_end_date)
     return user
 
 @router.get("/update-requests", response_model=List[UpdateRequest])
@@ -146,7 +224,7 @@ async def list_update_requests(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
     current_user: User = Security(get_current_user, scopes=["institutional_admin"]),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     """List update requests for users in admin's institution"""
     query = select(UpdateRequest).join(User).where(
@@ -165,7 +243,7 @@ async def review_update_request(
     request_id: int,
     approval: UpdateApproval,
     current_user: User = Security(get_current_user, scopes=["institutional_admin"]),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     """Review and approve/reject an update request"""
     update_request = await db.get(UpdateRequest, request_id)
@@ -208,19 +286,94 @@ async def review_update_request(
     )
     db.add(action_log)
 
-    await db.commit()
-    await db.refresh(update_request)
+    await db.flush()
     return update_request
 
+@router.post("/update-requests/review-batch", response_model=List[ReviewResult])
+async def review_update_requests(
+    batch: BatchReview,
+    principal: Principal = Depends(require_permissions(Permissions.UPDATE_USER)),
+    db: AsyncSession = Depends(get_db, scope="function")
+):
+    """Approve or reject many update requests in one transaction, with a result per request"""
+    if len(batch.decisions) > settings.REVIEW_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=422,
+            detail=f"At most {settings.REVIEW_BATCH_MAX_SIZE} decisions per batch"
+        )
+    return await review_batch(db, batch.decisions, principal)
+
+def _resident_filters(principal: Principal, institution_id: Optional[int], **filters) -> ResidentFilters:
+    """Filters for a search, confined to the caller's institution unless super admin"""
+    if not principal.is_super_admin:
+        if principal.institution_id is None or institution_id not in (None, principal.institution_id):
+            raise HTTPException(
+                status_code=403,
+                detail="Cannot search users from different institution"
+            )
+        institution_id = principal.institution_id
+    return ResidentFilters(institution_id=institution_id, **filters)
+
 @router.get("/users", response_model=List[UserResponse])
-@has_permission(["view_users"])
 async def list_users(
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    response: Response,
+    q: Optional[str] = Query(None, description="Name in Latin or Ethiopic script; misspellings are tolerated"),
+    institution_id: Optional[int] = None,
+    status: Optional[str] = None,
+    date_of_birth: Optional[date] = None,
+    born_after: Optional[date] = None,
+    born_before: Optional[date] = None,
+    limit: int = Query(20, ge=1, le=settings.SEARCH_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    principal: Principal = Depends(require_permissions(Permissions.VIEW_USERS)),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Search residents by name, best matches first, with keyset pagination"""
+    filters = _resident_filters(
+        principal, institution_id,
+        status=status,
+        date_of_birth=date_of_birth,
+        born_after=born_after,
+        born_before=born_before
+    )
+    users, next_cursor = await search_residents(db, q, filters, limit, cursor)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return users
+
+@router.get("/users/typeahead", response_model=List[ResidentSuggestion])
+async def suggest_users(
+    response: Response,
+    prefix: str = Query(..., min_length=2, max_length=100),
+    institution_id: Optional[int] = None,
+    status: Optional[str] = None,
+    principal: Principal = Depends(require_permissions(Permissions.VIEW_USERS)),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Name suggestions as the admin types"""
+    filters = _resident_filters(principal, institution_id, status=status)
+    # Keystrokes repeat prefixes; let the browser reuse recent answers
+    response.headers["Cache-Control"] = "private, max-age=30"
+    return await typeahead(db, prefix, filters, settings.TYPEAHEAD_LIMIT)
+
+@router.get("/users/duplicates", response_model=List[DuplicateCandidateResponse])
+async def list_duplicate_candidates(
+    status: str = "open",
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    principal: Principal = Depends(require_permissions(Permissions.VIEW_USERS)),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """List users for institutional admin"""
-    # Implementation here
-    pass
+    """Probable duplicate registrations found at registration or by the background scan"""
+    query = select(DuplicateCandidate).where(DuplicateCandidate.status == status)
+    if not principal.is_super_admin:
+        query = query.join(User, User.id == DuplicateCandidate.user_id).where(
+            User.institution_id == principal.institution_id
+        )
+    result = await db.execute(
+        query.order_by(DuplicateCandidate.score.desc(), DuplicateCandidate.id).offset(skip).limit(limit)
+    )
+    return result.scalars().all()
 
 async def capture_fingerprint_with_retry(max_attempts: int = 3) -> Optional[bytes]:
     """Helper function to capture fingerprint with retry logic"""
@@ -251,4 +404,11 @@ async def save_biometric_data(
         fingerprint_template=encrypted_template,
         photo_reference=photo_path
     )
-    db.add(biometric_data) 
\ No newline at end of file
+    db.add(biometric_data)
+
+    # Closes the follow-up task left by a bulk import, if there is one
+    await db.execute(
+        update(BiometricEnrollment)
+        .where(BiometricEnrollment.user_id == user.id, BiometricEnrollment.status == "pending")
+        .values(status="enrolled", completed_at=datetime.utcnow())
+    )
@@ -1,8 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, Security, Query
+from fastapi import APIRouter, Depends, HTTPException, Security, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from app.core.database import get_db
-from app.core.auth import get_current_user, has_permission
+from app.core.database import get_db, get_read_db
+from app.core.auth import get_current_user, require_permissions, Permissions
 from app.core.schemas.resident import (
     UpdateRequestCreate,
     UpdateRequestResponse,
@@ -11,17 +11,23 @@ from app.core.schemas.resident import (
 )
 from app.core.models import User, UpdateRequest, BiometricData
 from app.core.utils.serializer import DataSerializer
+from shared.conditional import make_etag, not_modified
 from typing import List
 from datetime import datetime
 
 router = APIRouter()
 serializer = DataSerializer()
 
-@router.get("/my-id", response_model=ResidentIDResponse)
-@has_permission(["view_own_id"])
+@router.get(
+    "/my-id",
+    response_model=ResidentIDResponse,
+    dependencies=[Depends(require_permissions(Permissions.VIEW_OWN_ID))]
+)
 async def view_my_id(
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """View resident's own ID"""
     # Verify user is a resident
@@ -44,6 +50,11 @@ async def view_my_id(
             detail="Biometric data not found"
         )
 
+    etag = make_etag("resident_id", current_user.id, current_user.updated_at, biometric.updated_at)
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+
     # Construct response with all necessary data
     return ResidentIDResponse(
         main_id=current_user.main_id,
@@ -65,7 +76,7 @@ async def view_my_id(
 async def request_update(
     request: UpdateRequestCreate,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     """Request an update to ID information"""
     # Verify user is a resident
@@ -106,8 +117,7 @@ async def request_update(
     )
     
     db.add(update_request)
-    await db.commit()
-    await db.refresh(update_request)
+    await db.flush()
     
     return update_request
 
@@ -116,7 +126,7 @@ async def list_update_requests(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     """List all update requests for the current resident"""
     if current_user.role != "resident":
@@ -139,7 +149,7 @@ async def list_update_requests(
 async def get_update_request(
     request_id: int,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     """Get details of a specific update request"""
     update_request = await db.get(UpdateRequest, request_id)
@@ -162,7 +172,7 @@ async def get_update_request(
 async def cancel_update_request(
     request_id: int,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     """Cancel a pending update request"""
     update_request = await db.get(UpdateRequest, request_id)
@@ -186,6 +196,5 @@ async def cancel_update_request(
         )
         
     await db.delete(update_request)
-    await db.commit()
     
     return {"message": "Update request cancelled successfully"} 
\ No newline at end of file
@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, BackgroundTasks, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
 from app.core.schemas.user import UserCreate, UserResponse
 from app.core.models import User, BiometricData
 from app.core.biometrics.fingerprint_handler import FingerPrintHandler
 from app.core.utils.serializer import DataSerializer
+from shared.conditional import make_etag, not_modified
 from typing import List
 import asyncio
 import base64
@@ -19,7 +20,7 @@ async def create_user(
     user: UserCreate,
     photo_file: UploadFile = File(...),
     # background_tasks: BackgroundTasks,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     # Initialize fingerprint device
     if not fingerprint_handler.initialize():
@@ -65,9 +66,8 @@ async def create_user(
         )
         db.add(biometric_data)
         
-        # Save changes
-        await db.commit()
-        await db.refresh(db_user)
+        # Write now so failures surface here; the request commits once
+        await db.flush()
         
         # Add background task to save photo
         # background_tasks.add_task(save_photo, photo_path, contents)
@@ -89,8 +89,13 @@ async def save_photo(path: str, contents: bytes):
         f.write(contents)
 
 @router.get("/{user_id}", response_model=UserResponse)
-async def get_user(user_id: int, db: AsyncSession = Depends(get_db)):
+async def get_user(
+    user_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db, scope="function")
+):
     user = await db.get(User, user_id)
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
-    return user 
\ No newline at end of file
+    return not_modified(request, response, make_etag("user", user.id, user.updated_at)) or user 
\ No newline at end of file
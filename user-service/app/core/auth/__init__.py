@@ -2,12 +2,15 @@ from .jwt import (
     verify_token,
     create_access_token,
     get_current_user,
-    get_current_active_user
+    get_current_active_user,
+    get_principal
 )
+from .principal import Principal, principal_cache
 from .permissions import (
     check_permissions,
-    has_permission,
-    has_role,
+    require_permissions,
+    require_roles,
+    policy,
     validate_permissions,
     Permissions,
     ROLE_PERMISSIONS
@@ -19,11 +22,15 @@ __all__ = [
     "create_access_token",
     "get_current_user",
     "get_current_active_user",
+    "get_principal",
+    "Principal",
+    "principal_cache",
     
     # Permissions related
     "check_permissions",
-    "has_permission",
-    "has_role",
+    "require_permissions",
+    "require_roles",
+    "policy",
     "validate_permissions",
     "Permissions",
     "ROLE_PERMISSIONS"
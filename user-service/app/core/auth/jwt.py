@@ -4,10 +4,13 @@ from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from app.core.config import settings
-from app.core.models import User
-from app.core.database import get_db
+from app.core.models import User, Role
+from app.core.database import get_db, get_read_db
+from app.core.auth.principal import Principal, principal_cache
+from shared.logs import bind
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import joinedload
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
@@ -27,34 +30,76 @@ async def verify_token(token: str, db: AsyncSession) -> dict:
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-async def get_current_user(
+async def get_principal(
     token: str = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(get_db)
-) -> User:
-    """Get current user from token"""
+    db: AsyncSession = Depends(get_read_db)
+) -> Principal:
+    """Resolve the caller's status, roles and role permissions, cached briefly per token"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
-    try:
-        payload = await verify_token(token, db)
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
+
+    key = principal_cache.key_for(token)
+    principal = principal_cache.get(key)
+    if principal is not None:
+        bind(user_id=principal.user_id)
+        return principal
+
+    payload = await verify_token(token, db)
+    user_id = payload.get("sub")
+    if user_id is None:
         raise credentials_exception
-        
-    # Get user from database
+
+    # Status, roles and the permissions stored on those roles (User.permissions) in one query
     result = await db.execute(
-        select(User).where(User.id == int(user_id))
+        select(User.status, Role.name, Role.permissions)
+        .outerjoin(User.roles)
+        .where(User.id == int(user_id))
     )
-    user = result.scalar_one_or_none()
-    
-    if user is None:
+    rows = result.all()
+    if not rows:
         raise credentials_exception
-        
+    user_status = rows[0].status
+    roles = [row.name for row in rows if row.name]
+    permissions = [
+        permission
+        for row in rows if row.permissions
+        for permission in row.permissions.split(",")
+    ]
+
+    principal = Principal(
+        user_id=int(user_id),
+        roles=frozenset(roles),
+        permissions=frozenset(permissions),
+        status=user_status,
+        institution_id=payload.get("institution_id")
+    )
+    principal_cache.set(key, principal, payload.get("exp"))
+    bind(user_id=principal.user_id)
+    return principal
+
+async def get_current_user(
+    principal: Principal = Depends(get_principal),
+    db: AsyncSession = Depends(get_db, scope="function")
+) -> User:
+    """Load the caller's row with roles in one query, for handlers that need it"""
+    result = await db.execute(
+        select(User)
+        .options(joinedload(User.roles))
+        .where(User.id == principal.user_id)
+    )
+    user = result.unique().scalar_one_or_none()
+
+    if user is None:
+        principal_cache.invalidate_user(principal.user_id)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
     return user
 
 async def get_current_active_user(
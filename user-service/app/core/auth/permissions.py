@@ -1,7 +1,7 @@
 from fastapi import Depends, HTTPException, status
-from typing import List, Optional
-from functools import wraps
-from .jwt import get_current_user
+from shared.policy import PolicyEngine, forbidden
+from .jwt import get_principal
+from .principal import Principal
 from app.core.models import User, RoleType
 
 class Permissions:
@@ -10,12 +10,15 @@ class Permissions:
     READ_USER = "read_user"
     UPDATE_USER = "update_user"
     DELETE_USER = "delete_user"
+    VIEW_USERS = "view_users"
+    IMPORT_USERS = "import_users"
     
     # ID Management
     CREATE_ID = "create_id"
     READ_ID = "read_id"
     UPDATE_ID = "update_id"
     REVOKE_ID = "revoke_id"
+    VIEW_OWN_ID = "view_own_id"
     
     # Institution Management
     MANAGE_INSTITUTION = "manage_institution"
@@ -29,6 +32,7 @@ ROLE_PERMISSIONS = {
     RoleType.SUPER_ADMIN: [
         Permissions.CREATE_USER, Permissions.READ_USER,
         Permissions.UPDATE_USER, Permissions.DELETE_USER,
+        Permissions.VIEW_USERS, Permissions.IMPORT_USERS,
         Permissions.CREATE_ID, Permissions.READ_ID,
         Permissions.UPDATE_ID, Permissions.REVOKE_ID,
         Permissions.MANAGE_INSTITUTION, Permissions.MANAGE_ROLES,
@@ -48,55 +52,61 @@ ROLE_PERMISSIONS = {
     ]
 }
 
-def has_permission(required_permissions: List[str]):
-    """Decorator to check if user has required permissions"""
-    def decorator(func):
-        @wraps(func)
-        async def wrapper(*args, current_user: User = Depends(get_current_user), **kwargs):
-            user_permissions = current_user.permissions
-            
-            # Super admin has all permissions
-            if any(role.name == RoleType.SUPER_ADMIN for role in current_user.roles):
-                return await func(*args, current_user=current_user, **kwargs)
-            
-            # Check if user has all required permissions
-            if not all(perm in user_permissions for perm in required_permissions):
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Not enough permissions"
-                )
-            
-            return await func(*args, current_user=current_user, **kwargs)
-        return wrapper
-    return decorator
+# Grants are the permissions stored on the user's roles; only super admin is
+# implied by the role itself. Compiled once at import; routes compile their
+# own requirement when declared
+policy = PolicyEngine(
+    {RoleType.SUPER_ADMIN: [
+        value for name, value in vars(Permissions).items() if not name.startswith("_")
+    ]},
+    superuser_roles=[RoleType.SUPER_ADMIN]
+)
 
-def has_role(required_roles: List[RoleType]):
-    """Decorator to check if user has required roles"""
-    def decorator(func):
-        @wraps(func)
-        async def wrapper(*args, current_user: User = Depends(get_current_user), **kwargs):
-            user_roles = {role.name for role in current_user.roles}
-            
-            if not any(role in user_roles for role in required_roles):
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail=f"Required role(s): {', '.join(required_roles)}"
-                )
-            
-            return await func(*args, current_user=current_user, **kwargs)
-        return wrapper
-    return decorator
+def _require_active(principal: Principal) -> None:
+    # Token claims outlive a suspension; the cached status does not
+    if not principal.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Inactive user"
+        )
 
-async def validate_permissions(user: User, required_permissions: List[str]) -> bool:
+def require_permissions(*required_permissions: str):
+    """Dependency that requires an active principal whose role permissions meet a precompiled requirement"""
+    check = policy.requirement(*required_permissions)
+
+    async def dependency(principal: Principal = Depends(get_principal)) -> Principal:
+        _require_active(principal)
+        if not check(principal.roles, principal.permissions):
+            raise forbidden()
+        return principal
+    return dependency
+
+def require_roles(*required_roles: RoleType):
+    """Dependency that requires an active principal with any one of the given roles"""
+    allowed = frozenset(role.value.lower() for role in required_roles)
+
+    async def dependency(principal: Principal = Depends(get_principal)) -> Principal:
+        _require_active(principal)
+        if not any(role.lower() in allowed for role in principal.roles):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Required role(s): {', '.join(role.value for role in required_roles)}"
+            )
+        return principal
+    return dependency
+
+def _allows(roles: tuple, user: User, required_permissions: list[str]) -> bool:
+    try:
+        required = policy.mask(required_permissions)
+    except ValueError:
+        return False
+    return policy.allows(policy.granted_mask(roles, tuple(user.permissions)), required)
+
+async def validate_permissions(user: User, required_permissions: list[str]) -> bool:
     """Validate if user has required permissions"""
-    user_permissions = user.permissions
-    return all(perm in user_permissions for perm in required_permissions)
+    return _allows((), user, required_permissions)
 
-async def check_permissions(user: User, required_permissions: List[str]) -> bool:
+async def check_permissions(user: User, required_permissions: list[str]) -> bool:
     """Check if user has required permissions"""
-    # Super admin has all permissions
-    if any(role.name == RoleType.SUPER_ADMIN for role in user.roles):
-        return True
-        
-    user_permissions = user.permissions
-    return all(perm in user_permissions for perm in required_permissions) 
\ No newline at end of file
+    # Super admin holds every bit
+    return _allows(tuple(role.name for role in user.roles), user, required_permissions)
@@ -0,0 +1,93 @@
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Optional, Set, Tuple
+from app.core.config import settings
+from app.core.models import RoleType
+
+# Events that change who a user is allowed to be. Nothing in user-service
+# changes a user's roles or deletes a user, so those changes (made directly in
+# the database) reach a cached principal within PRINCIPAL_CACHE_TTL_SECONDS
+INVALIDATING_EVENTS = {"user.suspended", "user.reactivated"}
+
+@dataclass(frozen=True)
+class Principal:
+    """Caller identity taken from signed token claims plus the user's current status"""
+    user_id: int
+    roles: FrozenSet[str]
+    permissions: FrozenSet[str]
+    status: str
+    institution_id: Optional[int] = None
+
+    @property
+    def is_active(self) -> bool:
+        return self.status == "active"
+
+    @property
+    def is_super_admin(self) -> bool:
+        return RoleType.SUPER_ADMIN.value in self.roles
+
+    def has_role(self, role: str) -> bool:
+        return role in self.roles
+
+class PrincipalCache:
+    """Short-lived principals keyed by token hash, evictable per user"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Principal]]" = OrderedDict()
+        self._by_user: Dict[int, Set[str]] = {}
+
+    @staticmethod
+    def key_for(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Principal]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, principal = entry
+        if expires_at < time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return principal
+
+    def set(self, key: str, principal: Principal, token_expires_at: Optional[float] = None) -> None:
+        ttl = self.ttl_seconds
+        if token_expires_at is not None:
+            # Never outlive the token itself
+            ttl = min(ttl, token_expires_at - time.time())
+        if ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, principal)
+        self._entries.move_to_end(key)
+        self._by_user.setdefault(principal.user_id, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            oldest, _ = next(iter(self._entries.items()))
+            self._remove(oldest)
+
+    def invalidate_user(self, user_id: int) -> None:
+        for key in self._by_user.pop(user_id, set()):
+            self._entries.pop(key, None)
+
+    def handle_event(self, event_type: str, data: dict) -> None:
+        if event_type in INVALIDATING_EVENTS and "user_id" in data:
+            self.invalidate_user(int(data["user_id"]))
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            keys = self._by_user.get(entry[1].user_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_user[entry[1].user_id]
+
+principal_cache = PrincipalCache(settings.PRINCIPAL_CACHE_SIZE, settings.PRINCIPAL_CACHE_TTL_SECONDS)
+
+async def on_principal_event(event_type: str, data: dict) -> None:
+    """Subscriber handler; evicts principals whose status changed on another replica"""
+    principal_cache.handle_event(event_type, data)
@@ -1,5 +1,6 @@
 import os
 import ctypes
+import logging
 from ctypes import wintypes
 import time
 from typing import Optional, Tuple
@@ -8,6 +9,9 @@ import win32con
 import win32security
 import win32file
 import pywintypes
+from shared.tracing import traced
+
+logger = logging.getLogger(__name__)
 
 class FingerPrintHandler:
     def __init__(self):
@@ -45,11 +49,12 @@ class FingerPrintHandler:
             self.initialized = True
             return True
 
-        except Exception as e:
-            print(f"Initialization error: {str(e)}")
+        except Exception:
+            logger.exception("Fingerprint reader initialization failed")
             self.initialized = False
             return False
 
+    @traced("biometrics.capture")
     def capture_fingerprint(self) -> Optional[bytes]:
         """Capture fingerprint and return template"""
         if not self.initialized or not self.device_handle:
@@ -73,10 +78,11 @@ class FingerPrintHandler:
             template_data = bytes(template_buffer[:template_size.value])
             return template_data
 
-        except Exception as e:
-            print(f"Capture error: {str(e)}")
+        except Exception:
+            logger.exception("Fingerprint capture failed")
             return None
 
+    @traced("biometrics.verify")
     def verify_fingerprint(self, stored_template: bytes, current_template: bytes) -> bool:
         """Verify if two fingerprint templates match"""
         if not self.initialized:
@@ -101,8 +107,8 @@ class FingerPrintHandler:
             )
             return bool(result)
 
-        except Exception as e:
-            print(f"Verification error: {str(e)}")
+        except Exception:
+            logger.exception("Fingerprint verification failed")
             return False
 
     def close(self):
@@ -112,5 +118,5 @@ class FingerPrintHandler:
                 self.dll.CloseDevice(self.device_handle)
                 self.device_handle = None
             self.initialized = False
-        except Exception as e:
-            print(f"Close error: {str(e)}") 
\ No newline at end of file
+        except Exception:
+            logger.exception("Closing fingerprint reader failed") 
\ No newline at end of file
@@ -1,7 +1,12 @@
 import ctypes
+import logging
 from ctypes import wintypes
 from typing import Optional
 
+from shared.tracing import traced
+
+logger = logging.getLogger(__name__)
+
 # Load the Windows Biometric API
 winbio = ctypes.WinDLL("winbio.dll")
 
@@ -33,12 +38,13 @@ class WBFHandler:
             if result == 0:
                 return True
             else:
-                print(f"Failed to initialize WBF: Error {result}")
+                logger.warning("Failed to initialize WBF: error %s", result)
                 return False
-        except Exception as e:
-            print(f"Exception during WBF initialization: {e}")
+        except Exception:
+            logger.exception("Exception during WBF initialization")
             return False
 
+    @traced("biometrics.capture")
     async def capture_fingerprint(self) -> Optional[str]:
         """Capture fingerprint using Windows Biometric Framework"""
         try:
@@ -57,10 +63,10 @@ class WBFHandler:
             if result == 0:
                 return f"Fingerprint captured from sensor ID: {unit_id.value}"
             else:
-                print(f"Failed to capture fingerprint: Error {result}")
+                logger.warning("Failed to capture fingerprint: error %s", result)
                 return None
-        except Exception as e:
-            print(f"Exception during fingerprint capture: {e}")
+        except Exception:
+            logger.exception("Exception during fingerprint capture")
             return None
 
     async def close(self):
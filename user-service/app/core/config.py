@@ -19,13 +19,85 @@ class Settings(BaseSettings):
     JWT_SECRET_KEY: str = os.getenv("JWT_SECRET_KEY")
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 30.0  # Upper bound on how stale cached roles and permissions can be
+    PRINCIPAL_CACHE_SIZE: int = 10000
     
     # Database Settings
     DATABASE_URL: str = os.getenv("DATABASE_URL")
+
+    # Database pool; DB_POOL_SIZE=0 splits DB_MAX_CONNECTIONS across WEB_CONCURRENCY workers
+    DB_POOL_SIZE: int = 0
+    DB_MAX_OVERFLOW: int = 5
+    DB_MAX_CONNECTIONS: int = 20  # This replica's share of Postgres max_connections
+    DB_POOL_TIMEOUT_SECONDS: float = 5.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_STATEMENT_TIMEOUT_MS: int = 5000
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 256  # 0 behind PgBouncer transaction pooling
+    DB_SQL_LOG_SAMPLE_RATE: float = 0.0
+    DB_SLOW_QUERY_MS: int = 500
+    DB_SCHEMA_MODE: str = "check"  # "migrate" applies migrations at startup, for single-instance development
+
+    # JSON logs through a bounded queue; INFO and below can be sampled under load
+    LOG_LEVEL: str = "INFO"
+    LOG_INFO_SAMPLE_RATE: float = 1.0
+    LOG_QUEUE_SIZE: int = 10000  # Records beyond this are dropped and counted
+
+    # Tracing: "none" only propagates traceparent, "file" appends JSON lines, "memory" keeps spans in-process
+    TRACE_EXPORTER: str = "none"
+    TRACE_FILE_PATH: str = "traces.jsonl"
+    TRACE_HEAD_SAMPLE_RATE: float = 0.01
+    TRACE_TAIL_LATENCY_MS: int = 500  # Also keep failed traces and those this slow; 0 disables
+
+    # Admin profiling endpoints under /debug, enabled by setting a token
+    PROFILING_TOKEN: str = ""
+    LOOP_STALL_THRESHOLD_MS: int = 100  # Blocking callbacks longer than this are logged with their stack
+
+    # Read replicas for read-only endpoints; reads use the primary when unset
+    DATABASE_REPLICA_URLS: str = ""  # Comma-separated
+    DB_REPLICA_MAX_LAG_SECONDS: float = 2.0
+
+    # Resident search
+    SEARCH_PHONETIC_BONUS: float = 0.2  # Added to trigram similarity when all phonetic keys match
+    SEARCH_MAX_PAGE_SIZE: int = 100
+    TYPEAHEAD_LIMIT: int = 10
+    SEARCH_INDEX_BATCH_SIZE: int = 1000
+    SEARCH_INDEX_IDLE_SECONDS: float = 30.0
+
+    # Duplicate-registration detection
+    DUPLICATE_MATCH_THRESHOLD: float = 0.85
+    DUPLICATE_MAX_CANDIDATES: int = 200  # Per applicant, from the blocking index
+    DUPLICATE_CHECK_TIMEOUT_SECONDS: float = 0.5  # Registration proceeds unchecked past this
+    DUPLICATE_WORKERS: int = 2
+    DUPLICATE_SCAN_BATCH_SIZE: int = 200  # 0 disables the background scan
+    DUPLICATE_SCAN_IDLE_SECONDS: float = 60.0
+
+    # Bulk resident import
+    IMPORT_SPOOL_DIR: str = "imports"  # Local copy of an upload while this replica runs its job
+    IMPORT_LEASE_SECONDS: float = 60.0  # A job whose runner stops renewing is picked up by another replica
+    IMPORT_CHUNK_SIZE: int = 5000  # Records per validation batch and COPY transaction
+
+    # Batch review of resident update requests
+    REVIEW_BATCH_MAX_SIZE: int = 1000
+
+    # Status change events for id-service and other replicas; not published or consumed when unset
+    RABBITMQ_URL: Optional[str] = None
+    USER_EVENTS_EXCHANGE: str = "user-events"  # Fanout; each replica binds its own queue
+
+    # Lifting expired suspensions
+    SUSPENSION_EXPIRY_BATCH_SIZE: int = 500
+    SUSPENSION_EXPIRY_MAX_SLEEP_SECONDS: float = 60.0  # Bounds how late other replicas' suspensions lift
+
     class Config:
         env_file = ".env"
         case_sensitive = True
 
+    @property
+    def async_database_url(self) -> str:
+        """Convert DATABASE_URL to async format if needed"""
+        if self.DATABASE_URL.startswith('postgresql://'):
+            return self.DATABASE_URL.replace('postgresql://', 'postgresql+asyncpg://', 1)
+        return self.DATABASE_URL
+
 settings = Settings() 
 
 # Validate database URL format
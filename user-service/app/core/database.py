@@ -1,18 +1,35 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
+import os
 from app.core.config import settings
+from app.core.models import Base
+from shared.engine import engine_from_settings, engine_options
+from shared.migrations import SchemaManager
+from shared.replicas import ReplicaRouter
+from shared.unit_of_work import session_factory, unit_of_work
 
 # Use the async database URL
-engine = create_async_engine(settings.async_database_url, echo=True)
-async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+engine = engine_from_settings(settings.async_database_url, "user-service", settings)
+async_session = session_factory(engine)
 
-async def get_db():
-    async with async_session() as session:
-        try:
-            yield session
-            await session.commit()
-        except Exception:
-            await session.rollback()
-            raise
-        finally:
-            await session.close()
\ No newline at end of file
+# Read-only handlers depend on get_read_db to be served from a caught-up replica
+read_router = ReplicaRouter(
+    "user-service",
+    engine,
+    [url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()],
+    max_lag_seconds=settings.DB_REPLICA_MAX_LAG_SECONDS,
+    **engine_options(settings)
+)
+get_read_db = read_router.get_read_db
+
+# Commits once when the handler returns, and only if something was written;
+# declare it with Depends(get_db, scope="function")
+get_db = unit_of_work(async_session)
+
+# Startup checks the Alembic revision; app.migrate applies migrations as a job
+schema = SchemaManager(
+    "user-service",
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    settings.DATABASE_URL,
+    Base.metadata,
+    # The resident search indexes use pg_trgm operator classes
+    bootstrap=("CREATE EXTENSION IF NOT EXISTS pg_trgm",)
+)
@@ -1,7 +1,11 @@
-import pika
 import json
+import logging
+
+import pika
 from typing import Callable
 
+logger = logging.getLogger(__name__)
+
 class EventConsumer:
     def __init__(self, rabbitmq_url: str, queue_name: str):
         self.connection = pika.BlockingConnection(
@@ -17,5 +21,5 @@ class EventConsumer:
             on_message_callback=callback,
             auto_ack=True
         )
-        print(f'Started consuming from {self.queue_name}')
+        logger.info("Started consuming from %s", self.queue_name)
         self.channel.start_consuming() 
\ No newline at end of file
@@ -1,20 +1,30 @@
 import pika
 import json
 from typing import Any
+from shared.events import declare_fanout
 
 class EventProducer:
-    def __init__(self, rabbitmq_url: str):
+    def __init__(self, rabbitmq_url: str, exchange: str = ''):
         self.connection = pika.BlockingConnection(
             pika.URLParameters(rabbitmq_url)
         )
         self.channel = self.connection.channel()
+        self.exchange = exchange
+        if exchange:
+            declare_fanout(self.channel, exchange)
 
     def publish(self, routing_key: str, event_type: str, data: Any):
         self.channel.basic_publish(
-            exchange='',
+            exchange=self.exchange,
             routing_key=routing_key,
             body=json.dumps(data),
             properties=pika.BasicProperties(
                 content_type=event_type
             )
-        ) 
\ No newline at end of file
+        )
+
+    def close(self):
+        try:
+            self.connection.close()
+        except pika.exceptions.AMQPError:
+            pass
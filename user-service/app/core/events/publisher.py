@@ -0,0 +1,53 @@
+import asyncio
+import logging
+from typing import Any, Optional
+
+import pika
+
+from app.core.config import settings
+from app.core.auth import principal_cache
+from .producer import EventProducer
+
+logger = logging.getLogger(__name__)
+
+class UserEventPublisher:
+    """Announces committed user status changes to other services.
+
+    Local principals are evicted first, so this replica never serves the old
+    status. Events go to a fanout exchange that every user-service replica and
+    id-service bind their own queues to. The blocking pika producer runs in a
+    thread with one connection; publishing is skipped when RABBITMQ_URL is unset.
+    """
+
+    def __init__(self, rabbitmq_url: Optional[str], exchange: str):
+        self.rabbitmq_url = rabbitmq_url
+        self.exchange = exchange
+        self._producer: Optional[EventProducer] = None
+        self._lock = asyncio.Lock()
+
+    def _publish(self, event_type: str, data: Any) -> None:
+        # Nothing services the connection's heartbeats between publishes, so the
+        # broker may have dropped it while idle; reconnect and retry once
+        for attempt in range(2):
+            if self._producer is None:
+                self._producer = EventProducer(self.rabbitmq_url, self.exchange)
+            try:
+                self._producer.publish("", event_type, data)
+                return
+            except pika.exceptions.AMQPError:
+                self._producer.close()
+                self._producer = None
+                if attempt:
+                    raise
+
+    async def publish(self, event_type: str, data: dict) -> None:
+        principal_cache.handle_event(event_type, data)
+        if not self.rabbitmq_url:
+            return
+        async with self._lock:
+            try:
+                await asyncio.to_thread(self._publish, event_type, data)
+            except Exception:
+                logger.warning("Could not publish %s for %s", event_type, data, exc_info=True)
+
+user_events = UserEventPublisher(settings.RABBITMQ_URL, settings.USER_EVENTS_EXCHANGE)
@@ -0,0 +1,11 @@
+from shared.events import EventSubscriber
+from app.core.config import settings
+from app.core.auth.principal import on_principal_event
+
+# An exclusive queue per replica, so every replica evicts its own principals
+principal_events = EventSubscriber(
+    "user-service",
+    settings.RABBITMQ_URL,
+    settings.USER_EVENTS_EXCHANGE,
+    on_principal_event
+)
@@ -0,0 +1,8 @@
+from .pipeline import ImportRunner, import_runner, open_records, read_chunk
+
+__all__ = [
+    "ImportRunner",
+    "import_runner",
+    "open_records",
+    "read_chunk"
+]
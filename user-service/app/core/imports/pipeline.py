@@ -0,0 +1,423 @@
+import asyncio
+import csv
+import itertools
+import json
+import logging
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import aiofiles
+from prometheus_client import Counter, Histogram
+from pydantic import ValidationError
+from sqlalchemy import delete, func, or_, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.database import async_session
+from app.core.models import ImportJob, ImportReject, ImportSpoolChunk, User
+from app.core.schemas.imports import ResidentImportRecord
+from app.core.utils.main_id import format_main_id, is_valid_main_id
+from app.core.utils.names import blocking_keys, search_fields
+
+logger = logging.getLogger(__name__)
+
+IMPORT_RECORDS = Counter(
+    "resident_import_records_total",
+    "Bulk import records by outcome",
+    ["outcome"]
+)
+
+IMPORT_STAGE_SECONDS = Histogram(
+    "resident_import_stage_seconds",
+    "Time per import chunk spent reading and validating, and writing",
+    ["stage"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+
+# Column order of the users COPY; search and blocking columns are filled here
+# because COPY bypasses the ORM hooks that normally maintain them
+USER_COLUMNS = (
+    "id", "main_id", "first_name", "last_name", "date_of_birth", "gender",
+    "nationality", "current_address", "phone_number", "email", "institutional_ids",
+    "status", "institution_id", "search_name", "phonetic_keys", "blocking_keys",
+    "created_at", "updated_at", "created_by"
+)
+
+ENROLLMENT_COLUMNS = ("user_id", "import_job_id", "status", "requested_at")
+
+Chunk = Tuple[List[Tuple[int, ResidentImportRecord]], List[Tuple[int, list]]]
+
+def open_records(path: str, format: str) -> Iterator[dict]:
+    """Raw records from a spooled upload, streamed one at a time"""
+    with open(path, newline="", encoding="utf-8-sig") as source:
+        if format == "csv":
+            yield from csv.DictReader(source)
+            return
+        for line in source:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                yield {"__error__": f"Invalid JSON: {e.msg}"}
+
+def read_chunk(records: Iterator[dict], size: int, first_number: int) -> Chunk:
+    """Validate the next ``size`` records; blocking, so it runs in a thread"""
+    valid, rejected = [], []
+    for number, raw in enumerate(itertools.islice(records, size), start=first_number):
+        if "__error__" in raw:
+            rejected.append((number, [{"msg": raw["__error__"]}]))
+            continue
+        try:
+            valid.append((number, ResidentImportRecord(**raw)))
+        except ValidationError as e:
+            rejected.append((number, [
+                {"loc": list(error["loc"]), "msg": error["msg"]} for error in e.errors()
+            ]))
+    return valid, rejected
+
+async def _raw_connection(session: AsyncSession):
+    """asyncpg connection under the session's transaction, for COPY"""
+    connection = await session.connection()
+    raw = await connection.get_raw_connection()
+    return raw.driver_connection
+
+async def _existing(session: AsyncSession, column, values: List[str]) -> set:
+    if not values:
+        return set()
+    result = await session.execute(select(column).where(column.in_(values)))
+    return set(result.scalars())
+
+async def _allocate(session: AsyncSession, sequence: str, count: int) -> List[int]:
+    if not count:
+        return []
+    result = await session.execute(
+        text(f"SELECT nextval({sequence}) FROM generate_series(1, :count)"),
+        {"count": count}
+    )
+    return list(result.scalars())
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        logger.warning("Could not remove spooled import %s", path)
+
+class LeaseLost(Exception):
+    """Another replica claimed the job after this one stopped renewing its lease"""
+
+class ImportRunner:
+    """Runs bulk imports in the background, one chunk per transaction.
+
+    Each chunk is validated, checked against existing main_ids and emails,
+    and written with COPY together with its biometric enrollment tasks and
+    the job's advanced checkpoint, so a restart resumes exactly after the
+    last committed chunk.
+
+    A replica runs a job only while it holds the job's lease. The lease is
+    claimed with one conditional UPDATE, renewed in the background and with
+    every chunk, and a chunk commits only if it is still held; jobs whose
+    runner died are claimed by whichever replica polls first once the
+    lease lapses.
+    """
+
+    def __init__(self, session_factory: sessionmaker, chunk_size: int, lease_seconds: float):
+        self.session_factory = session_factory
+        self.chunk_size = chunk_size
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._poller: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Pick up pending jobs and those whose runner stopped renewing its lease"""
+        if self._poller is None:
+            self._poller = asyncio.create_task(self._poll())
+
+    async def _poll(self) -> None:
+        while True:
+            try:
+                async with self.session_factory() as session:
+                    result = await session.execute(
+                        select(ImportJob.id).where(
+                            ImportJob.status.in_(("pending", "running")),
+                            self._claimable()
+                        )
+                    )
+                    job_ids = list(result.scalars())
+                for job_id in job_ids:
+                    self.submit(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("Polling for import jobs failed", exc_info=True)
+            await asyncio.sleep(self.lease_seconds / 2)
+
+    def _claimable(self):
+        return or_(
+            ImportJob.lease_owner.is_(None),
+            ImportJob.lease_owner == self.owner,
+            ImportJob.lease_expires_at < func.now()
+        )
+
+    def _lease_until(self):
+        return func.now() + timedelta(seconds=self.lease_seconds)
+
+    def submit(self, job_id: int) -> None:
+        if job_id not in self._tasks:
+            task = asyncio.create_task(self.run(job_id))
+            task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+            self._tasks[job_id] = task
+
+    async def stop(self) -> None:
+        # Jobs stay "running" and resume from their checkpoint on another replica
+        if self._poller is not None:
+            self._poller.cancel()
+            self._poller = None
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        self._tasks.clear()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        try:
+            async with self.session_factory() as session:
+                # Let the next replica claim them now instead of when the lease lapses
+                await session.execute(
+                    update(ImportJob)
+                    .where(ImportJob.lease_owner == self.owner)
+                    .values(lease_owner=None, lease_expires_at=None)
+                )
+                await session.commit()
+        except Exception:
+            logger.warning("Could not release import leases", exc_info=True)
+
+    async def _claim(self, job_id: int) -> Optional[ImportJob]:
+        async with self.session_factory() as session:
+            result = await session.execute(
+                update(ImportJob)
+                .where(
+                    ImportJob.id == job_id,
+                    ImportJob.status.in_(("pending", "running")),
+                    self._claimable()
+                )
+                .values(
+                    status="running",
+                    started_at=func.coalesce(ImportJob.started_at, func.now()),
+                    lease_owner=self.owner,
+                    lease_expires_at=self._lease_until()
+                )
+                .returning(ImportJob)
+                .execution_options(synchronize_session=False)
+            )
+            job = result.scalar_one_or_none()
+            await session.commit()
+            return job
+
+    async def _renew(self, job_id: int) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                async with self.session_factory() as session:
+                    result = await session.execute(
+                        update(ImportJob)
+                        .where(ImportJob.id == job_id, ImportJob.lease_owner == self.owner)
+                        .values(lease_expires_at=self._lease_until())
+                    )
+                    await session.commit()
+            except Exception:
+                # The chunk commit checks the lease, so a missed renewal is safe
+                logger.warning("Could not renew the lease on import job %s", job_id, exc_info=True)
+                continue
+            if not result.rowcount:
+                raise LeaseLost(f"Import job {job_id} was claimed by another replica")
+
+    async def _fetch_spool(self, job: ImportJob, path: str) -> None:
+        """Local copy of the upload, read from the database a piece at a time"""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        async with self.session_factory() as session:
+            result = await session.stream_scalars(
+                select(ImportSpoolChunk.data)
+                .where(ImportSpoolChunk.job_id == job.id)
+                .order_by(ImportSpoolChunk.sequence)
+            )
+            async with aiofiles.open(path, "wb") as spool:
+                async for piece in result:
+                    await spool.write(piece)
+
+    async def run(self, job_id: int) -> None:
+        job = await self._claim(job_id)
+        if job is None:
+            return
+
+        renewal = asyncio.create_task(self._renew(job_id))
+        work = asyncio.create_task(self._import(job))
+        try:
+            # Whichever ends first: the import, or the renewal finding the lease gone
+            done, _ = await asyncio.wait({renewal, work}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            renewal.cancel()
+            work.cancel()
+            # Let a cancelled chunk roll back before anything else touches the job
+            await asyncio.wait({renewal, work})
+        for task in done:
+            if not task.cancelled() and task.exception() is not None:
+                logger.warning("Import job %s stopped here: %s", job_id, task.exception())
+
+    async def _import(self, job: ImportJob) -> None:
+        # Jobs uploaded before spooling moved to the database name a local file, their only copy
+        fetched = job.spool_path is None
+        path = job.spool_path or os.path.join(settings.IMPORT_SPOOL_DIR, f"job-{job.id}.{job.format}")
+        try:
+            if fetched:
+                await self._fetch_spool(job, path)
+            records = open_records(path, job.format)
+            # Parsing is cheap next to writing; skip what earlier runs committed
+            for _ in itertools.islice(records, job.records_processed):
+                pass
+            number = job.records_processed + 1
+            while True:
+                started = time.perf_counter()
+                valid, rejected = await asyncio.to_thread(read_chunk, records, self.chunk_size, number)
+                read_seconds = time.perf_counter() - started
+                if not valid and not rejected:
+                    break
+                await self._write_chunk(job, valid, rejected, read_seconds)
+                number += len(valid) + len(rejected)
+        except (asyncio.CancelledError, LeaseLost):
+            raise
+        except Exception as e:
+            logger.exception("Import job %s failed", job.id)
+            await self._finish(job.id, "failed", str(e)[:1000])
+            return
+        finally:
+            if fetched:
+                _remove(path)
+        await self._finish(job.id, "completed")
+        if not fetched:
+            _remove(path)
+
+    async def _write_chunk(
+        self,
+        job: ImportJob,
+        valid: List[Tuple[int, ResidentImportRecord]],
+        rejected: List[Tuple[int, list]],
+        read_seconds: float
+    ) -> None:
+        started = time.perf_counter()
+        async with self.session_factory() as session:
+            rejected = list(rejected)
+            valid = await self._drop_conflicts(session, valid, rejected)
+
+            if valid:
+                user_ids = await _allocate(session, "pg_get_serial_sequence('users', 'id')", len(valid))
+                main_ids = iter(await _allocate(
+                    session, "'resident_main_id_seq'",
+                    sum(1 for _, record in valid if not record.main_id)
+                ))
+                now = datetime.utcnow()
+                rows = []
+                for user_id, (_, record) in zip(user_ids, valid):
+                    search_name, keys = search_fields(record.first_name, record.last_name)
+                    rows.append((
+                        user_id,
+                        record.main_id or format_main_id(next(main_ids)),
+                        record.first_name, record.last_name, record.date_of_birth,
+                        record.gender.value, record.nationality, record.current_address,
+                        record.phone_number, record.email, "{}",
+                        "active", job.institution_id, search_name, keys,
+                        blocking_keys(record.first_name, record.last_name, record.date_of_birth),
+                        now, now, job.created_by
+                    ))
+
+                connection = await _raw_connection(session)
+                await connection.copy_records_to_table("users", records=rows, columns=USER_COLUMNS)
+                # Device capture happens later; each resident gets an enrollment task
+                await connection.copy_records_to_table(
+                    "biometric_enrollments",
+                    records=[(user_id, job.id, "pending", now) for user_id in user_ids],
+                    columns=ENROLLMENT_COLUMNS
+                )
+
+            if rejected:
+                session.add_all([
+                    ImportReject(job_id=job.id, record_number=number, errors=errors)
+                    for number, errors in rejected
+                ])
+
+            write_seconds = time.perf_counter() - started
+            # Commits only under this replica's lease, so two runners never write one chunk twice
+            result = await session.execute(
+                update(ImportJob)
+                .where(ImportJob.id == job.id, ImportJob.lease_owner == self.owner)
+                .values(
+                    records_processed=ImportJob.records_processed + len(valid) + len(rejected),
+                    records_inserted=ImportJob.records_inserted + len(valid),
+                    records_rejected=ImportJob.records_rejected + len(rejected),
+                    read_seconds=ImportJob.read_seconds + read_seconds,
+                    write_seconds=ImportJob.write_seconds + write_seconds,
+                    active_seconds=ImportJob.active_seconds + read_seconds + write_seconds,
+                    lease_expires_at=self._lease_until()
+                )
+            )
+            if not result.rowcount:
+                raise LeaseLost(f"Import job {job.id} was claimed by another replica")
+            await session.commit()
+
+        IMPORT_STAGE_SECONDS.labels(stage="read").observe(read_seconds)
+        IMPORT_STAGE_SECONDS.labels(stage="write").observe(write_seconds)
+        IMPORT_RECORDS.labels(outcome="inserted").inc(len(valid))
+        IMPORT_RECORDS.labels(outcome="rejected").inc(len(rejected))
+
+    async def _drop_conflicts(
+        self,
+        session: AsyncSession,
+        valid: List[Tuple[int, ResidentImportRecord]],
+        rejected: List[Tuple[int, list]]
+    ) -> List[Tuple[int, ResidentImportRecord]]:
+        """Reject records whose main_id or email is taken, in the table or earlier in the chunk"""
+        taken_main_ids = await _existing(
+            session, User.main_id, [record.main_id for _, record in valid if record.main_id]
+        )
+        taken_emails = await _existing(
+            session, User.email, [record.email for _, record in valid if record.email]
+        )
+        kept = []
+        for number, record in valid:
+            errors = []
+            if record.main_id:
+                if not is_valid_main_id(record.main_id):
+                    errors.append({"loc": ["main_id"], "msg": "invalid check digit or length"})
+                elif record.main_id in taken_main_ids:
+                    errors.append({"loc": ["main_id"], "msg": "already registered"})
+            if record.email and record.email in taken_emails:
+                errors.append({"loc": ["email"], "msg": "already registered"})
+            if errors:
+                rejected.append((number, errors))
+                continue
+            if record.main_id:
+                taken_main_ids.add(record.main_id)
+            if record.email:
+                taken_emails.add(record.email)
+            kept.append((number, record))
+        return kept
+
+    async def _finish(self, job_id: int, status: str, error: Optional[str] = None) -> None:
+        async with self.session_factory() as session:
+            result = await session.execute(
+                update(ImportJob)
+                .where(ImportJob.id == job_id, ImportJob.lease_owner == self.owner)
+                .values(
+                    status=status, error=error, finished_at=func.now(),
+                    lease_owner=None, lease_expires_at=None
+                )
+            )
+            if result.rowcount and status == "completed":
+                await session.execute(delete(ImportSpoolChunk).where(ImportSpoolChunk.job_id == job_id))
+            await session.commit()
+
+import_runner = ImportRunner(async_session, settings.IMPORT_CHUNK_SIZE, settings.IMPORT_LEASE_SECONDS)
@@ -1,15 +1,25 @@
 from .base import Base
-from .user import User
+from .user import User, main_id_seq
 from .role import Role, RoleType, user_roles
-from .biometric import BiometricData
+from .biometric import BiometricData, BiometricEnrollment
 from .update_request import UpdateRequest
+from .admin_action import AdminAction
+from .duplicate_candidate import DuplicateCandidate
+from .import_job import ImportJob, ImportReject, ImportSpoolChunk
 
 __all__ = [
     "Base",
     "User",
+    "main_id_seq",
     "Role",
     "RoleType",
     "user_roles",
     "BiometricData",
-    "UpdateRequest"
+    "BiometricEnrollment",
+    "UpdateRequest",
+    "AdminAction",
+    "DuplicateCandidate",
+    "ImportJob",
+    "ImportReject",
+    "ImportSpoolChunk"
 ] 
\ No newline at end of file
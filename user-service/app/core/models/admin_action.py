@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String, JSON, DateTime, ForeignKey
+from datetime import datetime
+from .base import Base
+
+class AdminAction(Base):
+    """Audit trail of administrative changes to residents"""
+    __tablename__ = 'admin_actions'
+
+    id = Column(Integer, primary_key=True, index=True)
+    admin_id = Column(Integer, nullable=False, index=True)
+    action_type = Column(String(50), nullable=False)
+    user_id = Column(Integer, ForeignKey('users.id'), index=True)
+    details = Column(JSON, default=dict)
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -14,4 +14,15 @@ class BiometricData(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationship
-    user = relationship("User", back_populates="biometric_data") 
\ No newline at end of file
+    user = relationship("User", back_populates="biometric_data")
+
+class BiometricEnrollment(Base):
+    """Residents registered without biometrics, waiting for device capture"""
+    __tablename__ = 'biometric_enrollments'
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey('users.id'), unique=True, nullable=False)
+    import_job_id = Column(Integer, ForeignKey('import_jobs.id'))
+    status = Column(String(20), default="pending", nullable=False, index=True)  # pending, enrolled
+    requested_at = Column(DateTime, default=datetime.utcnow)
+    completed_at = Column(DateTime)
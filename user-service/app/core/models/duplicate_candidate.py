@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, UniqueConstraint
+from datetime import datetime
+from .base import Base
+
+class DuplicateCandidate(Base):
+    """Pair of residents that are probably the same person; user_id < duplicate_user_id"""
+    __tablename__ = 'duplicate_candidates'
+    __table_args__ = (
+        UniqueConstraint("user_id", "duplicate_user_id", name="uq_duplicate_candidates_pair"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    duplicate_user_id = Column(Integer, ForeignKey('users.id'), nullable=False, index=True)
+    score = Column(Float, nullable=False)
+    status = Column(String(20), default="open", nullable=False)  # open, dismissed, merged
+    source = Column(String(20), nullable=False)  # registration, scan
+    detected_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,52 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, JSON, ForeignKey, LargeBinary
+from datetime import datetime
+from typing import Optional
+from .base import Base
+
+class ImportJob(Base):
+    """Bulk resident import; records_processed is the resume checkpoint"""
+    __tablename__ = 'import_jobs'
+
+    id = Column(Integer, primary_key=True, index=True)
+    institution_id = Column(Integer)
+    created_by = Column(Integer, nullable=False)
+    format = Column(String(10), nullable=False)  # csv, ndjson
+    filename = Column(String(255))
+    spool_path = Column(String(500))  # Only jobs uploaded before spooling moved to import_spool_chunks
+    status = Column(String(20), default="pending", nullable=False)  # pending, running, completed, failed
+    # Replica running the job; another may claim it once the lease lapses
+    lease_owner = Column(String(100))
+    lease_expires_at = Column(DateTime)
+    records_processed = Column(Integer, default=0, nullable=False)
+    records_inserted = Column(Integer, default=0, nullable=False)
+    records_rejected = Column(Integer, default=0, nullable=False)
+    # Time spent inside chunks, so throughput ignores time spent waiting for a resume
+    active_seconds = Column(Float, default=0.0, nullable=False)
+    read_seconds = Column(Float, default=0.0, nullable=False)
+    write_seconds = Column(Float, default=0.0, nullable=False)
+    error = Column(String(1000))
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+
+    @property
+    def records_per_second(self) -> Optional[float]:
+        if not self.active_seconds:
+            return None
+        return round(self.records_processed / self.active_seconds, 1)
+
+class ImportSpoolChunk(Base):
+    """One piece of an uploaded file, so any replica can run or resume the job"""
+    __tablename__ = 'import_spool_chunks'
+
+    job_id = Column(Integer, ForeignKey('import_jobs.id'), primary_key=True)
+    sequence = Column(Integer, primary_key=True)
+    data = Column(LargeBinary, nullable=False)
+
+class ImportReject(Base):
+    __tablename__ = 'import_rejects'
+
+    id = Column(Integer, primary_key=True)
+    job_id = Column(Integer, ForeignKey('import_jobs.id'), nullable=False, index=True)
+    record_number = Column(Integer, nullable=False)  # 1-based position in the file
+    errors = Column(JSON, nullable=False)
@@ -1,11 +1,39 @@
-from sqlalchemy import Column, Integer, String, Date, Enum, DateTime, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, Date, Enum, DateTime, JSON, ForeignKey, Index, Sequence, event, inspect, text
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import relationship
 from datetime import datetime
+from app.core.utils.names import search_fields, blocking_keys
 from .base import Base
 from .role import user_roles
 
+# Source of generated main_ids; see app.core.utils.main_id
+main_id_seq = Sequence("resident_main_id_seq", metadata=Base.metadata)
+
 class User(Base):
     __tablename__ = 'users'
+    __table_args__ = (
+        # Fuzzy and transliterated name search (pg_trgm), typeahead prefixes and phonetic matches
+        Index(
+            "ix_users_search_name_trgm", "search_name",
+            postgresql_using="gin", postgresql_ops={"search_name": "gin_trgm_ops"}
+        ),
+        Index("ix_users_search_name", "search_name", "id"),
+        Index("ix_users_phonetic_keys", "phonetic_keys", postgresql_using="gin"),
+        # Filter-only listings page by id within an institution
+        Index("ix_users_institution_status_dob", "institution_id", "status", "date_of_birth", "id"),
+        # Duplicate-detection candidate blocks
+        Index("ix_users_blocking_keys", "blocking_keys", postgresql_using="gin"),
+        Index("ix_users_phone_number", "phone_number"),
+        # Rows the search indexer has not reached yet
+        Index("ix_users_index_pending", "id", postgresql_where=text("blocking_keys IS NULL")),
+        # Rows the duplicate scan has not checked since their name or birth date changed
+        Index("ix_users_duplicates_pending", "id", postgresql_where=text("duplicates_checked_at IS NULL")),
+        # Timed suspensions in expiry order; the expiry scheduler only reads its head
+        Index(
+            "ix_users_suspension_expiry", "suspension_end_date", "id",
+            postgresql_where=text("status = 'suspended' AND suspension_end_date IS NOT NULL")
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     main_id = Column(String(12), unique=True, index=True, nullable=False)
@@ -19,6 +47,14 @@ class User(Base):
     email = Column(String(100), unique=True)
     institutional_ids = Column(JSON, default=dict)  # Store institutional IDs
     status = Column(String(20), default="active")  # active, suspended, etc.
+    suspension_end_date = Column(DateTime)  # Lifted by app.core.suspensions; NULL while suspended means indefinitely
+    institution_id = Column(Integer)  # Institution that registered the resident
+    # Folded, romanized "first last" (app.core.utils.names); C collation so a plain
+    # btree serves both LIKE 'prefix%' and ORDER BY for typeahead
+    search_name = Column(String(255, collation="C"))
+    phonetic_keys = Column(ARRAY(String(16)))
+    blocking_keys = Column(ARRAY(String(64)))  # See app.core.utils.names.blocking_keys
+    duplicates_checked_at = Column(DateTime)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     created_by = Column(Integer, ForeignKey('auth_service.users.id'))
@@ -36,4 +72,18 @@ class User(Base):
         for role in self.roles:
             if role.permissions:
                 all_permissions.update(role.permissions.split(','))
-        return list(all_permissions) 
\ No newline at end of file
+        return list(all_permissions)
+
+@event.listens_for(User, "before_insert")
+@event.listens_for(User, "before_update")
+def _index_name(mapper, connection, target):
+    """Keep the search columns in step with the name on every ORM write"""
+    target.search_name, target.phonetic_keys = search_fields(target.first_name, target.last_name)
+    target.blocking_keys = blocking_keys(target.first_name, target.last_name, target.date_of_birth)
+
+@event.listens_for(User, "before_update")
+def _recheck_duplicates(mapper, connection, target):
+    """Queue the row for the duplicate scan again when identifying fields change"""
+    attrs = inspect(target).attrs
+    if any(attrs[name].history.has_changes() for name in ("first_name", "last_name", "date_of_birth")):
+        target.duplicates_checked_at = None
@@ -0,0 +1,6 @@
+from .batch import review_batch, REVIEWABLE_FIELDS
+
+__all__ = [
+    "review_batch",
+    "REVIEWABLE_FIELDS"
+]
@@ -0,0 +1,163 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.auth.principal import Principal
+from app.core.models import AdminAction, UpdateRequest, User
+from app.core.schemas.institutional_admin import ReviewDecision, ReviewOutcome, ReviewResult
+from app.core.schemas.resident import UpdateField
+
+# Residents may only ask to change these; anything else in requested_changes is refused
+REVIEWABLE_FIELDS = {field.value for field in UpdateField}
+
+async def _emails_in_use(db: AsyncSession, emails: Set[str]) -> Dict[str, int]:
+    if not emails:
+        return {}
+    result = await db.execute(select(User.email, User.id).where(User.email.in_(list(emails))))
+    return {email: user_id for email, user_id in result.all()}
+
+def _conflicts(approvals: Dict[int, Tuple[UpdateRequest, dict]], in_use: Dict[str, int]) -> Dict[int, str]:
+    """Approved requests that cannot all be applied, with the reason for each.
+
+    Two approvals for one user conflict when they set a field to different
+    values; approvals for different users conflict when they claim the same
+    email, as does claiming an email another resident already has.
+    """
+    values: Dict[Tuple[int, str], Set[str]] = defaultdict(set)
+    email_claims: Dict[str, Set[int]] = defaultdict(set)
+    for update_request, changes in approvals.values():
+        for field, value in changes.items():
+            values[(update_request.user_id, field)].add(value)
+        if changes.get("email"):
+            email_claims[changes["email"]].add(update_request.user_id)
+
+    conflicts = {}
+    for request_id, (update_request, changes) in approvals.items():
+        reasons = [
+            f"{field} is set differently by another request for this user"
+            for field in changes
+            if len(values[(update_request.user_id, field)]) > 1
+        ]
+        email = changes.get("email")
+        if email and len(email_claims[email]) > 1:
+            reasons.append("email is requested by another user in this batch")
+        elif email and in_use.get(email) not in (None, update_request.user_id):
+            reasons.append("email is already registered")
+        if reasons:
+            conflicts[request_id] = "; ".join(reasons)
+    return conflicts
+
+async def review_batch(
+    db: AsyncSession,
+    decisions: List[ReviewDecision],
+    principal: Principal
+) -> List[ReviewResult]:
+    """Approve or reject many update requests in the caller's transaction.
+
+    Requests are loaded and row-locked in one query. Every decision gets a
+    result, in input order; only those reported approved or rejected are
+    written, with one executemany per table.
+    """
+    counts: Dict[int, int] = defaultdict(int)
+    for decision in decisions:
+        counts[decision.request_id] += 1
+
+    result = await db.execute(
+        select(UpdateRequest, User.institution_id)
+        .join(User, User.id == UpdateRequest.user_id)
+        .where(UpdateRequest.id.in_([request_id for request_id, count in counts.items() if count == 1]))
+        .with_for_update(of=UpdateRequest)
+    )
+    loaded = {update_request.id: (update_request, institution_id) for update_request, institution_id in result.all()}
+
+    outcomes: Dict[int, Tuple[ReviewOutcome, Optional[str]]] = {}
+    approvals: Dict[int, Tuple[UpdateRequest, dict]] = {}
+    for decision in decisions:
+        request_id = decision.request_id
+        if counts[request_id] > 1:
+            outcomes[request_id] = (ReviewOutcome.DUPLICATE, "Request is listed more than once")
+            continue
+        if request_id not in loaded:
+            outcomes[request_id] = (ReviewOutcome.NOT_FOUND, None)
+            continue
+        update_request, institution_id = loaded[request_id]
+        if not principal.is_super_admin and institution_id != principal.institution_id:
+            outcomes[request_id] = (ReviewOutcome.FORBIDDEN, "Request is from a different institution")
+        elif update_request.status != "pending":
+            outcomes[request_id] = (ReviewOutcome.NOT_PENDING, f"Request is {update_request.status}")
+        elif not decision.approved:
+            outcomes[request_id] = (ReviewOutcome.REJECTED, None)
+        else:
+            changes = dict(update_request.requested_changes or {})
+            unknown = sorted(set(changes) - REVIEWABLE_FIELDS)
+            if unknown:
+                outcomes[request_id] = (ReviewOutcome.INVALID, f"Fields cannot be updated: {', '.join(unknown)}")
+            else:
+                approvals[request_id] = (update_request, changes)
+
+    emails = {changes["email"] for _, changes in approvals.values() if changes.get("email")}
+    conflicts = _conflicts(approvals, await _emails_in_use(db, emails))
+    for request_id in approvals:
+        if request_id in conflicts:
+            outcomes[request_id] = (ReviewOutcome.CONFLICT, conflicts[request_id])
+        else:
+            outcomes[request_id] = (ReviewOutcome.APPROVED, None)
+
+    await _apply(db, decisions, loaded, approvals, outcomes, principal)
+    return [
+        ReviewResult(request_id=decision.request_id, outcome=outcomes[decision.request_id][0],
+                     detail=outcomes[decision.request_id][1])
+        for decision in decisions
+    ]
+
+async def _apply(
+    db: AsyncSession,
+    decisions: List[ReviewDecision],
+    loaded: Dict[int, Tuple[UpdateRequest, Optional[int]]],
+    approvals: Dict[int, Tuple[UpdateRequest, dict]],
+    outcomes: Dict[int, Tuple[ReviewOutcome, Optional[str]]],
+    principal: Principal
+) -> None:
+    now = datetime.utcnow()
+    user_changes: Dict[int, dict] = defaultdict(dict)
+    request_rows, action_rows = [], []
+    for decision in decisions:
+        outcome = outcomes[decision.request_id][0]
+        if outcome not in (ReviewOutcome.APPROVED, ReviewOutcome.REJECTED):
+            continue
+        update_request = loaded[decision.request_id][0]
+        approved = outcome == ReviewOutcome.APPROVED
+        if approved:
+            user_changes[update_request.user_id].update(approvals[decision.request_id][1])
+        request_rows.append({
+            "id": update_request.id,
+            "status": outcome.value,
+            "reviewed_by": principal.user_id,
+            "reviewed_at": now,
+            "rejection_reason": None if approved else decision.rejection_reason
+        })
+        action_rows.append({
+            "admin_id": principal.user_id,
+            "action_type": "update_request_review",
+            "user_id": update_request.user_id,
+            "details": {
+                "request_id": update_request.id,
+                "approved": approved,
+                "rejection_reason": decision.rejection_reason,
+                "batch": True
+            },
+            "created_at": now
+        })
+
+    # ORM bulk UPDATE by primary key: one executemany per set of columns
+    if user_changes:
+        await db.execute(update(User), [
+            {"id": user_id, "last_updated_by": principal.user_id, **changes}
+            for user_id, changes in user_changes.items()
+        ])
+    if request_rows:
+        await db.execute(update(UpdateRequest), request_rows)
+        await db.execute(insert(AdminAction), action_rows)
@@ -0,0 +1,66 @@
+from pydantic import BaseModel, EmailStr, validator
+from datetime import date, datetime
+from typing import Optional, List
+from .user import Gender
+
+class ResidentImportRecord(BaseModel):
+    """One demographic record of a bulk import; main_id is generated when absent"""
+    main_id: Optional[str] = None
+    first_name: str
+    last_name: str
+    date_of_birth: date
+    gender: Gender
+    nationality: str = "Ethiopian"
+    current_address: str
+    phone_number: Optional[str] = None
+    email: Optional[EmailStr] = None
+
+    @validator("main_id", "phone_number", "email", pre=True)
+    def blank_as_missing(cls, value):
+        # CSV has no nulls, only empty cells
+        if isinstance(value, str) and not value.strip():
+            return None
+        return value
+
+    @validator("nationality", pre=True)
+    def blank_nationality(cls, value):
+        return value or "Ethiopian"
+
+class ImportJobResponse(BaseModel):
+    id: int
+    status: str
+    format: str
+    filename: Optional[str] = None
+    institution_id: Optional[int] = None
+    records_processed: int
+    records_inserted: int
+    records_rejected: int
+    active_seconds: float
+    read_seconds: float
+    write_seconds: float
+    records_per_second: Optional[float] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
+
+class ImportRejectResponse(BaseModel):
+    record_number: int
+    errors: List[dict]
+
+    class Config:
+        orm_mode = True
+
+class BiometricEnrollmentResponse(BaseModel):
+    id: int
+    user_id: int
+    import_job_id: Optional[int] = None
+    status: str
+    requested_at: datetime
+    completed_at: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
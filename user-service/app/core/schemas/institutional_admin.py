@@ -18,6 +18,27 @@ class UpdateApproval(BaseModel):
     approved: bool
     rejection_reason: Optional[str] = None
 
+class ReviewDecision(UpdateApproval):
+    request_id: int
+
+class BatchReview(BaseModel):
+    decisions: List[ReviewDecision]
+
+class ReviewOutcome(str, Enum):
+    APPROVED = "approved"
+    REJECTED = "rejected"
+    NOT_FOUND = "not_found"
+    FORBIDDEN = "forbidden"
+    NOT_PENDING = "not_pending"
+    DUPLICATE = "duplicate"  # Same request listed twice in the batch
+    CONFLICT = "conflict"  # Another approved request sets the same field differently
+    INVALID = "invalid"
+
+class ReviewResult(BaseModel):
+    request_id: int
+    outcome: ReviewOutcome
+    detail: Optional[str] = None
+
 class AdminActionLog(BaseModel):
     action: str
     user_id: int
@@ -26,4 +47,16 @@ class AdminActionLog(BaseModel):
     timestamp: datetime
 
     class Config:
-        orm_mode = True 
\ No newline at end of file
+        orm_mode = True
+
+class DuplicateCandidateResponse(BaseModel):
+    id: int
+    user_id: int
+    duplicate_user_id: int
+    score: float
+    status: str
+    source: str
+    detected_at: datetime
+
+    class Config:
+        orm_mode = True
@@ -23,8 +23,21 @@ class UserCreate(UserBase):
 
 class UserResponse(UserBase):
     id: int
+    status: Optional[str] = None
+    institution_id: Optional[int] = None
     created_at: datetime
     updated_at: datetime
 
+    class Config:
+        orm_mode = True
+
+class ResidentSuggestion(BaseModel):
+    """Typeahead entry; only what the picker shows"""
+    id: int
+    main_id: str
+    first_name: str
+    last_name: str
+    date_of_birth: date
+
     class Config:
         orm_mode = True 
\ No newline at end of file
@@ -0,0 +1,17 @@
+from .query import (
+    ResidentFilters,
+    search_residents,
+    typeahead
+)
+from .indexer import SearchIndexer, search_indexer
+from .duplicates import DuplicateDetector, duplicate_detector
+
+__all__ = [
+    "ResidentFilters",
+    "search_residents",
+    "typeahead",
+    "SearchIndexer",
+    "search_indexer",
+    "DuplicateDetector",
+    "duplicate_detector"
+]
@@ -0,0 +1,201 @@
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from prometheus_client import Counter, Histogram
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.database import async_session, engine
+from app.core.models import DuplicateCandidate, User
+from app.core.utils.matching import score_batch, score_candidates, warm_up
+from app.core.utils.names import blocking_keys
+from shared.unit_of_work import session_factory
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_CHECKS = Counter(
+    "duplicate_checks_total",
+    "Duplicate-registration checks by where they ran and how they ended",
+    ["source", "outcome"]
+)
+
+DUPLICATE_CHECK_SECONDS = Histogram(
+    "duplicate_check_seconds",
+    "Candidate lookup plus scoring time for one registration",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+
+_CANDIDATE_COLUMNS = (
+    User.id, User.first_name, User.last_name, User.date_of_birth,
+    User.gender, User.email, User.phone_number
+)
+
+def _pair(user_id: int, other_id: int) -> Tuple[int, int]:
+    return (user_id, other_id) if user_id < other_id else (other_id, user_id)
+
+class DuplicateDetector:
+    """Blocking-key candidate generation with scoring in worker processes.
+
+    Candidates share at least one ``blocking_keys`` entry with the applicant
+    (GIN ``&&``) and are capped at ``max_candidates``. Scoring runs in a
+    process pool so Jaro-Winkler never holds the event loop. The same
+    pipeline scans existing residents in batches, walking the
+    ``duplicates_checked_at IS NULL`` partial index.
+    """
+
+    def __init__(
+        self,
+        write_sessions: sessionmaker,
+        read_sessions: sessionmaker,
+        workers: int,
+        threshold: float,
+        max_candidates: int,
+        timeout_seconds: float,
+        scan_batch_size: int,
+        scan_idle_seconds: float
+    ):
+        self.write_sessions = write_sessions
+        self.read_sessions = read_sessions
+        self.workers = workers
+        self.threshold = threshold
+        self.max_candidates = max_candidates
+        self.timeout_seconds = timeout_seconds
+        self.scan_batch_size = scan_batch_size
+        self.scan_idle_seconds = scan_idle_seconds
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._pool is None:
+            # Spawned workers import only the pure scoring module, not the app
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            # Workers are spawned on demand; start them all now so the first
+            # checks are not timed out by interpreter start-up and imports
+            for _ in range(self.workers):
+                self._pool.submit(warm_up)
+        if self._task is None and self.scan_batch_size:
+            self._task = asyncio.create_task(self._scan())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def _run_in_pool(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._pool, fn, *args)
+
+    async def _candidates(self, session: AsyncSession, keys: List[str], exclude_id: Optional[int] = None) -> List[dict]:
+        query = select(*_CANDIDATE_COLUMNS).where(User.blocking_keys.overlap(keys))
+        if exclude_id is not None:
+            query = query.where(User.id != exclude_id)
+        result = await session.execute(query.limit(self.max_candidates))
+        return [dict(row._mapping) for row in result]
+
+    async def find(self, applicant: dict) -> Optional[List[Tuple[int, float]]]:
+        """Probable duplicates of an applicant, best first; None if the check ran out of time"""
+        keys = blocking_keys(applicant["first_name"], applicant["last_name"], applicant.get("date_of_birth"))
+
+        async def check():
+            # Own session: a timeout cancels this lookup, never the caller's transaction
+            async with self.read_sessions() as session:
+                candidates = await self._candidates(session, keys)
+            if not candidates:
+                return []
+            return await self._run_in_pool(score_candidates, applicant, candidates, self.threshold)
+
+        started = time.perf_counter()
+        try:
+            matches = await asyncio.wait_for(check(), self.timeout_seconds)
+        except asyncio.TimeoutError:
+            DUPLICATE_CHECKS.labels(source="registration", outcome="timeout").inc()
+            logger.warning("Duplicate check exceeded %.2fs; left to the background scan", self.timeout_seconds)
+            return None
+        DUPLICATE_CHECK_SECONDS.observe(time.perf_counter() - started)
+        DUPLICATE_CHECKS.labels(source="registration", outcome="found" if matches else "clear").inc()
+        return matches
+
+    def record(self, db: AsyncSession, user_id: int, matches: List[Tuple[int, float]], source: str) -> None:
+        """Add reviewer-visible pairs to the caller's unit of work"""
+        for other_id, score in matches:
+            first, second = _pair(user_id, other_id)
+            db.add(DuplicateCandidate(user_id=first, duplicate_user_id=second, score=score, source=source))
+
+    async def scan_batch(self) -> int:
+        """Check one batch of unchecked residents; returns how many were checked"""
+        async with self.write_sessions() as session:
+            result = await session.execute(
+                select(*_CANDIDATE_COLUMNS, User.blocking_keys)
+                .where(User.duplicates_checked_at.is_(None), User.blocking_keys.isnot(None))
+                .order_by(User.id)
+                .limit(self.scan_batch_size)
+            )
+            pending = result.all()
+            if not pending:
+                return 0
+
+            groups = []
+            for row in pending:
+                applicant = dict(row._mapping)
+                keys = applicant.pop("blocking_keys")
+                groups.append((applicant, await self._candidates(session, keys, exclude_id=applicant["id"])))
+
+            pairs: Dict[Tuple[int, int], float] = {}
+            for user_id, other_id, score in await self._run_in_pool(score_batch, groups, self.threshold):
+                pair = _pair(user_id, other_id)
+                pairs[pair] = max(score, pairs.get(pair, 0.0))
+
+            if pairs:
+                statement = insert(DuplicateCandidate).values([
+                    {"user_id": first, "duplicate_user_id": second, "score": score, "source": "scan"}
+                    for (first, second), score in pairs.items()
+                ])
+                # Reviewed pairs keep their status; only the score is refreshed
+                await session.execute(statement.on_conflict_do_update(
+                    constraint="uq_duplicate_candidates_pair",
+                    set_={"score": statement.excluded.score}
+                ))
+
+            await session.execute(
+                update(User)
+                .where(User.id.in_([row.id for row in pending]))
+                .values(duplicates_checked_at=datetime.utcnow())
+            )
+            await session.commit()
+            DUPLICATE_CHECKS.labels(source="scan", outcome="checked").inc(len(pending))
+            return len(pending)
+
+    async def _scan(self) -> None:
+        while True:
+            try:
+                if await self.scan_batch() == self.scan_batch_size:
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("Duplicate scan batch failed", exc_info=True)
+            await asyncio.sleep(self.scan_idle_seconds)
+
+duplicate_detector = DuplicateDetector(
+    async_session,
+    session_factory(engine, read_only=True),
+    workers=settings.DUPLICATE_WORKERS,
+    threshold=settings.DUPLICATE_MATCH_THRESHOLD,
+    max_candidates=settings.DUPLICATE_MAX_CANDIDATES,
+    timeout_seconds=settings.DUPLICATE_CHECK_TIMEOUT_SECONDS,
+    scan_batch_size=settings.DUPLICATE_SCAN_BATCH_SIZE,
+    scan_idle_seconds=settings.DUPLICATE_SCAN_IDLE_SECONDS
+)
@@ -0,0 +1,77 @@
+import asyncio
+import logging
+from typing import Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.database import async_session
+from app.core.models import User
+from app.core.utils.names import search_fields, blocking_keys
+
+logger = logging.getLogger(__name__)
+
+class SearchIndexer:
+    """Fills search columns for rows written before they existed, or outside the ORM.
+
+    Walks the partial ``blocking_keys IS NULL`` index in small batches, so once
+    the backlog is gone each pass is a single empty index lookup.
+    """
+
+    def __init__(self, session_factory: sessionmaker, batch_size: int, idle_seconds: float):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.idle_seconds = idle_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def index_batch(self) -> int:
+        """Index one batch of pending rows; returns how many were indexed"""
+        async with self.session_factory() as session:
+            result = await session.execute(
+                select(User.id, User.first_name, User.last_name, User.date_of_birth)
+                .where(User.blocking_keys.is_(None))
+                .limit(self.batch_size)
+            )
+            rows = result.all()
+            if not rows:
+                return 0
+            values = []
+            for row in rows:
+                search_name, keys = search_fields(row.first_name, row.last_name)
+                values.append({
+                    "id": row.id,
+                    "search_name": search_name,
+                    "phonetic_keys": keys,
+                    "blocking_keys": blocking_keys(row.first_name, row.last_name, row.date_of_birth)
+                })
+            # Bulk UPDATE ... WHERE id = :id, executemany
+            await session.execute(update(User), values)
+            await session.commit()
+            return len(rows)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                if await self.index_batch() == self.batch_size:
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("Search indexing batch failed", exc_info=True)
+            await asyncio.sleep(self.idle_seconds)
+
+search_indexer = SearchIndexer(
+    async_session,
+    settings.SEARCH_INDEX_BATCH_SIZE,
+    settings.SEARCH_INDEX_IDLE_SECONDS
+)
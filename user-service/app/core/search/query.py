@@ -0,0 +1,140 @@
+import base64
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import Numeric, and_, case, cast, func, literal, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.models import User
+from app.core.utils.names import fold, phonetic_keys
+
+@dataclass
+class ResidentFilters:
+    institution_id: Optional[int] = None
+    status: Optional[str] = None
+    date_of_birth: Optional[date] = None
+    born_after: Optional[date] = None
+    born_before: Optional[date] = None
+
+    def clauses(self) -> list:
+        clauses = []
+        if self.institution_id is not None:
+            clauses.append(User.institution_id == self.institution_id)
+        if self.status:
+            clauses.append(User.status == self.status)
+        if self.date_of_birth:
+            clauses.append(User.date_of_birth == self.date_of_birth)
+        if self.born_after:
+            clauses.append(User.date_of_birth >= self.born_after)
+        if self.born_before:
+            clauses.append(User.date_of_birth <= self.born_before)
+        return clauses
+
+def encode_cursor(score: Decimal, user_id: int) -> str:
+    raw = f"{score}|{user_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[Decimal, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        score, user_id = raw.split("|")
+        return Decimal(score), int(user_id)
+    except (ValueError, InvalidOperation):
+        raise HTTPException(status_code=400, detail="Invalid search cursor")
+
+def _score(name: str, keys: List[str]):
+    """Rank as trigram similarity of the whole or a word of the name, plus a phonetic bonus.
+
+    Rounded to a fixed-scale numeric so that keyset comparisons are exact.
+    """
+    if not name:
+        return cast(literal(0), Numeric(6, 4))
+    similarity = func.greatest(
+        func.similarity(User.search_name, name),
+        func.word_similarity(name, User.search_name)
+    )
+    bonus = case((User.phonetic_keys.contains(keys), settings.SEARCH_PHONETIC_BONUS), else_=0) if keys else 0
+    return cast(similarity + bonus, Numeric(6, 4))
+
+async def search_residents(
+    db: AsyncSession,
+    q: Optional[str],
+    filters: ResidentFilters,
+    limit: int,
+    cursor: Optional[str] = None
+) -> Tuple[List[User], Optional[str]]:
+    """Best matches first, then by id; returns the page and the next cursor.
+
+    Candidates come from indexes only: the trigram GIN index (``%`` and
+    ``<%``) for misspellings and partial names, and the phonetic-key GIN
+    index (``@>``) for variant spellings and Ethiopic input. Without ``q``
+    this is a filtered listing in id order.
+    """
+    name = fold(q) if q else ""
+    keys = phonetic_keys(name)
+    score = _score(name, keys).label("score")
+
+    query = select(User, score).where(*filters.clauses())
+    if name:
+        candidates = [
+            User.search_name.op("%")(name),
+            literal(name).op("<%")(User.search_name),
+        ]
+        if keys:
+            candidates.append(User.phonetic_keys.contains(keys))
+        query = query.where(or_(*candidates))
+
+    if cursor:
+        after_score, after_id = decode_cursor(cursor)
+        query = query.where(or_(
+            score < after_score,
+            and_(score == after_score, User.id > after_id)
+        ))
+
+    result = await db.execute(query.order_by(score.desc(), User.id).limit(limit + 1))
+    rows = result.all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].score, rows[-1].User.id)
+    return [row.User for row in rows], next_cursor
+
+async def typeahead(db: AsyncSession, prefix: str, filters: ResidentFilters, limit: int) -> list:
+    """Residents whose first name, then any later word of the name, starts with ``prefix``.
+
+    First-name matches come straight off the (search_name, id) btree in
+    order. Later words are only looked up to fill a short page, through the
+    trigram index, once the prefix is long enough to produce trigrams. Only
+    the columns the picker shows are read.
+    """
+    name = fold(prefix)
+    if not name:
+        return []
+
+    columns = select(User.id, User.main_id, User.first_name, User.last_name, User.date_of_birth)
+    result = await db.execute(
+        columns
+        .where(User.search_name.like(f"{name}%"), *filters.clauses())
+        .order_by(User.search_name, User.id)
+        .limit(limit)
+    )
+    suggestions = result.all()
+
+    if len(suggestions) < limit and len(name) >= 3:
+        result = await db.execute(
+            columns
+            .where(
+                User.search_name.like(f"% {name}%"),
+                User.search_name.notlike(f"{name}%"),
+                *filters.clauses()
+            )
+            .order_by(User.search_name, User.id)
+            .limit(limit - len(suggestions))
+        )
+        suggestions.extend(result.all())
+    return suggestions
@@ -0,0 +1,6 @@
+from .scheduler import SuspensionScheduler, suspension_scheduler
+
+__all__ = [
+    "SuspensionScheduler",
+    "suspension_scheduler"
+]
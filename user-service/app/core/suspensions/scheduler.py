@@ -0,0 +1,150 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import List, Optional
+
+from prometheus_client import Counter, Gauge
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.database import async_session
+from app.core.events.publisher import UserEventPublisher, user_events
+from app.core.models import User
+
+logger = logging.getLogger(__name__)
+
+SUSPENSIONS_EXPIRED = Counter(
+    "resident_suspensions_expired_total",
+    "Residents reactivated because their suspension ended"
+)
+
+SUSPENSION_EXPIRY_BACKLOG = Gauge(
+    "resident_suspension_expiry_backlog_seconds",
+    "How far past its end date the oldest unlifted suspension is"
+)
+
+def _due(now: datetime) -> tuple:
+    # End dates are naive UTC, as written by suspend_user_id
+    return (
+        User.status == "suspended",
+        User.suspension_end_date.isnot(None),
+        User.suspension_end_date <= now
+    )
+
+class SuspensionScheduler:
+    """Reactivates residents whose timed suspension has ended.
+
+    ``ix_users_suspension_expiry`` is the delay queue: each pass takes the due
+    head of that partial index with ``FOR UPDATE SKIP LOCKED``, so replicas
+    split the work and a row an admin is editing is left for the next pass.
+    Between passes the task sleeps until the next end date, capped at
+    ``max_sleep_seconds``; ``notify`` wakes it early for a suspension made on
+    this replica. Nothing is held in memory, so a restart resumes from the index.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        events: UserEventPublisher,
+        batch_size: int,
+        max_sleep_seconds: float
+    ):
+        self.session_factory = session_factory
+        self.events = events
+        self.batch_size = batch_size
+        self.max_sleep_seconds = max_sleep_seconds
+        self._task: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+        self._wake_at: Optional[datetime] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def notify(self, end_date: datetime) -> None:
+        """Wake early if a new suspension ends before the current sleep does"""
+        if self._wake_at is None or end_date < self._wake_at:
+            self._wake.set()
+
+    async def expire_batch(self) -> List[int]:
+        """Lift one batch of due suspensions; returns the reactivated user ids"""
+        now = datetime.utcnow()
+        async with self.session_factory() as session:
+            due = (
+                select(User.id)
+                .where(*_due(now))
+                .order_by(User.suspension_end_date)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            result = await session.execute(
+                update(User)
+                .where(User.id.in_(due.scalar_subquery()), *_due(now))
+                .values(status="active", suspension_end_date=None, updated_at=now)
+                .returning(User.id, User.institution_id)
+                .execution_options(synchronize_session=False)
+            )
+            rows = result.all()
+            await session.commit()
+
+        # Announced only once committed; a crash in between leaves the 30s
+        # principal cache TTL as the upper bound on staleness elsewhere
+        for row in rows:
+            await self.events.publish("user.reactivated", {
+                "user_id": row.id,
+                "institution_id": row.institution_id,
+                "reason": "suspension_expired"
+            })
+        SUSPENSIONS_EXPIRED.inc(len(rows))
+        return [row.id for row in rows]
+
+    async def _next_due(self) -> Optional[datetime]:
+        async with self.session_factory() as session:
+            result = await session.execute(
+                select(func.min(User.suspension_end_date)).where(
+                    User.status == "suspended",
+                    User.suspension_end_date.isnot(None)
+                )
+            )
+            return result.scalar()
+
+    async def _sleep(self) -> None:
+        delay = self.max_sleep_seconds
+        next_due = await self._next_due()
+        until_due = (next_due - datetime.utcnow()).total_seconds() if next_due else delay
+        SUSPENSION_EXPIRY_BACKLOG.set(max(0.0, -until_due))
+        # A due row still here was skipped as locked; retry it shortly, not in a spin
+        delay = min(delay, max(1.0, until_due))
+        self._wake_at = next_due
+        try:
+            await asyncio.wait_for(self._wake.wait(), delay)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            self._wake_at = None
+            self._wake.clear()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                if len(await self.expire_batch()) == self.batch_size:
+                    continue
+                await self._sleep()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("Suspension expiry pass failed", exc_info=True)
+                await asyncio.sleep(self.max_sleep_seconds)
+
+suspension_scheduler = SuspensionScheduler(
+    async_session,
+    user_events,
+    settings.SUSPENSION_EXPIRY_BATCH_SIZE,
+    settings.SUSPENSION_EXPIRY_MAX_SLEEP_SECONDS
+)
@@ -0,0 +1,23 @@
+def luhn_check_digit(digits: str) -> str:
+    """Check digit that makes ``digits`` + digit pass the Luhn test"""
+    total = 0
+    for index, char in enumerate(reversed(digits)):
+        value = int(char)
+        if index % 2 == 0:
+            value *= 2
+            if value > 9:
+                value -= 9
+        total += value
+    return str((10 - total % 10) % 10)
+
+def is_valid_main_id(main_id: str) -> bool:
+    return (
+        len(main_id) == 12
+        and main_id.isdigit()
+        and luhn_check_digit(main_id[:-1]) == main_id[-1]
+    )
+
+def format_main_id(sequence_value: int) -> str:
+    """12-digit main_id: the 11-digit sequence value and a Luhn check digit"""
+    body = f"{sequence_value:011d}"
+    return body + luhn_check_digit(body)
@@ -0,0 +1,100 @@
+from datetime import date
+from typing import List, Optional, Tuple
+
+from app.core.utils.names import fold, phonetic_keys
+
+# Pure functions only: these run in worker processes
+
+def warm_up() -> None:
+    """Pool warm-up task; importing this module in the worker is the work"""
+
+def jaro_winkler(a: str, b: str, prefix_scale: float = 0.1) -> float:
+    """Jaro-Winkler similarity in [0, 1]"""
+    if a == b:
+        return 1.0 if a else 0.0
+    if not a or not b:
+        return 0.0
+    window = max(0, max(len(a), len(b)) // 2 - 1)
+    a_matched = [False] * len(a)
+    b_matched = [False] * len(b)
+    matches = 0
+    for i, char in enumerate(a):
+        for j in range(max(0, i - window), min(len(b), i + window + 1)):
+            if not b_matched[j] and b[j] == char:
+                a_matched[i] = b_matched[j] = True
+                matches += 1
+                break
+    if not matches:
+        return 0.0
+
+    b_chars = [char for char, matched in zip(b, b_matched) if matched]
+    a_chars = [char for char, matched in zip(a, a_matched) if matched]
+    transpositions = sum(x != y for x, y in zip(a_chars, b_chars)) / 2
+    jaro = (matches / len(a) + matches / len(b) + (matches - transpositions) / matches) / 3
+
+    prefix = 0
+    for x, y in zip(a[:4], b[:4]):
+        if x != y:
+            break
+        prefix += 1
+    return jaro + prefix * prefix_scale * (1 - jaro)
+
+def name_similarity(first_a: str, last_a: str, first_b: str, last_b: str) -> float:
+    """Best of same-order and swapped-order name similarity; phonetic equality counts as 0.9"""
+    first_a, last_a, first_b, last_b = fold(first_a), fold(last_a), fold(first_b), fold(last_b)
+    same = (jaro_winkler(first_a, first_b) + jaro_winkler(last_a, last_b)) / 2
+    swapped = (jaro_winkler(first_a, last_b) + jaro_winkler(last_a, first_b)) / 2
+    score = max(same, swapped)
+    if phonetic_keys(f"{first_a} {last_a}") == phonetic_keys(f"{first_b} {last_b}"):
+        score = max(score, 0.9)
+    return score
+
+def dob_similarity(a: Optional[date], b: Optional[date]) -> float:
+    """1 for equal dates, less for the usual data-entry slips, 0 otherwise"""
+    if a is None or b is None:
+        return 0.0
+    if a == b:
+        return 1.0
+    if (a.year, a.month, a.day) == (b.year, b.day, b.month):
+        return 0.9  # Day and month swapped
+    text_a, text_b = a.isoformat(), b.isoformat()
+    if sum(x != y for x, y in zip(text_a, text_b)) == 1:
+        return 0.8  # One mistyped digit
+    if (a.month, a.day) == (b.month, b.day) and abs(a.year - b.year) == 1:
+        return 0.8
+    if abs((a - b).days) <= 31:
+        return 0.5
+    return 0.0
+
+def score_pair(a: dict, b: dict) -> float:
+    """Probability-like score that two resident records are the same person"""
+    if a.get("email") and a.get("email") == b.get("email"):
+        return 1.0
+    if a.get("phone_number") and a.get("phone_number") == b.get("phone_number"):
+        return 0.95
+    score = (
+        0.6 * name_similarity(a["first_name"], a["last_name"], b["first_name"], b["last_name"])
+        + 0.3 * dob_similarity(a.get("date_of_birth"), b.get("date_of_birth"))
+        + 0.1 * (a.get("gender") == b.get("gender"))
+    )
+    return round(score, 4)
+
+def score_candidates(applicant: dict, candidates: List[dict], threshold: float) -> List[Tuple[int, float]]:
+    """(candidate id, score) at or above ``threshold``, best first"""
+    scored = []
+    for candidate in candidates:
+        if candidate["id"] == applicant.get("id"):
+            continue
+        score = score_pair(applicant, candidate)
+        if score >= threshold:
+            scored.append((candidate["id"], score))
+    scored.sort(key=lambda item: -item[1])
+    return scored
+
+def score_batch(groups: List[Tuple[dict, List[dict]]], threshold: float) -> List[Tuple[int, int, float]]:
+    """score_candidates over many applicants in one task: (user id, duplicate id, score)"""
+    return [
+        (applicant["id"], candidate_id, score)
+        for applicant, candidates in groups
+        for candidate_id, score in score_candidates(applicant, candidates, threshold)
+    ]
@@ -0,0 +1,97 @@
+import re
+import unicodedata
+from typing import List, Tuple
+
+# Consonant of each 8-character row of the Ethiopic syllabary (U+1200-U+1357).
+# Homophones (ሀ/ሐ/ኀ, ሰ/ሠ, ጸ/ፀ, አ/ዐ) share a spelling, as they do in Latin names.
+_ETHIOPIC_ROWS = {
+    0x1200: "h", 0x1208: "l", 0x1210: "h", 0x1218: "m",
+    0x1220: "s", 0x1228: "r", 0x1230: "s", 0x1238: "sh",
+    0x1240: "q", 0x1248: "qw", 0x1250: "q", 0x1258: "qw",
+    0x1260: "b", 0x1268: "v", 0x1270: "t", 0x1278: "ch",
+    0x1280: "h", 0x1288: "hw", 0x1290: "n", 0x1298: "ny",
+    0x12A0: "", 0x12A8: "k", 0x12B0: "kw", 0x12B8: "h",
+    0x12C0: "hw", 0x12C8: "w", 0x12D0: "", 0x12D8: "z",
+    0x12E0: "zh", 0x12E8: "y", 0x12F0: "d", 0x12F8: "d",
+    0x1300: "j", 0x1308: "g", 0x1310: "gw", 0x1318: "g",
+    0x1320: "t", 0x1328: "ch", 0x1330: "p", 0x1338: "ts",
+    0x1340: "ts", 0x1348: "f", 0x1350: "p",
+}
+
+# Vowel of each order: ä, u, i, a, e, ə (usually unwritten in Latin), o, wa
+_ETHIOPIC_VOWELS = ("e", "u", "i", "a", "e", "", "o", "wa")
+
+# Ethiopic wordspace, full stop, comma and semicolon
+_ETHIOPIC_PUNCTUATION = {0x1361, 0x1362, 0x1363, 0x1364}
+
+def _build_ethiopic_table() -> dict:
+    table = {codepoint: " " for codepoint in _ETHIOPIC_PUNCTUATION}
+    for start, consonant in _ETHIOPIC_ROWS.items():
+        for order, vowel in enumerate(_ETHIOPIC_VOWELS):
+            if not consonant and order == 0:
+                vowel = "a"  # አበበ is written Abebe, not Ebebe
+            table[start + order] = consonant + vowel
+    return table
+
+_ETHIOPIC_TABLE = _build_ethiopic_table()
+
+# Spelling variants that sound alike in Ethiopian names written in Latin script
+_PHONETIC_SUBSTITUTIONS = {
+    "sh": "x", "ch": "c", "ph": "f", "th": "t", "kh": "h", "gh": "g", "zh": "j",
+    "ts": "s", "tz": "s", "ny": "n", "ck": "k", "q": "k", "c": "k", "v": "b",
+}
+_PHONETIC_PATTERN = re.compile("|".join(sorted(_PHONETIC_SUBSTITUTIONS, key=len, reverse=True)))
+_SILENT = set("aeiouwyh")
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+def transliterate(text: str) -> str:
+    """Romanize Ethiopic script; other characters pass through"""
+    return text.translate(_ETHIOPIC_TABLE)
+
+def fold(text: str) -> str:
+    """Lowercase ASCII form used for indexing and matching names"""
+    text = unicodedata.normalize("NFKD", transliterate(text or ""))
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return _NON_WORD.sub(" ", text.lower()).strip()
+
+def phonetic_key(token: str) -> str:
+    """Consonant skeleton of one folded name, so Girma, ግርማ and Guirma agree"""
+    if not token:
+        return ""
+    token = _PHONETIC_PATTERN.sub(lambda match: _PHONETIC_SUBSTITUTIONS[match.group()], token)
+    first = "a" if token[0] in "aeiou" else token[0]
+    key = [first]
+    for char in token[1:]:
+        if char in _SILENT or char == key[-1]:
+            continue
+        key.append(char)
+    return "".join(key[:8])
+
+def phonetic_keys(text: str) -> List[str]:
+    """Sorted distinct keys of every word in a folded name"""
+    return sorted({phonetic_key(token) for token in text.split() if len(token) > 1})
+
+def search_fields(first_name: str, last_name: str) -> Tuple[str, List[str]]:
+    """search_name and phonetic_keys column values for a resident"""
+    name = fold(f"{first_name or ''} {last_name or ''}")
+    return name, phonetic_keys(name)
+
+def _name_key(name: str) -> str:
+    return "-".join(phonetic_key(token) for token in fold(name).split())
+
+def blocking_keys(first_name: str, last_name: str, date_of_birth) -> List[str]:
+    """Duplicate-detection blocks: the name in either order, and each name with the birth date.
+
+    Two registrations of one person share a block unless both a name and the
+    birth date were mistyped.
+    """
+    first, last = _name_key(first_name), _name_key(last_name)
+    # An empty name would put every resident missing it into one huge block
+    keys = ["n:" + "|".join(sorted((first, last)))] if first or last else []
+    if date_of_birth:
+        born = str(date_of_birth)
+        if first:
+            keys.append(f"f:{first}|{born}")
+        if last:
+            keys.append(f"l:{last}|{born}")
+    return keys
@@ -7,17 +7,39 @@ from enum import Enum
 # Load environment variables from .env file
 load_dotenv()
 
-from fastapi import FastAPI, Security
+from fastapi import FastAPI, Request, Security
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.openapi.docs import get_swagger_ui_html
 from fastapi.openapi.utils import get_openapi
 from fastapi.security import OAuth2PasswordBearer
-from app.core.api import users
-from app.core.database import engine
-from app.core.models import Base, RoleType
+from shared.compression import CompressionMiddleware
+from shared.openapi import OpenAPIDocument
+from shared.unit_of_work import query_count_middleware
+from shared.metrics import RequestMetricsMiddleware, metrics_response
+from shared.logs import RequestContextMiddleware, configure_logging, shutdown_logging
+from shared.tracing import TracingMiddleware, configure_tracing, shutdown_tracing
+from shared.profiling import LoopMonitor, ProfilingMiddleware, profiling_router
+from app.core.api import users, imports
+from app.core.config import settings
+from app.core.database import engine, read_router, schema
+from app.core.search import search_indexer, duplicate_detector
+from app.core.imports import import_runner
+from app.core.suspensions import suspension_scheduler
+from app.core.events.subscriber import principal_events
+from app.core.models import RoleType
 from app.core.auth.permissions import Permissions, ROLE_PERMISSIONS
 
+# Non-blocking JSON logs; configured before anything else logs
+configure_logging("user-service", settings.LOG_LEVEL, settings.LOG_INFO_SAMPLE_RATE, settings.LOG_QUEUE_SIZE)
+configure_tracing(
+    "user-service",
+    settings.TRACE_EXPORTER,
+    settings.TRACE_FILE_PATH,
+    settings.TRACE_HEAD_SAMPLE_RATE,
+    settings.TRACE_TAIL_LATENCY_MS
+)
+
 # Ensure the app directory is in the Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
@@ -25,9 +47,7 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 def custom_openapi():
-    if app.openapi_schema:
-        return app.openapi_schema
-
+    """Build the schema; served through openapi_document, which runs this once"""
     openapi_schema = get_openapi(
         title=app.title,
         version=app.version,
@@ -98,24 +118,38 @@ Include the token in the Authorization header as: `Bearer <token>`
             # Add security requirement
             operation["security"] = [{"OAuth2PasswordBearer": []}]
             
-            # Add role-based tags
+            # Add role-based tags; a new list, as the operation shares its route's tags
             if "tags" in operation:
                 required_permissions = operation.get("x-permissions", [])
-                for role, permissions in ROLE_PERMISSIONS.items():
-                    if all(perm in permissions for perm in required_permissions):
-                        operation["tags"].append(f"Role: {role.value}")
+                operation["tags"] = operation["tags"] + [
+                    f"Role: {role.value}" for role, permissions in ROLE_PERMISSIONS.items()
+                    if all(perm in permissions for perm in required_permissions)
+                ]
 
-    app.openapi_schema = openapi_schema
-    return app.openapi_schema
+    return openapi_schema
 
 app = FastAPI(
     title="Digital ID System - User Service",
     description="API for managing user data and biometrics in the Digital ID System",
     version="1.0.0",
     docs_url=None,  # Disable default docs
-    redoc_url=None  # Disable default redoc
+    redoc_url=None,  # Disable default redoc
+    openapi_url=None  # Served by the /openapi.json route below, from openapi_document
 )
 
+# Event-loop lag and the stack of any callback that blocks it
+loop_monitor = LoopMonitor("user-service", settings.LOOP_STALL_THRESHOLD_MS / 1000)
+
+# Admin profiling under /debug when PROFILING_TOKEN is set; registered first so
+# the middleware is innermost and runs in the endpoint's task
+if settings.PROFILING_TOKEN:
+    app.add_middleware(ProfilingMiddleware, token=settings.PROFILING_TOKEN)
+    app.include_router(profiling_router(settings.PROFILING_TOKEN, loop_monitor), prefix="/debug")
+
+# Built once in the background at startup, then served as stored bytes
+openapi_document = OpenAPIDocument(app, custom_openapi)
+app.openapi = openapi_document.schema
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -125,29 +159,30 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Create static directory if it doesn't exist
+# Negotiated zstd/br/gzip for bodies over 1 KiB
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+# Return X-Min-LSN on writes so follow-up reads can avoid stale replicas
+app.middleware("http")(read_router.middleware())
+
+# X-DB-Query-Count and db_queries_per_request make N+1 regressions visible
+app.middleware("http")(query_count_middleware("user-service"))
+
+# Server span per request, continuing the caller's traceparent; inside the request context
+app.add_middleware(TracingMiddleware)
+
+# Request id and route on every log record; inside the metrics middleware
+app.add_middleware(RequestContextMiddleware)
+
+# Latency by route template; registered last so it times the whole stack
+app.add_middleware(RequestMetricsMiddleware, service="user-service")
+
+# Swagger UI assets are vendored in static/, so docs work offline
 static_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static")
-os.makedirs(static_dir, exist_ok=True)
 
 # Mount static files
 app.mount("/static", StaticFiles(directory=static_dir), name="static")
 
-# Download Swagger UI files if they don't exist
-import httpx
-async def download_swagger_files():
-    swagger_ui_files = {
-        "swagger-ui-bundle.js": "https://cdn.jsdelivr.net/npm/swagger-ui-dist@5/swagger-ui-bundle.js",
-        "swagger-ui.css": "https://cdn.jsdelivr.net/npm/swagger-ui-dist@5/swagger-ui.css"
-    }
-    
-    for filename, url in swagger_ui_files.items():
-        filepath = os.path.join("static", filename)
-        if not os.path.exists(filepath):
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url)
-                with open(filepath, "wb") as f:
-                    f.write(response.content)
-
 @app.get("/docs", include_in_schema=False)
 async def custom_swagger_ui_html():
     return get_swagger_ui_html(
@@ -166,17 +201,38 @@ async def custom_swagger_ui_html():
     )
 
 @app.get("/openapi.json", include_in_schema=False)
-async def get_open_api_endpoint():
-    return custom_openapi()
+async def get_open_api_endpoint(request: Request):
+    return await openapi_document.response(request)
 
 @app.on_event("startup")
 async def startup():
-    # Create database tables
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-    
-    # Download Swagger UI files
-    await download_swagger_files()
+    # One revision check; migrations run as a separate job (python -m app.migrate)
+    await schema.prepare(engine, settings.DB_SCHEMA_MODE)
+
+    openapi_document.start()
+    read_router.start()
+    search_indexer.start()
+    duplicate_detector.start()
+    await import_runner.start()
+    suspension_scheduler.start()
+    principal_events.start()
+    loop_monitor.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await principal_events.stop()
+    await suspension_scheduler.stop()
+    await import_runner.stop()
+    await duplicate_detector.stop()
+    await search_indexer.stop()
+    await read_router.stop()
+    await loop_monitor.stop()
+    shutdown_tracing()
+    shutdown_logging()
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    return metrics_response(request)
 
 # Include routers with role-based documentation
 app.include_router(
@@ -189,4 +245,15 @@ app.include_router(
         404: {"description": "Not found"},
         422: {"description": "Validation Error"}
     }
-)
\ No newline at end of file
+)
+
+app.include_router(
+    imports.router,
+    prefix="/api/imports",
+    tags=["imports"],
+    responses={
+        401: {"description": "Unauthorized - Invalid or missing token"},
+        403: {"description": "Forbidden - Insufficient permissions"},
+        404: {"description": "Not found"}
+    }
+)
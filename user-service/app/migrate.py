@@ -0,0 +1,6 @@
+"""Migration job, run once per rollout: python -m app.migrate [--stamp REVISION]"""
+from shared.migrations import main
+from app.core.database import schema
+
+if __name__ == "__main__":
+    main(schema)
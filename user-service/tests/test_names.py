@@ -0,0 +1,44 @@
+from app.core.utils.names import blocking_keys, fold, phonetic_key, phonetic_keys, search_fields, transliterate
+
+def test_fold_lowercases_and_strips_accents_and_punctuation():
+    assert fold("  Zoë-Hélène O'Brien ") == "zoe helene o brien"
+
+def test_fold_transliterates_ethiopic():
+    assert transliterate("አበበ") == "abebe"
+    assert fold("አበበ፡ በቀለ") == "abebe beqele"
+
+def test_fold_of_nothing_is_empty():
+    assert fold(None) == ""
+    assert fold("") == ""
+
+def test_phonetic_key_matches_variant_spellings_and_scripts():
+    key = phonetic_key("girma")
+    assert key == phonetic_key("guirma")
+    assert key == phonetic_key(fold("ግርማ"))
+
+def test_phonetic_key_substitutes_similar_sounds():
+    assert phonetic_key("tsehay") == phonetic_key("sehay")
+    assert phonetic_key("kebede") == phonetic_key("qebede")
+
+def test_phonetic_key_keeps_leading_vowel_as_a():
+    assert phonetic_key("abebe") == phonetic_key("ebebe")
+    assert phonetic_key("abebe").startswith("a")
+
+def test_phonetic_key_is_bounded():
+    assert phonetic_key("") == ""
+    assert len(phonetic_key("bcdfgjklmnprst")) == 8
+
+def test_phonetic_keys_skip_single_letters_and_duplicates():
+    assert phonetic_keys("abebe b abebe") == [phonetic_key("abebe")]
+
+def test_search_fields_fold_the_full_name():
+    name, keys = search_fields("Abebe", "Kebede")
+    assert name == "abebe kebede"
+    assert keys == sorted({phonetic_key("abebe"), phonetic_key("kebede")})
+
+def test_blocking_keys_skip_empty_names():
+    assert blocking_keys("", "", None) == []
+    assert blocking_keys("Abebe", "", "1990-01-01") == [
+        f"n:|{phonetic_key('abebe')}",
+        f"f:{phonetic_key('abebe')}|1990-01-01",
+    ]
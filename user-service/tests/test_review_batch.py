@@ -0,0 +1,52 @@
+from types import SimpleNamespace
+
+from app.core.reviews.batch import _conflicts
+
+def _approvals(*requests):
+    """{request_id: (update_request, changes)} from (request_id, user_id, changes)"""
+    return {
+        request_id: (SimpleNamespace(id=request_id, user_id=user_id), changes)
+        for request_id, user_id, changes in requests
+    }
+
+def test_compatible_approvals_do_not_conflict():
+    approvals = _approvals(
+        (1, 10, {"phone_number": "0911"}),
+        (2, 10, {"address": "Bole"}),
+        (3, 11, {"email": "a@example.com"}),
+    )
+    assert _conflicts(approvals, {}) == {}
+
+def test_same_field_set_differently_for_one_user():
+    approvals = _approvals(
+        (1, 10, {"phone_number": "0911"}),
+        (2, 10, {"phone_number": "0922"}),
+        (3, 10, {"address": "Bole"}),
+    )
+    conflicts = _conflicts(approvals, {})
+    assert set(conflicts) == {1, 2}
+    assert "phone_number" in conflicts[1]
+
+def test_same_value_twice_for_one_user_is_not_a_conflict():
+    approvals = _approvals(
+        (1, 10, {"phone_number": "0911"}),
+        (2, 10, {"phone_number": "0911"}),
+    )
+    assert _conflicts(approvals, {}) == {}
+
+def test_email_claimed_by_two_users_in_the_batch():
+    approvals = _approvals(
+        (1, 10, {"email": "a@example.com"}),
+        (2, 11, {"email": "a@example.com"}),
+    )
+    conflicts = _conflicts(approvals, {})
+    assert set(conflicts) == {1, 2}
+    assert "another user in this batch" in conflicts[1]
+
+def test_email_registered_to_another_resident():
+    approvals = _approvals((1, 10, {"email": "a@example.com"}))
+    assert "already registered" in _conflicts(approvals, {"a@example.com": 12})[1]
+
+def test_keeping_ones_own_email_is_not_a_conflict():
+    approvals = _approvals((1, 10, {"email": "a@example.com"}))
+    assert _conflicts(approvals, {"a@example.com": 10}) == {}
@@ -0,0 +1,49 @@
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.api.institutional_admin import _resident_filters
+from app.core.auth.principal import Principal
+from app.core.models import RoleType
+from app.core.search.query import decode_cursor, encode_cursor
+
+def _principal(roles=(RoleType.INSTITUTIONAL_ADMIN.value,), institution_id=7) -> Principal:
+    return Principal(
+        user_id=1,
+        roles=frozenset(roles),
+        permissions=frozenset(),
+        status="active",
+        institution_id=institution_id
+    )
+
+def test_cursor_round_trips_exactly():
+    cursor = encode_cursor(Decimal("0.8125"), 42)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (Decimal("0.8125"), 42)
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", encode_cursor(Decimal("1"), 2)[:-3] + "!!!"])
+def test_malformed_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor)
+    assert error.value.status_code == 400
+
+def test_institutional_admin_is_confined_to_their_institution():
+    filters = _resident_filters(_principal(), None, status="active")
+    assert filters.institution_id == 7
+    assert filters.status == "active"
+    assert _resident_filters(_principal(), 7).institution_id == 7
+
+def test_institutional_admin_cannot_search_another_institution():
+    with pytest.raises(HTTPException) as error:
+        _resident_filters(_principal(), 8)
+    assert error.value.status_code == 403
+
+def test_caller_without_an_institution_cannot_search():
+    with pytest.raises(HTTPException):
+        _resident_filters(_principal(institution_id=None), None)
+
+def test_super_admin_may_search_any_or_all_institutions():
+    super_admin = _principal(roles=(RoleType.SUPER_ADMIN.value,), institution_id=None)
+    assert _resident_filters(super_admin, 8).institution_id == 8
+    assert _resident_filters(super_admin, None).institution_id is None